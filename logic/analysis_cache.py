@@ -0,0 +1,179 @@
+#############################
+# Persistenter Cache für Analyseergebnisse
+# Gruppe: B2-4
+##############################
+
+"""
+Speichert Analyseergebnisse (Header und Steganalyse) in einer SQLite-Datenbank
+im Cache-Verzeichnis des Benutzers.
+
+Schlüssel ist der absolute Pfad zusammen mit Dateigröße und Änderungszeit
+(st_mtime_ns). Wird eine Datei überschrieben, ändert sich der Schlüssel und
+der alte Eintrag wird nicht mehr gefunden - es muss dafür nichts gelesen oder
+gehasht werden. Zusätzlich wird die Versionsnummer der Analyse gespeichert:
+Einträge einer anderen Version gelten als nicht vorhanden.
+
+Die Größe der Datenbank ist begrenzt (max_bytes, Summe der gespeicherten
+Ergebnisse). Beim Überschreiten werden die am längsten nicht gelesenen
+Einträge entfernt (LRU).
+
+Fehler beim Zugriff auf die Datenbank (z. B. schreibgeschütztes
+Home-Verzeichnis) werden nicht weitergereicht - der Cache verhält sich dann
+wie ein leerer Cache.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+CACHE_NAME = "b2-4-bildbearbeitung"
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # Obergrenze für die gespeicherten Ergebnisse
+
+
+def default_path():
+    """
+    Liefert den Pfad der Cache-Datenbank im Cache-Verzeichnis des Benutzers.
+
+    Returns:
+        str: %LOCALAPPDATA% (Windows), ~/Library/Caches (macOS) bzw.
+            $XDG_CACHE_HOME oder ~/.cache, jeweils mit Unterordner CACHE_NAME
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, CACHE_NAME, "analysis.sqlite3")
+
+
+def file_key(path):
+    """
+    Schlüssel einer Datei aus absolutem Pfad, Größe und Änderungszeit.
+
+    Args:
+        path: Pfad zur Datei
+
+    Returns:
+        str: Schlüssel für den Cache
+
+    Raises:
+        OSError: Wenn die Datei nicht existiert
+    """
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+class AnalysisCache:
+    """
+    LRU-Cache für Analyseergebnisse in einer SQLite-Datenbank.
+
+    Args:
+        path: Pfad der Datenbank (Standard: default_path(), ":memory:" für Tests)
+        version (int): Version der Analyse; Einträge anderer Versionen werden ignoriert
+        max_bytes (int): Obergrenze für die Summe der gespeicherten Ergebnisse
+    """
+
+    def __init__(self, path=None, version=1, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or default_path()
+        self.version = version
+        self.max_bytes = max_bytes
+        self._db = None
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")  # Mehrere Prozesse gleichzeitig
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " version INTEGER NOT NULL,"
+                " result TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._db.commit()
+        except (OSError, sqlite3.Error):
+            self._db = None  # Ohne Cache weiterarbeiten
+
+    def get(self, path):
+        """
+        Liefert das gespeicherte Ergebnis für eine Datei.
+
+        Args:
+            path: Pfad zur Datei
+
+        Returns:
+            dict oder None, wenn kein aktueller Eintrag vorhanden ist
+        """
+        if self._db is None:
+            return None
+        try:
+            key = file_key(path)
+            row = self._db.execute(
+                "SELECT result FROM entries WHERE key = ? AND version = ?",
+                (key, self.version)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return json.loads(row[0])
+        except (OSError, sqlite3.Error, ValueError):
+            return None
+
+    def put(self, path, result):
+        """
+        Speichert das Ergebnis für eine Datei und hält die Größenobergrenze ein.
+
+        Args:
+            path: Pfad zur Datei
+            result (dict): JSON-serialisierbares Analyseergebnis
+        """
+        if self._db is None:
+            return
+        try:
+            data = json.dumps(result, ensure_ascii=False)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, version, result, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (file_key(path), self.version, data, len(data), time.time())
+            )
+            self._evict()
+            self._db.commit()
+        except (OSError, sqlite3.Error, TypeError, ValueError):
+            pass
+
+    def _evict(self):
+        """Entfernt die am längsten nicht gelesenen Einträge oberhalb von max_bytes."""
+        total, = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        stale = []
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed, rowid"):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def clear(self):
+        """Entfernt alle Einträge."""
+        if self._db is not None:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
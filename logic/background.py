@@ -0,0 +1,111 @@
+#############################
+# Hintergrund-Aufgaben für die GUI
+# Gruppe: B2-4
+##############################
+
+"""
+Führt lange Operationen (Einbetten, Extrahieren, Steganalyse) außerhalb des
+Tk-Hauptthreads aus, damit das Fenster bedienbar bleibt.
+
+Die Arbeitsfunktion läuft in einem Executor-Thread und bekommt eine
+Fortschrittsfunktion progress(fertig, gesamt) übergeben, die sie an die
+Codec-Funktionen weiterreicht (siehe stego_codec.embed_file). Tk-Widgets
+werden ausschließlich im Hauptthread angefasst: BackgroundTask fragt per
+root.after in kurzen Abständen den zuletzt gemeldeten Fortschritt und das
+Ergebnis ab und ruft die Callbacks dort auf.
+
+Abbrechen ist kooperativ: cancel() setzt ein Flag, der nächste Aufruf von
+progress im Arbeitsthread wirft Cancelled. Die Codec-Funktionen melden nach
+jedem Band, ein Abbruch greift daher nach Bruchteilen einer Sekunde.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_INTERVAL = 100  # Millisekunden zwischen zwei Abfragen im Hauptthread
+
+
+class Cancelled(Exception):
+    """Die Aufgabe wurde über BackgroundTask.cancel abgebrochen."""
+
+
+class BackgroundTask:
+    """
+    Eine Operation, die im Hintergrund läuft und ihr Ergebnis im Hauptthread meldet.
+
+    Args:
+        root: Tk-Widget für root.after
+        work: Funktion work(progress), läuft im Executor-Thread
+        on_done: Callback mit dem Rückgabewert von work (Hauptthread)
+        on_error: Callback mit der Exception (Hauptthread, optional)
+        on_cancel: Callback ohne Argumente nach einem Abbruch (optional)
+        on_progress: Callback (fertig, gesamt) bei neuem Fortschritt (optional);
+            gesamt ist None, wenn der Umfang unbekannt ist
+        executor: Executor für work (Standard: eigener Thread)
+    """
+
+    def __init__(self, root, work, on_done=None, on_error=None, on_cancel=None,
+                 on_progress=None, executor=None):
+        self.root = root
+        self._work = work
+        self._on_done = on_done
+        self._on_error = on_error
+        self._on_cancel = on_cancel
+        self._on_progress = on_progress
+        self._executor = executor
+        self._cancelled = threading.Event()
+        self._state = None   # Zuletzt gemeldeter Fortschritt (fertig, gesamt)
+        self._shown = None   # Zuletzt angezeigter Fortschritt
+        self._future = None
+
+    def start(self):
+        """Startet die Arbeitsfunktion und die Abfrage im Hauptthread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future = self._executor.submit(self._work, self.progress)
+        self.root.after(POLL_INTERVAL, self._poll)
+        return self
+
+    def progress(self, done, total=None):
+        """
+        Meldet den Fortschritt (Arbeitsthread).
+
+        Raises:
+            Cancelled: Wenn cancel() aufgerufen wurde
+        """
+        if self._cancelled.is_set():
+            raise Cancelled()
+        self._state = (done, total)  # Eine Zuweisung, unter dem GIL atomar
+
+    def cancel(self):
+        """Fordert den Abbruch an (Hauptthread); wirksam beim nächsten progress-Aufruf."""
+        self._cancelled.set()
+        if self._future is not None:
+            self._future.cancel()  # Noch nicht gestartet: gar nicht erst ausführen
+
+    @property
+    def running(self):
+        return self._future is not None and not self._future.done()
+
+    def _poll(self):
+        """Überträgt Fortschritt und Ergebnis in den Hauptthread."""
+        state = self._state
+        if state is not None and state != self._shown and self._on_progress is not None:
+            self._shown = state
+            self._on_progress(*state)
+        if not self._future.done():
+            self.root.after(POLL_INTERVAL, self._poll)
+            return
+
+        if self._future.cancelled():
+            error = Cancelled()
+        else:
+            error = self._future.exception()
+        if isinstance(error, Cancelled):
+            if self._on_cancel is not None:
+                self._on_cancel()
+        elif error is not None:
+            if self._on_error is not None:
+                self._on_error(error)
+        elif self._on_done is not None:
+            self._on_done(self._future.result())
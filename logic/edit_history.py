@@ -0,0 +1,137 @@
+#############################
+# Bearbeitungsverlauf (Rückgängig / Wiederholen)
+# Gruppe: B2-4
+##############################
+
+"""
+Verlauf der Bearbeitungen eines Bildes mit Rückgängig und Wiederholen.
+
+Gespeichert wird nicht jeder Zwischenstand, sondern die Liste der
+Bearbeitungen (operations) und nur in regelmäßigen Abständen ein Abbild der
+Pixel (Checkpoint). Ein Zwischenstand wird vom nächstgelegenen Checkpoint
+davor aus neu berechnet, dafür sind höchstens CHECKPOINT_INTERVAL - 1
+Bearbeitungen nachzuholen. Die Checkpoints zusammen belegen höchstens
+budget Bytes; wird es knapp, fallen die ältesten weg (der Ausgangszustand
+bleibt immer erhalten).
+
+Wie eine Bearbeitung ausgeführt wird, weiß der Verlauf nicht: Er bekommt
+dafür eine Funktion replay(image, operations) -> image, die das
+übergebene Bild nicht verändern darf.
+"""
+
+CHECKPOINT_INTERVAL = 5         # Alle wie viele Bearbeitungen ein Checkpoint gespeichert wird
+HISTORY_BUDGET = 64 * 1024**2   # Speicher für alle Checkpoints zusammen in Bytes
+
+
+def image_size(image):
+    """Ungefährer Speicherbedarf der Pixel eines Bildes in Bytes."""
+    return image.width * image.height * len(image.getbands())
+
+
+class EditHistory:
+    """
+    Bearbeitungsliste mit Position und Checkpoints.
+
+    Args:
+        base (PIL.Image.Image): Ausgangszustand (es wird eine Kopie gespeichert)
+        replay: Funktion (image, operations) -> image, führt Bearbeitungen aus
+        budget (int): Höchster Speicher für die Checkpoints in Bytes
+        interval (int): Abstand der Checkpoints in Bearbeitungen
+    """
+
+    def __init__(self, base, replay, budget=HISTORY_BUDGET, interval=CHECKPOINT_INTERVAL):
+        self.replay = replay
+        self.budget = budget
+        self.interval = max(1, interval)
+        self.operations = []    # Alle Bearbeitungen, auch rückgängig gemachte
+        self.position = 0       # Anzahl der aktuell angewendeten Bearbeitungen
+        self.checkpoints = {0: base.copy()}  # Position -> Bild nach so vielen Bearbeitungen
+
+    @property
+    def applied(self):
+        """Die aktuell angewendeten Bearbeitungen (ohne rückgängig gemachte)."""
+        return self.operations[:self.position]
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.operations)
+
+    @property
+    def nbytes(self):
+        """Speicherbedarf aller Checkpoints in Bytes."""
+        return sum(image_size(image) for image in self.checkpoints.values())
+
+    def record(self, operation, image):
+        """
+        Hängt eine neue Bearbeitung an. Rückgängig gemachte Bearbeitungen
+        können danach nicht mehr wiederholt werden.
+
+        Args:
+            operation: Die Bearbeitung (wird unverändert an replay übergeben)
+            image (PIL.Image.Image): Bild nach der Bearbeitung
+        """
+        del self.operations[self.position:]
+        for position in [p for p in self.checkpoints if p > self.position]:
+            del self.checkpoints[position]
+        self.operations.append(operation)
+        self.position += 1
+        if self.position % self.interval == 0:
+            self._checkpoint(self.position, image)
+
+    def undo(self):
+        """
+        Macht die letzte Bearbeitung rückgängig.
+
+        Returns:
+            PIL.Image.Image: Bild ohne die letzte Bearbeitung
+
+        Raises:
+            ValueError: Wenn es nichts rückgängig zu machen gibt
+        """
+        if not self.can_undo:
+            raise ValueError("Es gibt keine Bearbeitung zum Rückgängigmachen.")
+        self.position -= 1
+        return self.image_at(self.position)
+
+    def redo(self, image):
+        """
+        Wiederholt die zuletzt rückgängig gemachte Bearbeitung.
+
+        Args:
+            image (PIL.Image.Image): Aktuelles Bild (wird nicht verändert)
+
+        Returns:
+            PIL.Image.Image: Bild mit der wiederholten Bearbeitung
+
+        Raises:
+            ValueError: Wenn es nichts zu wiederholen gibt
+        """
+        if not self.can_redo:
+            raise ValueError("Es gibt keine Bearbeitung zum Wiederholen.")
+        operation = self.operations[self.position]
+        self.position += 1
+        return self.replay(image, [operation])
+
+    def image_at(self, position):
+        """
+        Berechnet das Bild nach den ersten position Bearbeitungen vom
+        nächstgelegenen Checkpoint aus.
+
+        Returns:
+            PIL.Image.Image: Neues Bild (die Checkpoints bleiben unverändert)
+        """
+        start = max(p for p in self.checkpoints if p <= position)
+        checkpoint = self.checkpoints[start]
+        if start == position:
+            return checkpoint.copy()
+        return self.replay(checkpoint, self.operations[start:position])
+
+    def _checkpoint(self, position, image):
+        """Speichert einen Checkpoint und hält das Speicherbudget ein."""
+        self.checkpoints[position] = image.copy()
+        while self.nbytes > self.budget and len(self.checkpoints) > 1:
+            del self.checkpoints[min(p for p in self.checkpoints if p > 0)]
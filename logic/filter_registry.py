@@ -0,0 +1,257 @@
+#############################
+# Filter-Registry und Filter-Pipeline
+# Gruppe: B2-4
+##############################
+
+"""
+Verzeichnis aller Bildfilter und Ausführung von Filterketten.
+
+Jeder Filter ist unter seinem Anzeigenamen registriert (wie auf den
+Buttons, z. B. "Sepia") und gibt an, welche Art von Operation er ist:
+
+- POINT: Jeder Kanalwert wird unabhängig umgerechnet (Aufhellen, Abdunkeln).
+  Die Tabelle mit 256 Einträgen wird einmal aus der Referenzfunktion auf
+  einem Grauverlauf gewonnen und ist damit bitgleich zu ihr.
+- MATRIX: Jedes Pixel wird aus seinen eigenen Farbwerten berechnet
+  (Schwarz-Weiß, Sepia); dafür gibt der Filter eine Funktion auf
+  uint8-Arrays der Form (..., 3) an.
+- NEIGHBOURHOOD: Das Ergebnis hängt von den Nachbarpixeln bis zur Reichweite
+  halo ab (Verpixeln, Schärfen).
+- GEOMETRY: Die Pixel werden umsortiert (Drehen, Spiegeln).
+
+apply führt eine Kette aus. Für eine verkleinerte Vorschau gibt scale den
+Maßstab relativ zum Original an; Nachbarschaftsfilter arbeiten dann mit
+entsprechend kleinerem Radius, damit die Vorschau so stark verpixelt bzw.
+geschärft aussieht wie das gespeicherte Bild. Aufeinanderfolgende POINT- und MATRIX-Filter
+werden vorher zusammengefasst und in einem einzigen Durchlauf über
+Zeilenblöcke angewendet: Tabellen hintereinander werden zu einer Tabelle
+verkettet, und sobald das Bild nur noch einen Kanal hat (z. B. nach
+Schwarz-Weiß), wird der Rest der Kette für alle 256 Grauwerte vorausberechnet
+und per Tabelle nachgeschlagen. Aufhellen -> Schwarz-Weiß -> Sepia liest das
+Bild so nur einmal statt dreimal. Das Ergebnis ist bitgleich zur Anwendung
+der einzelnen Filter nacheinander.
+"""
+
+import numpy as np
+from PIL import Image
+
+from logic.abdunkeln import abdunkeln
+from logic.aufhellen import aufhellen
+from logic.drehen import turn_image
+from logic.pixelate import pixelate
+from logic.schwarz_weiss import grayscale_rgb, schwarz_weiss
+from logic.sepia import sepia, sepia_rgb
+from logic.sharpen import sharpen
+from logic.spiegeln import mirror_image
+
+POINT = "point"
+MATRIX = "matrix"
+NEIGHBOURHOOD = "neighbourhood"
+GEOMETRY = "geometry"
+
+BAND_PIXELS = 1 << 16  # Pixel pro Zeilenblock im zusammengefassten Durchlauf
+
+# Modi, die zusammengefasst verarbeitet werden: (Farbkanäle, Alphakanal)
+FUSED_MODES = {"L": (1, False), "LA": (1, True), "RGB": (3, False), "RGBA": (3, True)}
+
+FILTERS = {}  # Name -> Filter
+
+
+class Filter:
+    """
+    Beschreibung eines registrierten Filters.
+
+    Args:
+        name (str): Anzeigename, unter dem der Filter registriert wird
+        kind (str): POINT, MATRIX, NEIGHBOURHOOD oder GEOMETRY
+        function: Referenzimplementierung, PIL.Image -> PIL.Image
+        pixels: Nur MATRIX: Funktion uint8 (..., 3) -> uint8 (..., channels)
+        channels (int): Nur MATRIX: Anzahl Farbkanäle des Ergebnisses
+        keep_alpha (bool): False, wenn der Filter einen Alphakanal entfernt
+        halo (int): Nur NEIGHBOURHOOD: Reichweite in Pixeln (bei scale 1)
+        message (str): Statusmeldung nach dem Anwenden (oder None)
+    """
+
+    def __init__(self, name, kind, function, pixels=None, channels=3, keep_alpha=True,
+                 halo=0, message=None):
+        self.name = name
+        self.kind = kind
+        self.function = function
+        self.pixels = pixels
+        self.channels = channels
+        self.keep_alpha = keep_alpha
+        self.halo = halo
+        self.message = message
+        self._lut = None
+
+    @property
+    def lut(self):
+        """Nur POINT: Tabelle (256,) uint8 mit dem neuen Wert für jeden Kanalwert."""
+        if self._lut is None:
+            gradient = Image.frombytes("L", (256, 1), bytes(range(256)))
+            self._lut = np.asarray(self.function(gradient), dtype=np.uint8).reshape(256)
+        return self._lut
+
+    def __repr__(self):
+        return f"Filter({self.name!r}, {self.kind})"
+
+
+def register(filter):
+    """Registriert filter unter seinem Namen und gibt ihn zurück."""
+    FILTERS[filter.name] = filter
+    return filter
+
+
+def get(name):
+    """
+    Liefert den Filter mit dem Namen name.
+
+    Raises:
+        ValueError: Wenn kein Filter mit diesem Namen registriert ist
+    """
+    try:
+        return FILTERS[name]
+    except KeyError:
+        raise ValueError(f"Unbekannter Filter: {name}") from None
+
+
+def apply(image, names, scale=1.0):
+    """
+    Wendet eine Kette von Filtern auf ein Bild an.
+
+    Args:
+        image (PIL.Image.Image): Ausgangsbild (wird nicht verändert)
+        names: Filternamen in der Reihenfolge der Anwendung
+        scale (float): Maßstab des Bildes relativ zum Original (z. B. für die
+            Vorschau); NEIGHBOURHOOD-Filter bekommen ihn als Argument scale
+
+    Returns:
+        PIL.Image.Image: Ergebnisbild
+
+    Raises:
+        ValueError: Bei einem unbekannten Filternamen
+    """
+    filters = [get(name) for name in names]
+    start = 0
+    while start < len(filters):
+        end = start
+        while end < len(filters) and filters[end].kind in (POINT, MATRIX):
+            end += 1
+        if end > start:
+            image = _apply_fused(image, filters[start:end])
+            start = end
+        elif filters[start].kind == NEIGHBOURHOOD and scale != 1:
+            image = filters[start].function(image, scale=scale)
+            start += 1
+        else:
+            image = filters[start].function(image)
+            start += 1
+    return image
+
+
+def _apply_fused(image, filters):
+    """Wendet aufeinanderfolgende POINT- und MATRIX-Filter in einem Durchlauf an."""
+    if image.mode not in FUSED_MODES or "transparency" in image.info:
+        # Seltene Modi (P, CMYK, 16 Bit, Transparenzfarbe, ...): Referenzimplementierungen nacheinander
+        for filter in filters:
+            image = filter.function(image)
+        return image
+
+    in_channels, alpha = FUSED_MODES[image.mode]
+    stages, channels, alpha = _fuse(filters, in_channels, alpha)
+    pixels = np.asarray(image)
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, None]
+    height, width = pixels.shape[:2]
+    result = np.empty((height, width, channels + alpha), dtype=np.uint8)
+
+    rows = max(1, BAND_PIXELS // max(1, width))
+    for top in range(0, height, rows):
+        band = pixels[top:top + rows]
+        color = band[:, :, :in_channels]
+        for stage in stages:
+            color = stage(color)
+        result[top:top + rows, :, :channels] = color
+        if alpha:
+            result[top:top + rows, :, channels] = band[:, :, in_channels]
+
+    return Image.fromarray(result[:, :, 0] if result.shape[2] == 1 else result)
+
+
+def _fuse(filters, channels, alpha):
+    """
+    Fasst POINT- und MATRIX-Filter zu möglichst wenigen Schritten zusammen.
+
+    Args:
+        filters: Filter der Kette (nur POINT und MATRIX)
+        channels (int): Farbkanäle des Eingangsbildes (1 oder 3)
+        alpha (bool): Ob das Eingangsbild einen Alphakanal hat
+
+    Returns:
+        tuple: (Schritte, Farbkanäle, Alphakanal) - jeder Schritt ist eine
+               Funktion uint8 (Zeilen, Breite, Kanäle) -> uint8 (Zeilen, Breite, Kanäle)
+    """
+    steps = []  # (Art, Daten): "lut" (256,), "table" (256, Kanäle) oder "pixels" (Filter)
+    for filter in filters:
+        alpha = alpha and filter.keep_alpha
+        if steps and steps[-1][0] == "table":
+            # Eingang hat einen Kanal: Filter gleich auf die Tabelle anwenden
+            table = _apply_to_values(filter, steps[-1][1])
+            steps[-1] = ("table", table)
+            channels = table.shape[1]
+        elif channels == 1:
+            table = _apply_to_values(filter, np.arange(256, dtype=np.uint8)[:, None])
+            steps.append(("table", table))
+            channels = table.shape[1]
+        elif filter.kind == POINT and steps and steps[-1][0] == "lut":
+            steps[-1] = ("lut", filter.lut[steps[-1][1]])  # Zwei Tabellen verketten
+        elif filter.kind == POINT:
+            steps.append(("lut", filter.lut))
+        else:
+            steps.append(("pixels", filter))
+            channels = filter.channels
+
+    stages = []
+    for kind, data in steps:
+        if kind == "lut":
+            stages.append(lambda color, lut=data: lut[color])
+        elif kind == "table":
+            stages.append(lambda color, table=data: np.take(table, color[:, :, 0], axis=0))
+        else:
+            stages.append(data.pixels)
+    return stages, channels, alpha
+
+
+def _apply_to_values(filter, values):
+    """
+    Wendet einen POINT- oder MATRIX-Filter auf eine Liste von Farbwerten an.
+
+    Args:
+        filter (Filter): Anzuwendender Filter
+        values (np.ndarray): uint8-Array (Anzahl, Kanäle) mit 1 oder 3 Kanälen
+
+    Returns:
+        np.ndarray: uint8-Array (Anzahl, Kanäle des Ergebnisses)
+    """
+    if filter.kind == POINT:
+        return filter.lut[values]
+    if values.shape[1] == 1:
+        # Wie convert("RGB") bei Graustufenbildern: Grauwert in alle drei Kanäle
+        values = np.repeat(values, 3, axis=1)
+    return filter.pixels(values)
+
+
+register(Filter("Aufhellen", POINT, aufhellen,
+                message="Die Helligkeit wurde um 50% erhöht."))
+register(Filter("Abdunkeln", POINT, abdunkeln,
+                message="Die Helligkeit wurde um 50% verringert."))
+register(Filter("Schwarz-Weiß", MATRIX, schwarz_weiss, pixels=grayscale_rgb, channels=1,
+                keep_alpha=False, message="Das Bild ist nun in Schwarz-Weiß."))
+register(Filter("Sepia", MATRIX, sepia, pixels=sepia_rgb,
+                message="Das Bild hat nun einen Sepia-Ton."))
+register(Filter("Verpixeln", NEIGHBOURHOOD, pixelate, halo=5,      # BoxBlur(5)
+                message="Das Bild ist nun verpixelt."))
+register(Filter("Schärfen", NEIGHBOURHOOD, sharpen, halo=6,        # UnsharpMask: 3 Box-Durchläufe mit Radius 2
+                message="Das Bild ist nun geschärft."))
+register(Filter("Drehen", GEOMETRY, turn_image))
+register(Filter("Spiegeln", GEOMETRY, mirror_image))
@@ -2,6 +2,8 @@ import cv2
 from PIL import ImageDraw
 import numpy as np
 
+OUTLINE_WIDTH = 3  # Linienstärke der Gesichtsmarkierung in Pixeln (bei voller Auflösung)
+
 def detect_faces(image):
     """
     Erkennt Gesichter im Bild und gibt die bearbeiteten Koordinaten zurück.
@@ -39,7 +41,7 @@ def detect_faces(image):
     return faces
 
 
-def mark_faces(image, faces):
+def mark_faces(image, faces, scale=1.0):
     """
     Markiert erkannte Gesichter im Bild durch das Zeichnen von Rechtecken.
 
@@ -48,6 +50,8 @@ def mark_faces(image, faces):
         faces (list): Eine Liste von Koordinaten der erkannten Gesichter.
                       Jedes Gesicht wird durch ein Rechteck repräsentiert:
                       (x, y, Breite, Höhe).
+        scale (float): Maßstab des Bildes relativ zum Original (z. B. 0.2 für eine
+                       Vorschau); die Linienstärke wird entsprechend verkleinert.
 
     Returns:
         PIL.Image.Image: Das Bild mit Rechtecken um die erkannten Gesichter.
@@ -61,6 +65,6 @@ def mark_faces(image, faces):
 
     #Zeichne Rechtecke um jedes erkannte Gesicht
     for (x, y, w, h) in faces:
-        draw.rectangle([x, y, x+w, y+h], outline="red", width=3)
+        draw.rectangle([x, y, x+w, y+h], outline="red", width=max(1, round(OUTLINE_WIDTH * scale)))
 
     return image
\ No newline at end of file
@@ -0,0 +1,147 @@
+#############################
+# Vergleich von Original und Trägerbild (ohne GUI)
+# Gruppe: B2-4
+##############################
+
+"""
+Zählt die Unterschiede zwischen Original und Bild mit versteckten Daten.
+
+Der Vergleich läuft streifenweise direkt auf den uint8-Werten: Pro Streifen
+wird original ^ encoded gebildet, die Anzahl gesetzter Bits liefert
+np.bitwise_count (Popcount). Daraus entstehen exakte Zählwerte (geänderte
+Pixel, Kanal-Bytes, Bits und Bits pro Bitebene) sowie ein Raster mit den
+geänderten Bits je Block. Alle Zwischenergebnisse in Bildgröße bleiben uint8;
+Bitebenen werden nur gezählt, wenn sie im Streifen überhaupt vorkommen (bei
+LSB-Einbettung also nur die unteren k Ebenen).
+
+Blockgröße und Vorschau werden so gewählt, dass das Raster höchstens
+DIFF_CELLS und die Vorschaubilder höchstens THUMBNAIL_SIZE Pixel pro Achse
+haben. An Matplotlib gehen damit unabhängig von der Bildgröße nur kleine
+Arrays, und im Speicher liegt vom Trägerbild immer nur ein Streifen.
+"""
+
+import numpy as np
+
+from logic import png_stream
+
+DIFF_CELLS = 256       # Maximale Kantenlänge des Rasters (Blöcke pro Achse)
+THUMBNAIL_SIZE = 512   # Maximale Kantenlänge der Vorschaubilder
+
+class ImageDiff:
+    """
+    Unterschiede zweier gleich großer Bilder, streifenweise gezählt.
+
+    Args:
+        height (int): Bildhöhe
+        width (int): Bildbreite
+        channels (int): Anzahl Kanäle
+        cells (int): Maximale Anzahl Blöcke pro Achse
+        thumbnail (int): Maximale Kantenlänge der Vorschaubilder
+    """
+
+    def __init__(self, height, width, channels, cells=DIFF_CELLS, thumbnail=THUMBNAIL_SIZE):
+        self.height, self.width, self.channels = height, width, channels
+        self.block = max(1, -(-max(height, width) // cells))
+        self.step = max(1, -(-max(height, width) // thumbnail))
+        self.changed_pixels = 0
+        self.changed_values = 0
+        self.bit_planes = np.zeros(8, dtype=np.int64)  # Geänderte Bits je Bitebene (0 = LSB)
+        self.grid = np.zeros((-(-height // self.block), -(-width // self.block)), dtype=np.int64)
+        self._columns = np.arange(0, width, self.block)
+        self._rows = 0
+        self._original = []
+        self._encoded = []
+
+    def update(self, original, encoded):
+        """
+        Vergleicht den nächsten Streifen aus höchstens block Zeilen.
+
+        Args:
+            original (np.ndarray): Zeilen des Originals (Zeilen, Breite[, Kanäle])
+            encoded (np.ndarray): Dieselben Zeilen des Trägerbildes
+
+        Raises:
+            ValueError: Wenn die Streifen nicht dieselbe Form haben
+        """
+        if original.shape != encoded.shape:
+            raise ValueError("Original und Trägerbild haben unterschiedliche Abmessungen")
+        if original.ndim == 2:
+            original, encoded = original[:, :, None], encoded[:, :, None]
+
+        first = -self._rows % self.step  # Erste Vorschauzeile in diesem Streifen
+        self._original.append(original[first::self.step, ::self.step])
+        self._encoded.append(encoded[first::self.step, ::self.step])
+
+        xor = original ^ encoded
+        self.changed_values += np.count_nonzero(xor)
+        planes = int(np.bitwise_or.reduce(xor, axis=None))
+        for bit in range(8):
+            if planes >> bit & 1:
+                self.bit_planes[bit] += np.count_nonzero(xor & (1 << bit))
+
+        # Geänderte Bits je Pixel (höchstens 32, passt in uint8)
+        counts = np.bitwise_count(xor)
+        per_pixel = counts[:, :, 0].copy()
+        for channel in range(1, self.channels):
+            per_pixel += counts[:, :, channel]
+        self.changed_pixels += np.count_nonzero(per_pixel)
+        self.grid[self._rows // self.block] += np.add.reduceat(
+            per_pixel.sum(axis=0, dtype=np.int64), self._columns
+        )
+        self._rows += len(original)
+
+    @property
+    def changed_bits(self):
+        """Gesamtzahl geänderter Bits."""
+        return int(self.bit_planes.sum())
+
+    @property
+    def total_pixels(self):
+        return self.height * self.width
+
+    @property
+    def total_values(self):
+        return self.height * self.width * self.channels
+
+    @property
+    def block_share(self):
+        """Anteil geänderter Bits je Block (bezogen auf alle Bits des Blocks)."""
+        heights = np.minimum(self.block, self.height - np.arange(self.grid.shape[0]) * self.block)
+        widths = np.minimum(self.block, self.width - self._columns)
+        return self.grid / (heights[:, None] * widths[None, :] * self.channels * 8)
+
+    @property
+    def thumbnails(self):
+        """Vorschaubilder (Original, Trägerbild), jede step-te Zeile und Spalte."""
+        return np.concatenate(self._original), np.concatenate(self._encoded)
+
+
+def compare(original, encoded_bands, cells=DIFF_CELLS, thumbnail=THUMBNAIL_SIZE):
+    """
+    Vergleicht ein Original mit einem streifenweise gelesenen Trägerbild.
+
+    Args:
+        original (np.ndarray): Pixel-Array des Originals
+        encoded_bands: Iterierbare Bänder des Trägerbildes (z. B.
+            open_carrier(...).iter_bands()) oder ein Pixel-Array
+        cells (int): Maximale Anzahl Blöcke pro Achse
+        thumbnail (int): Maximale Kantenlänge der Vorschaubilder
+
+    Returns:
+        ImageDiff: Gezählte Unterschiede
+
+    Raises:
+        ValueError: Wenn die Bilder nicht dieselben Abmessungen haben
+    """
+    if isinstance(encoded_bands, np.ndarray):
+        encoded_bands = (encoded_bands,)
+    height, width = original.shape[:2]
+    channels = 1 if original.ndim == 2 else original.shape[2]
+    diff = ImageDiff(height, width, channels, cells, thumbnail)
+    top = 0
+    for encoded in png_stream.row_strips(encoded_bands, diff.block):
+        diff.update(original[top:top + len(encoded)], encoded)
+        top += len(encoded)
+    if top != height:
+        raise ValueError("Original und Trägerbild haben unterschiedliche Abmessungen")
+    return diff
@@ -0,0 +1,140 @@
+#############################
+# Einmal geladenes Bild für alle Programmteile
+# Gruppe: B2-4
+##############################
+
+"""
+Ein ImageDocument dekodiert eine Bilddatei genau einmal und hält alles, was
+daraus abgeleitet wird: das PIL-Bild, das Pixel-Array, Vorschaubilder in
+verschiedenen Größen und berechnete Statistiken.
+
+Hauptfenster, Steganographie-Tool und LogicHandler bekommen dasselbe
+Dokument übergeben, statt die Datei jeweils selbst mit Image.open zu öffnen
+und zu dekodieren. Wer das Bild verändern möchte, holt sich mit copy() eine
+eigene Kopie - das Dokument selbst bleibt unverändert und dient damit auch
+als Stand für "Zurücksetzen".
+
+Pixel-Array und abgeleitete Werte werden erst beim ersten Zugriff berechnet,
+auch aus Hintergrund-Threads (siehe background). Ein Lock sorgt dafür, dass
+sie dabei trotzdem nur einmal berechnet werden.
+"""
+
+import os
+import threading
+
+from PIL import Image
+
+from logic import png_stream
+
+
+class ImageDocument:
+    """
+    Bilddatei, die einmal dekodiert und dann gemeinsam genutzt wird.
+
+    Args:
+        path: Pfad zur Bilddatei
+
+    Raises:
+        OSError: Wenn die Datei nicht gelesen oder dekodiert werden kann
+    """
+
+    def __init__(self, path):
+        self.path = path
+        stat = os.stat(path)
+        self.file_size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        self.image = Image.open(path)
+        self.image.load()  # Einmal dekodieren, die Datei wird danach geschlossen
+        self.format = self.image.format
+        self._pixels = None
+        self._thumbnails = {}
+        self._derived = {}
+        self._lock = threading.RLock()  # Für pixels und derived (auch aus Hintergrund-Threads)
+
+    @property
+    def width(self):
+        return self.image.width
+
+    @property
+    def height(self):
+        return self.image.height
+
+    @property
+    def mode(self):
+        return self.image.mode
+
+    @property
+    def channels(self):
+        return len(self.image.getbands())
+
+    @property
+    def pixels(self):
+        """
+        Pixel-Array in einem PNG-Modus, wie es auch die Träger-Reader liefern
+        (siehe png_stream.decode_image). Wird beim ersten Zugriff erzeugt und
+        ist schreibgeschützt, da es von allen Programmteilen geteilt wird.
+        """
+        with self._lock:
+            if self._pixels is None:
+                _mode, _palette, self._pixels = png_stream.decode_image(self.image, copy=False)
+            return self._pixels
+
+    def thumbnail(self, size):
+        """
+        Verkleinerte Kopie des Bildes (Seitenverhältnis bleibt erhalten).
+
+        Args:
+            size (tuple): Maximale Breite und Höhe
+
+        Returns:
+            PIL.Image: Vorschaubild, je Größe nur einmal berechnet
+        """
+        size = tuple(size)
+        if size not in self._thumbnails:
+            scale = min(size[0] / self.width, size[1] / self.height, 1)
+            target = (max(1, round(self.width * scale)), max(1, round(self.height * scale)))
+            # Kleinere Vorschauen aus einer vorhandenen größeren berechnen statt
+            # erneut aus dem vollen Bild
+            sources = [preview for preview in self._thumbnails.values()
+                       if preview.width >= target[0] and preview.height >= target[1]]
+            source = min(sources, key=lambda preview: preview.width, default=self.image)
+            self._thumbnails[size] = source.resize(target, Image.LANCZOS, reducing_gap=2.0)
+        return self._thumbnails[size]
+
+    def copy(self):
+        """Eigene, veränderbare Kopie des Bildes (z. B. für die Bearbeitung)."""
+        return self.image.copy()
+
+    def derived(self, name, compute):
+        """
+        Liefert einen aus dem Bild berechneten Wert und merkt ihn sich.
+
+        Args:
+            name (str): Name des Wertes, z. B. "steganalysis"
+            compute: Funktion ohne Argumente, die den Wert berechnet
+
+        Returns:
+            Ergebnis von compute() (beim ersten Aufruf berechnet)
+        """
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = compute()
+            return self._derived[name]
+
+    def is_current(self, path):
+        """
+        Prüft, ob das Dokument zur Datei path gehört und diese unverändert ist.
+
+        Args:
+            path: Pfad zur Bilddatei
+
+        Returns:
+            bool: False, wenn es eine andere Datei ist oder sie seit dem Laden geändert wurde
+        """
+        if path is None or os.path.abspath(path) != os.path.abspath(self.path):
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return stat.st_size == self.file_size and stat.st_mtime_ns == self._mtime_ns
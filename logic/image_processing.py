@@ -1,5 +1,14 @@
-from tkinter import filedialog
-from PIL import Image, ImageTk2
+import struct
+from contextlib import ExitStack
+
+import numpy as np
+from PIL import Image
+
+from logic import filter_registry
+from logic.png_stream import MODES, PNGRowWriter, open_rows, row_strips
+
+TILE_BYTES = 4 * 1024 * 1024  # Ungefähre Größe eines Streifens (ohne Rand) in Bytes
+
 
 def process_image(image, faces, func, face_mode=False):
     """
@@ -42,4 +51,142 @@ def apply_to_faces(image, faces, func):
         # Zurückkopieren des verarbeiteten Bereichs ins Bild
         processed_image.paste(processed_region, (x, y, x + w, y + h))
 
-    return processed_image
\ No newline at end of file
+    return processed_image
+
+
+def tile_halo(names):
+    """
+    Anzahl Randzeilen, die ein Streifen für eine Filterkette braucht.
+
+    Die Reichweiten hintereinander angewendeter Nachbarschaftsfilter addieren
+    sich; Punkt- und Farbfilter brauchen keinen Rand.
+
+    Args:
+        names: Filternamen in der Reihenfolge der Anwendung (siehe filter_registry)
+
+    Returns:
+        int: Benötigte Randzeilen oberhalb und unterhalb eines Streifens
+
+    Raises:
+        ValueError: Bei einem unbekannten Filter oder einem Geometriefilter,
+            der das Bild umsortiert und sich nicht streifenweise anwenden lässt
+    """
+    halo = 0
+    for name in names:
+        filter = filter_registry.get(name)
+        if filter.kind == filter_registry.GEOMETRY:
+            raise ValueError(f"'{name}' kann nicht in Streifen angewendet werden.")
+        halo += filter.halo
+    return halo
+
+
+def process_file(source, target, names, tile_bytes=TILE_BYTES, progress=None):
+    """
+    Wendet eine Filterkette auf eine Bilddatei an, ohne das Bild vollständig
+    in den Speicher zu laden.
+
+    Das Bild wird in Streifen über die volle Breite gelesen (PNG mit 8 Bit pro
+    Kanal zeilenweise, siehe png_stream.open_rows). Jeder Streifen bekommt
+    oben und unten so viele Zeilen seiner Nachbarn dazu, wie die Filter weit
+    reichen (tile_halo), wird gefiltert und ohne diesen Rand in die Zieldatei
+    geschrieben. An den Bildrändern fehlt der Rand wie beim ganzen Bild. Das
+    Ergebnis ist damit nahtlos und bitgleich zu
+    filter_registry.apply(Image.open(source), names).
+
+    Im Speicher liegen nur drei Streifen (Vorgänger, aktueller, Nachfolger).
+    Andere Formate als PNG werden wie bei png_stream.open_rows einmal
+    vollständig dekodiert und dann ebenfalls streifenweise gefiltert.
+
+    Args:
+        source: Pfad zum Ausgangsbild
+        target: Pfad der Zieldatei (wird als PNG geschrieben)
+        names: Filternamen in der Reihenfolge der Anwendung (siehe filter_registry)
+        tile_bytes (int): Ungefähre Größe eines Streifens in Bytes
+        progress: Funktion progress(fertige Zeilen, Zeilen gesamt) oder None.
+            Sie darf eine Exception werfen, um die Verarbeitung abzubrechen.
+
+    Returns:
+        dict: Größe, Modus, Randzeilen und Anzahl der Streifen
+
+    Raises:
+        ValueError: Bei einem nicht streifenweise anwendbaren Filter oder
+            wenn das Ergebnis nicht als PNG gespeichert werden kann
+    """
+    halo = tile_halo(names)
+    with Image.open(source) as img:
+        transparency = img.info.get("transparency")  # Nur Kopfdaten, keine Pixel
+
+    with open_rows(source) as reader, ExitStack() as stack:
+        writer = None
+        tiles = done = 0
+        for result, pixels in _filtered_strips(reader, names, halo, transparency, tile_bytes):
+            if writer is None:
+                # Modus und Palette des Ergebnisses kennt erst der erste gefilterte Streifen
+                writer = stack.enter_context(_tile_writer(target, result, reader))
+            writer.write(pixels)
+            tiles += 1
+            done += len(pixels)
+            if progress is not None:
+                progress(done, reader.height)
+
+    return {
+        "width": reader.width,
+        "height": reader.height,
+        "mode": writer.mode,
+        "halo": halo,
+        "tiles": tiles,
+    }
+
+
+def _filtered_strips(reader, names, halo, transparency, tile_bytes):
+    """
+    Liest das Bild in Streifen und filtert jeden Streifen mit Randzeilen.
+
+    Yields:
+        tuple: (gefiltertes PIL-Bild mit Rand, uint8-Array der Streifenzeilen ohne Rand)
+    """
+    rows = max(1, halo, tile_bytes // max(1, reader.width * reader.channels))
+    strips = row_strips(reader.iter_bands(), rows)
+    previous, current = None, next(strips, None)
+    while current is not None:
+        following = next(strips, None)
+        before = previous[len(previous) - halo:] if previous is not None else current[:0]
+        after = following[:halo] if following is not None else current[:0]
+        tile = _tile_image(np.concatenate([before, current, after]),
+                           reader.mode, reader.palette, transparency)
+        result = filter_registry.apply(tile, names)
+        yield result, np.asarray(result)[len(before):len(before) + len(current)]
+        previous, current = current, following
+
+
+def _tile_image(pixels, mode, palette, transparency):
+    """Erzeugt aus einem Streifen ein PIL-Bild mit denselben Eigenschaften wie das ganze Bild."""
+    tile = Image.frombytes(mode, (pixels.shape[1], pixels.shape[0]), pixels)  # Ohne Kopie über den Puffer
+    if palette:
+        tile.putpalette(palette)
+    if transparency is not None:
+        tile.info["transparency"] = transparency
+    return tile
+
+
+def _tile_writer(target, result, reader):
+    """Öffnet die Zieldatei passend zum Modus des ersten gefilterten Streifens."""
+    if result.mode not in MODES:
+        raise ValueError(f"Bildmodus {result.mode} kann nicht streifenweise gespeichert werden")
+    palette = bytes(result.getpalette()) if result.mode == "P" else None
+    return PNGRowWriter(target, reader.width, reader.height, result.mode,
+                        palette=palette, transparency=_transparency_chunk(result))
+
+
+def _transparency_chunk(image):
+    """Inhalt des tRNS-Chunks für die Transparenzangabe eines Bildes (wie beim Speichern mit Pillow)."""
+    value = image.info.get("transparency")
+    if value is None:
+        return None
+    if image.mode == "L":
+        return struct.pack(">H", value)
+    if image.mode == "RGB":
+        return struct.pack(">HHH", *value)
+    if image.mode == "P":
+        return value if isinstance(value, bytes) else b"\xff" * value + b"\x00"
+    return None  # LA und RGBA: Transparenz steckt im Alphakanal
@@ -1,161 +1,236 @@
 from logic.gesichtserkennung import detect_faces, mark_faces
 from PIL import Image, ImageTk
-from logic.drehen import turn_image
-from logic.spiegeln import mirror_image
-from logic.pixelate import pixelate
-from logic.sharpen import sharpen
-from logic.schwarz_weiss import schwarz_weiss
-from logic.sepia import sepia
-from logic.aufhellen import aufhellen
-from logic.abdunkeln import abdunkeln
+from logic import edit_history, filter_registry
 from logic.selection import SelectionHandler
 from logic.set_filter import FilterHandler
 
 ''' 
 Eine Klasse zur Verwaltung der Logik für die Bildbearbeitung in einer GUI-Anwendung.
 Diese Klasse steuert verschiedene Bearbeitungsfunktionen wie Gesichtserkennung, Filteranwendung, usw.
+
+Bearbeitet wird in zwei Auflösungen: Das Originalbild (master) bleibt unverändert,
+alle Bearbeitungen werden sofort auf ein Vorschaubild in Canvas-Größe (proxy)
+angewendet und in einer Liste (operations) festgehalten. Das Bild in voller
+Auflösung wird erst beim Speichern berechnet (render), aufeinanderfolgende
+Filter dabei in einem Durchlauf (siehe filter_registry.apply).
+Feste Pixelradien (Verpixeln, Schärfen, Linienstärke der Gesichtsmarkierung)
+werden in der Vorschau mit preview_scale verkleinert, damit sie so aussieht
+wie das gespeicherte Bild. Pixelgenau gleich ist sie dadurch nicht, da das
+Vorschaubild selbst verkleinert ist.
+Über den Bearbeitungsverlauf (siehe edit_history) lassen sich Bearbeitungen
+rückgängig machen und wiederholen.
 '''
 
 class LogicHandler:
-    def __init__(self, canvas, update_info):
+    def __init__(self, canvas, update_info, history_budget=edit_history.HISTORY_BUDGET):
         '''
         Initialisiert den LogicHandler.
         Args:
             canvas: Das Canvas-Widget der GUI, auf dem Bilder angezeigt werden.
             update_info: Eine Funktion, die Statusinformationen in der GUI aktualisiert.
+            history_budget: Speicher für die Checkpoints des Bearbeitungsverlaufs in Bytes.
         '''
         self.canvas = canvas
-        self.image = None
+        self.master = None      # Originalbild in voller Auflösung (wird nie verändert)
+        self.proxy = None       # Vorschaubild in Canvas-Größe mit allen Bearbeitungen
+        self.history = None     # Bearbeitungsverlauf des Vorschaubildes
+        self.preview_scale = 1.0  # Größe des Vorschaubildes relativ zum Original
+        self.history_budget = history_budget
+        self._rendered = None   # Zuletzt berechnetes Bild in voller Auflösung
+        self._rendered_count = 0  # Anzahl der darin enthaltenen Bearbeitungen
         self.faces = None
         self.image_display = None
         self.update_info = update_info
         # Initialisierung der Hilfsklassen:
         self.selection_handler = SelectionHandler(canvas, self.update_info)
         self.filter_handler = FilterHandler(canvas, self.update_info, self.update_canvas, self.selection_handler)
-        self.filter_applied = False
+
+    @property
+    def operations(self):
+        '''Die aktuell angewendeten Bearbeitungen seit dem Laden, siehe render.'''
+        return self.history.applied if self.history else []
     
     def set_image(self, image):
         '''
-        Setzt das Bild, das bearbeitet werden soll.
+        Setzt das Bild, das bearbeitet werden soll, und verwirft alle bisherigen Bearbeitungen.
 
         Args:
-            image: Ein PIL.Image-Objekt, das gesetzt und angezeigt werden soll.
+            image: Ein PIL.Image-Objekt in voller Auflösung. Es wird nicht verändert.
         '''
-        self.image = image
-        self.selection_handler.set_image(image)
-        self.filter_handler.set_image(image)
+        self.master = image
+        self._rendered = None
+        self._rendered_count = 0
+        canvas_width = self.canvas.winfo_width() or 600
+        canvas_height = self.canvas.winfo_height() or 400
+        self._set_proxy(self._scaled(image, (canvas_width, canvas_height)))
+        self.preview_scale = self.proxy.width / image.width
+        self.history = edit_history.EditHistory(
+            self.proxy, lambda proxy, operations: self._replay(proxy, operations, self.preview_scale),
+            budget=self.history_budget)
         self.update_canvas()
 
+    def _scaled(self, image, size):
+        '''
+        Verkleinert ein Bild wie Image.thumbnail, ohne das Original zu verändern.
+
+        Args:
+            image: PIL.Image-Objekt
+            size: Maximale Größe (Breite, Höhe)
+
+        Returns:
+            PIL.Image.Image: Neues Bild, höchstens size groß (nie vergrößert)
+        '''
+        if image.width <= size[0] and image.height <= size[1]:
+            return image.copy()  # Das Vorschaubild wird von Bereichsfiltern direkt verändert
+        factor = min(size[0] / image.width, size[1] / image.height)
+        target = (max(1, round(image.width * factor)), max(1, round(image.height * factor)))
+        # reducing_gap: erst grob per reduce() verkleinern, dann LANCZOS (wie thumbnail)
+        return image.resize(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    def _set_proxy(self, proxy):
+        '''Setzt das Vorschaubild, auf dem auch Auswahl und Bereichsfilter arbeiten.'''
+        self.proxy = proxy
+        self.selection_handler.set_image(proxy)
+        self.filter_handler.set_image(proxy)
+
     def update_canvas(self):
         '''
-        Aktualisiert die Anzeige im Canvas mit dem aktuellen Bild.
-        Passt die Bildgröße an die Canvas-Dimensionen an.
+        Aktualisiert die Anzeige im Canvas mit dem Vorschaubild.
         '''
-        if self.image:
-            canvas_width = self.canvas.winfo_width() or 600
-            canvas_height = self.canvas.winfo_height() or 400
-            self.image.thumbnail((canvas_width, canvas_height), Image.Resampling.LANCZOS)
-            self.image_display = ImageTk.PhotoImage(self.image)
+        if self.proxy:
+            self.image_display = ImageTk.PhotoImage(self.proxy)
             self.canvas.delete("all")
             self.canvas.create_image(0, 0, anchor="nw", image=self.image_display)
             self.canvas.image = self.image_display
 
+    def _relative(self, box):
+        '''Rechnet einen Bereich (x1, y1, x2, y2) im Vorschaubild in Anteile der Bildgröße um.'''
+        x1, y1, x2, y2 = box
+        return (x1 / self.proxy.width, y1 / self.proxy.height,
+                x2 / self.proxy.width, y2 / self.proxy.height)
+
+    def _record(self, operation):
+        '''Nimmt eine Bearbeitung, die schon auf das Vorschaubild angewendet wurde, in den Verlauf auf.'''
+        if self.history.position < self._rendered_count:
+            self._rendered = None  # Enthält rückgängig gemachte Bearbeitungen, die jetzt verworfen werden
+        self.history.record(operation, self.proxy)
+
+    def render(self):
+        '''
+        Liefert das bearbeitete Bild in voller Auflösung.
+
+        Die Bearbeitungen werden erst hier auf das Originalbild angewendet.
+        Das Ergebnis wird gemerkt; beim nächsten Aufruf werden nur neue
+        Bearbeitungen nachgeholt.
+
+        Returns:
+            PIL.Image.Image: Bearbeitetes Bild (oder None, wenn kein Bild geladen ist)
+        '''
+        if self.master is None:
+            return None
+        if self._rendered is None or self._rendered_count > len(self.operations):
+            # Noch nichts berechnet oder seitdem Bearbeitungen rückgängig gemacht
+            self._rendered, self._rendered_count = self.master, 0
+        self._rendered = self._replay(self._rendered, self.operations[self._rendered_count:])
+        self._rendered_count = len(self.operations)
+        return self._rendered
+
+    def _replay(self, image, operations, scale=1.0):
+        '''
+        Wendet aufgezeichnete Bearbeitungen auf ein Bild beliebiger Größe an.
+
+        Bereiche und Gesichter sind als Anteile der Bildgröße gespeichert und
+        passen daher sowohl auf das Vorschaubild als auch auf das Original.
+
+        Args:
+            image: PIL.Image-Objekt (wird nicht verändert)
+            operations: Liste der Bearbeitungen, siehe operations
+            scale: Maßstab des Bildes relativ zum Original (preview_scale für die Vorschau)
+
+        Returns:
+            PIL.Image.Image: Bild mit allen Bearbeitungen
+        '''
+        source = image
+        start = 0
+        while start < len(operations):
+            kind = operations[start][0]
+            if kind == "filter":
+                # Aufeinanderfolgende Filter in einem Aufruf (Punkt- und Farbfilter zusammengefasst)
+                end = start
+                while end < len(operations) and operations[end][0] == "filter":
+                    end += 1
+                image = filter_registry.apply(image, [operation[1] for operation in operations[start:end]],
+                                              scale=scale)
+                start = end
+                continue
+            if image is source:
+                image = image.copy()  # Das übergebene Bild wird nie verändert
+            if kind == "area":
+                _kind, filter_name, (x1, y1, x2, y2) = operations[start]
+                box = (round(x1 * image.width), round(y1 * image.height),
+                       round(x2 * image.width), round(y2 * image.height))
+                image.paste(filter_registry.apply(image.crop(box), [filter_name], scale=scale), box)
+            elif kind == "faces":
+                faces = [(round(x * image.width), round(y * image.height),
+                          round(w * image.width), round(h * image.height))
+                         for x, y, w, h in operations[start][1]]
+                image = mark_faces(image, faces, scale=scale)
+            start += 1
+        return image
+
     def detect_faces(self):
         '''Führt die Gesichtserkennung durch und markiert erkannte Gesichter.'''
         try:
-            if self.image:
-                self.faces = detect_faces(self.image)
-                self.image = mark_faces(self.image.copy(), self.faces)
+            if self.proxy:
+                self.faces = detect_faces(self.proxy)
+                self._set_proxy(mark_faces(self.proxy.copy(), self.faces, scale=self.preview_scale))
+                # Gesichter als Anteile der Bildgröße merken (für render)
+                self._record(("faces", [
+                    (x / self.proxy.width, y / self.proxy.height,
+                     w / self.proxy.width, h / self.proxy.height)
+                    for x, y, w, h in self.faces
+                ]))
                 self.update_canvas()
         except Exception as e: 
             print(f"Fehler: {e}")       #Fehlermeldung im Terminal bei fehlgeschlagener Gesichtserkennung
             self.update_info("Es wurden keine Gesichter erkannt.")
 
-    def turn_image(self):
-        '''Dreht das gesamte Bild um 90 Grad im Uhrzeigersinn'''
-        if self.image:
-            self.image = turn_image(self.image)
-            self.filter_applied = True
-            self.update_canvas()
-
-    def mirror_image(self):
-        '''Spiegelt das Bild'''
-        if self.image:
-            self.image = mirror_image(self.image)
-            self.filter_applied = True
-            self.update_canvas()
-            
-    def pixelate(self):
-        '''Verpixelt das Bild'''
-        if self.image: 
-            self.image = pixelate(self.image)
-            self.filter_applied = True
-            self.update_canvas()
-            self.update_info("Das Bild ist nun verpixelt.")
-            
-    def sharpen(self):
-        '''Schärft das Bild'''
-        if self.image:
-            self.image = sharpen(self.image)
-            self.filter_applied = True
-            self.update_canvas()
-            self.update_info("Das Bild ist nun geschärft.")
-        else:
-            self.update_info("Es wurde noch kein Bild geladen.")
-
-    def schwarz_weiss(self):
-        '''
-        Wendet einen Schwarz-Weiß-Filter auf das Bild an, falls ein Bild geladen ist.
-        Aktualisiert anschließend die Benutzeroberfläche und zeigt entsprechende Informationen an.
+    def apply_filter(self, filter_name):
         '''
-        if self.image:
-            self.image = schwarz_weiss(self.image)
-            self.filter_applied = True
-            self.update_canvas()
-            self.update_info("Das Bild ist nun in Schwarz-Weiß.")
-        else:
-            self.update_info("Es wurde noch kein Bild geladen.")
+        Wendet einen Filter aus der Filter-Registry auf das gesamte Bild an.
+        Die Vorschau wird sofort aktualisiert, das Originalbild erst beim Speichern (siehe render).
 
-    def sepia(self):
-        '''
-        Wendet einen Sepia-Filter auf das aktuell geladene Bild an.
-        Aktualisiert anschließend die Benutzeroberfläche und zeigt entsprechende Informationen an.
+        Args:
+            filter_name: Name des Filters, z. B. "Sepia" oder "Drehen" (siehe filter_registry)
         '''
-        if self.image:
-            self.image = sepia(self.image)
-            self.filter_applied = True
+        if self.proxy:
+            self._set_proxy(filter_registry.apply(self.proxy, [filter_name], scale=self.preview_scale))
+            self._record(("filter", filter_name))
             self.update_canvas()
-            self.update_info("Das Bild hat nun einen Sepia-Ton.")
+            message = filter_registry.get(filter_name).message
+            if message:
+                self.update_info(message)
         else:
             self.update_info("Es wurde noch kein Bild geladen.")
 
-    def aufhellen(self):
-        '''
-        Erhöht die Helligkeit des aktuell geladenen Bildes um 50%.
-        Aktualisiert anschließend  die Benutzeroberfläche und zeigt entsprechende Informationen an.
-        '''
-        if self.image:
-            self.image= aufhellen(self.image)
-            self.filter_applied = True
-            self.update_canvas()
-            self.update_info("Die Helligkeit wurde um 50% erhöht.")
-        else:
-            self.update_info("Es wurde noch kein Bild geladen.")
+    def undo(self):
+        '''Macht die letzte Bearbeitung rückgängig (vom nächsten Checkpoint aus neu berechnet).'''
+        if not self.history or not self.history.can_undo:
+            self.update_info("Es gibt keine Bearbeitung, die rückgängig gemacht werden kann.")
+            return
+        self._set_proxy(self.history.undo())
+        self.update_canvas()
+        self.update_info("Die letzte Bearbeitung wurde rückgängig gemacht.")
+
+    def redo(self):
+        '''Wiederholt die zuletzt rückgängig gemachte Bearbeitung.'''
+        if not self.history or not self.history.can_redo:
+            self.update_info("Es gibt keine Bearbeitung, die wiederholt werden kann.")
+            return
+        self._set_proxy(self.history.redo(self.proxy))
+        self.update_canvas()
+        self.update_info("Die Bearbeitung wurde wiederholt.")
 
-            
-    def abdunkeln(self):
-        '''
-        Erniedrigt die Helligkeit des aktuell geladenen Bildes um 50%.
-        Aktualisiert anschließend  die Benutzeroberfläche und zeigt entsprechende Informationen an.
-        '''
-        if self.image:
-            self.image = abdunkeln(self.image)
-            self.filter_applied = True
-            self.update_canvas()
-            self.update_info("Die Helligkeit wurde um 50% verringert.")
-        else:
-            self.update_info("Es wurde noch kein Bild geladen.")
-     
     def start_selection(self, event):
         '''Startet die Auswahl eines Bereichs'''
         self.selection_handler.start_selection(event)
@@ -171,24 +246,19 @@ class LogicHandler:
 
     def set_filter(self, filter_name):
         '''Setzt den Filter, der auf den ausgewählten Bereich angewendet werden soll'''
-        if self.image:
+        if self.proxy:
             if self.selection_handler.rect_id:
                 # Wenn ein Auswahlbereich existiert, wird der Filter auf diesen Bereich angewendet
-                if self.filter_applied:
-                    self.update_info(f"Ein Filter oder eine Modifikation wurde bereits auf das gesamte Bild angewendet. Du kannst keinen Bereichsfilter mehr anwenden. Falls du einen Bereichsfilter mit einer Bildfilter oder -modifikation kombinieren möchtest, wende zuerst den Bereichsfilter an.")
-                    
-                    # Wenn ein Auswahlrechteck existiert, wird es gelöscht
+                area = self.filter_handler.select_filter(filter_name, scale=self.preview_scale)
+                if area:
+                    # Bereich als Anteile der Bildgröße merken (für render)
+                    self._record(("area", filter_name, self._relative(area)))
+                self.update_canvas()
+                self.update_info(f"Filter '{filter_name}' wurde auf den ausgewählten Bereich angewendet.")
+                # Wenn ein Auswahlrechteck existiert, wird es gelöscht
+                if self.selection_handler.rect_id:
                     self.canvas.delete(self.selection_handler.rect_id)
-                    self.selection_handler.rect_id = None 
-                else:
-                    # Filter anwenden, wenn noch kein globaler Filter angewendet wurde
-                    self.filter_handler.select_filter(filter_name)
-                    self.update_canvas()
-                    self.update_info(f"Filter '{filter_name}' wurde auf den ausgewählten Bereich angewendet.")
-                    # Wenn ein Auswahlrechteck existiert, wird es gelöscht
-                    if self.selection_handler.rect_id:
-                        self.canvas.delete(self.selection_handler.rect_id)
-                        self.selection_handler.rect_id = None
+                    self.selection_handler.rect_id = None
             else:
                 # Wenn kein Auswahlbereich existiert, wird eine Fehlermeldung angezeigt
                 self.update_info(f"Der Filter '{filter_name}' konnte nicht angewendet werden, da kein Bereich ausgewählt wurde.")
@@ -8,6 +8,38 @@
 
 from PIL import ImageFilter
 
-def pixelate(image):
-    '''Verpixelt das gesamte Bild.'''
-    return image.filter(ImageFilter.BoxBlur(5))
\ No newline at end of file
+RADIUS = 5  # Radius des Box-Filters in Pixeln (bei voller Auflösung)
+
+def pixelate(image, scale=1.0):
+    '''
+    Verpixelt das gesamte Bild.
+
+    scale: Maßstab des Bildes relativ zum Original (z. B. 0.2 für eine Vorschau),
+    der Radius wird entsprechend verkleinert (siehe scaled_radius).
+    '''
+    radius = RADIUS if scale == 1 else scaled_radius(scale)
+    return image.filter(ImageFilter.BoxBlur(radius))
+
+def _box_variance(radius):
+    '''Varianz des Box-Filters von PIL (Randpixel mit dem Nachkommaanteil gewichtet).'''
+    whole = int(radius)
+    part = radius - whole
+    return (whole * (whole + 1) * (2 * whole + 1) / 3 + 2 * part * (whole + 1) ** 2) / (2 * radius + 1)
+
+def scaled_radius(scale):
+    '''
+    Radius, mit dem ein um scale verkleinertes Bild so stark verwischt wird wie das Original mit RADIUS.
+
+    Nicht einfach RADIUS * scale: Bei Radien um 1 verwischt der Box-Filter
+    deutlich stärker als sein Radius vermuten lässt. Stattdessen wird die
+    Standardabweichung des Filters mit scale verkleinert (Bisektion über die Varianz).
+    '''
+    target = _box_variance(RADIUS) * scale ** 2
+    low, high = 0.0, float(RADIUS)
+    for _ in range(40):
+        middle = (low + high) / 2
+        if _box_variance(middle) < target:
+            low = middle
+        else:
+            high = middle
+    return low
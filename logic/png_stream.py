@@ -0,0 +1,441 @@
+#############################
+# Zeilenweises Lesen und Schreiben von PNG-Dateien
+# Gruppe: B2-4
+##############################
+
+"""
+Liest und schreibt PNG-Bilder bandweise, ohne das komplette Bild im Speicher
+zu halten.
+
+Die IDAT-Daten werden mit zlib schrittweise entpackt. Die PNG-Zeilenfilter
+(Sub, Up, Average, Paeth) macht anschließend der C-Decoder von Pillow
+rückgängig: Jedes Band wird dafür als eigener zlib-Strom (Level 0) an
+Image.frombytes(..., 'zip') übergeben. Damit die Filter der ersten Bandzeile
+auf die richtige Vorgängerzeile zugreifen, wird die zuletzt dekodierte Zeile
+ungefiltert vorangestellt und danach wieder entfernt.
+
+Der Speicherbedarf hängt nur von der Bandgröße ab, nicht von der Bildgröße.
+Wird das Lesen abgebrochen, werden die restlichen Zeilen nie entpackt.
+
+PNGRowWriter schreibt Bänder mit dem vektorisierten Sub-Filter direkt in
+einen laufenden zlib-Strom und gibt IDAT-Chunks aus, sobald sie voll sind.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+from PIL import Image
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+BAND_BYTES = 4 * 1024 * 1024   # Ungefähre Größe eines Bandes in Bytes
+READ_SIZE = 64 * 1024          # Blockgröße beim Lesen der IDAT-Chunks
+IDAT_SIZE = 64 * 1024          # Maximale Größe eines geschriebenen IDAT-Chunks
+
+# PNG-Farbtyp -> (PIL-Modus, Anzahl Kanäle)
+COLOR_TYPES = {
+    0: ('L', 1),
+    2: ('RGB', 3),
+    3: ('P', 1),
+    4: ('LA', 2),
+    6: ('RGBA', 4),
+}
+MODES = {mode: (color_type, channels) for color_type, (mode, channels) in COLOR_TYPES.items()}
+
+
+class PNGRowReader:
+    """
+    Liest ein PNG (8 Bit pro Kanal, nicht interlaced) Band für Band.
+
+    Die gelieferten Arrays haben dieselbe Form und Kanalreihenfolge wie
+    np.array(Image.open(path)), nur eben für einen Ausschnitt von Zeilen.
+
+    Raises:
+        ValueError: Wenn die Datei kein unterstütztes PNG ist
+    """
+
+    def __init__(self, path, band_bytes=BAND_BYTES):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._read_header()
+        except Exception:
+            self._file.close()
+            raise
+        self.rows_per_band = max(1, band_bytes // self._stride)
+
+    def _read_header(self):
+        """Liest Signatur und IHDR-Chunk und prüft, ob das Format unterstützt wird."""
+        if self._file.read(8) != PNG_SIGNATURE:
+            raise ValueError("Keine PNG-Datei")
+        length, chunk_type = struct.unpack('>I4s', self._file.read(8))
+        if chunk_type != b'IHDR' or length != 13:
+            raise ValueError("Ungültiger PNG-Header")
+        (self.width, self.height, bit_depth, color_type,
+         _compression, _filter, interlace) = struct.unpack('>IIBBBBB', self._file.read(13))
+        self._file.read(4)  # CRC
+
+        if bit_depth != 8 or color_type not in COLOR_TYPES or interlace != 0:
+            raise ValueError("PNG-Variante wird nicht zeilenweise unterstützt")
+
+        self.mode, self.channels = COLOR_TYPES[color_type]
+        self._stride = self.width * self.channels + 1  # +1 für das Filter-Byte
+
+        # Bis zum ersten IDAT-Chunk vorspulen, Palette und Transparenz merken
+        self.palette = None
+        self.transparency = None
+        while True:
+            header = self._file.read(8)
+            if len(header) < 8:
+                raise ValueError("PNG-Datei enthält keine Bilddaten")
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type == b'IDAT':
+                self._data_offset = self._file.tell() - 8
+                break
+            if chunk_type == b'PLTE':
+                self.palette = self._file.read(length)
+                self._file.read(4)
+            elif chunk_type == b'tRNS':
+                self.transparency = self._file.read(length)
+                self._file.read(4)
+            else:
+                self._file.seek(length + 4, 1)
+
+    @property
+    def shape(self):
+        """Form des vollständigen Pixel-Arrays (wie np.array(Image.open(...)).shape)."""
+        if self.channels == 1:
+            return (self.height, self.width)
+        return (self.height, self.width, self.channels)
+
+    @property
+    def size(self):
+        """Anzahl aller Kanal-Bytes des Bildes."""
+        return self.width * self.height * self.channels
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        """Liefert das Bild Zeile für Zeile."""
+        for band in self.iter_bands():
+            yield from band
+
+    def iter_bands(self):
+        """
+        Liefert das Bild in Bändern von jeweils rows_per_band Zeilen.
+
+        Yields:
+            numpy.ndarray: Zeilenausschnitt mit Form (n, Breite[, Kanäle])
+        """
+        inflater = zlib.decompressobj()
+        pieces = self._idat_pieces()
+        tail = b''
+        previous = None  # Letzte dekodierte Zeile (ungefiltert, mit Filter-Byte 0)
+
+        for start in range(0, self.height, self.rows_per_band):
+            rows = min(self.rows_per_band, self.height - start)
+            needed = rows * self._stride
+
+            # Gefilterte Rohdaten des Bandes entpacken
+            raw = bytearray()
+            while len(raw) < needed:
+                if not tail:
+                    tail = next(pieces, None)
+                    if tail is None:
+                        raise ValueError("PNG-Datei ist unvollständig")
+                raw += inflater.decompress(tail, needed - len(raw))
+                tail = inflater.unconsumed_tail
+
+            if previous is not None:
+                raw[0:0] = previous
+                rows += 1
+
+            band = Image.frombytes(self.mode, (self.width, rows),
+                                   zlib.compress(bytes(raw), 0), 'zip', self.mode)
+            pixels = np.asarray(band)
+            if previous is not None:
+                pixels = pixels[1:]
+
+            previous = b'\x00' + pixels[-1].tobytes()
+            yield pixels
+
+    def _idat_pieces(self):
+        """Liefert den Inhalt aller IDAT-Chunks in Blöcken von READ_SIZE Bytes."""
+        self._file.seek(self._data_offset)
+        while True:
+            header = self._file.read(8)
+            if len(header) < 8:
+                return
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type == b'IEND':
+                return
+            if chunk_type != b'IDAT':
+                self._file.seek(length + 4, 1)  # Chunk inkl. CRC überspringen
+                continue
+            remaining = length
+            while remaining:
+                piece = self._file.read(min(remaining, READ_SIZE))
+                if not piece:
+                    return
+                remaining -= len(piece)
+                yield piece
+            self._file.read(4)  # CRC
+
+
+class DecodedRowReader:
+    """
+    Fallback für Formate ohne zeilenweisen Zugriff: Das Bild wird einmal
+    vollständig dekodiert, aber mit derselben Schnittstelle wie PNGRowReader.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with Image.open(path) as img:
+            self.mode, self.palette, self._pixels = decode_image(img)
+        self.transparency = None
+        self.height, self.width = self._pixels.shape[:2]
+        self.channels = MODES[self.mode][1]
+        self.rows_per_band = self.height
+
+    @property
+    def shape(self):
+        return self._pixels.shape
+
+    @property
+    def size(self):
+        return self._pixels.size
+
+    def close(self):
+        self._pixels = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        return iter(self._pixels)
+
+    def iter_bands(self):
+        yield self._pixels
+
+
+class PNGRowWriter:
+    """
+    Schreibt ein PNG (8 Bit pro Kanal) Band für Band.
+
+    Jede Zeile wird mit dem PNG-Filter "Sub" kodiert, der sich für ein ganzes
+    Band mit einer einzigen NumPy-Subtraktion berechnen lässt.
+
+    Args:
+        path: Zielpfad
+        width, height (int): Bildgröße
+        mode (str): 'L', 'LA', 'RGB', 'RGBA' oder 'P'
+        palette (bytes): Inhalt des PLTE-Chunks (nur für 'P')
+        transparency (bytes): Inhalt des tRNS-Chunks (optional)
+        compress_level (int): zlib-Kompressionsstufe (wie bei Pillow, Standard 6)
+    """
+
+    def __init__(self, path, width, height, mode, palette=None, transparency=None,
+                 compress_level=6):
+        if mode not in MODES:
+            raise ValueError(f"Bildmodus {mode} wird nicht unterstützt")
+        if mode == 'P' and not palette:
+            raise ValueError("Für Palettenbilder wird eine Palette benötigt")
+        self.width = width
+        self.height = height
+        self.mode = mode
+        color_type, self.channels = MODES[mode]
+
+        self._rows_written = 0
+        self._deflater = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+        self._file = open(path, 'wb')
+        self._file.write(PNG_SIGNATURE)
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+        if palette:
+            self._write_chunk(b'PLTE', palette)
+        if transparency:
+            self._write_chunk(b'tRNS', transparency)
+
+    def write(self, band):
+        """
+        Hängt ein Band von Zeilen an das Bild an.
+
+        Args:
+            band (numpy.ndarray): uint8-Array der Form (n, Breite[, Kanäle])
+        """
+        rows = np.asarray(band, dtype=np.uint8).reshape(-1, self.width * self.channels)
+        if self._rows_written + len(rows) > self.height:
+            raise ValueError("Mehr Zeilen als im PNG-Header angegeben")
+
+        # Filter "Sub": Differenz zum Pixel links daneben (modulo 256)
+        filtered = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 1
+        filtered[:, 1:self.channels + 1] = rows[:, :self.channels]
+        np.subtract(rows[:, self.channels:], rows[:, :-self.channels],
+                    out=filtered[:, self.channels + 1:])
+
+        self._pending += self._deflater.compress(filtered)
+        self._rows_written += len(rows)
+        self._flush_idat(IDAT_SIZE)
+
+    def close(self):
+        """Schließt den zlib-Strom ab und schreibt den IEND-Chunk."""
+        if self._file.closed:
+            return
+        try:
+            if self._rows_written != self.height:
+                raise ValueError(
+                    f"PNG unvollständig: {self._rows_written} von {self.height} Zeilen geschrieben"
+                )
+            self._pending += self._deflater.flush()
+            self._flush_idat(1)
+            self._write_chunk(b'IEND', b'')
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def _flush_idat(self, minimum):
+        """Schreibt gesammelte komprimierte Daten als IDAT-Chunks."""
+        while len(self._pending) >= minimum and self._pending:
+            data = bytes(self._pending[:IDAT_SIZE])
+            del self._pending[:IDAT_SIZE]
+            self._write_chunk(b'IDAT', data)
+
+    def _write_chunk(self, chunk_type, data):
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
+
+
+def carrier_mode(img):
+    """
+    Modus, in dem ein Bild als Träger dekodiert wird (siehe decode_image).
+
+    Benötigt nur die Kopfdaten des Bildes, die Pixel werden nicht dekodiert.
+
+    Args:
+        img: Geöffnetes PIL.Image
+
+    Returns:
+        str: Einer der PNG-Modi aus MODES
+    """
+    if img.mode in MODES:
+        return img.mode
+    return 'RGBA' if 'A' in img.getbands() else 'RGB'
+
+
+def decode_image(img, copy=True):
+    """
+    Dekodiert ein Pillow-Bild in ein Pixel-Array mit einem der PNG-Modi.
+
+    Andere Modi (z. B. CMYK oder 16 Bit) werden nach RGB bzw. RGBA konvertiert.
+
+    Args:
+        img: Geöffnetes PIL.Image
+        copy (bool): False liefert ein schreibgeschütztes Array ohne zusätzliche Kopie
+
+    Returns:
+        tuple: (Modus, Palette oder None, np.ndarray)
+    """
+    mode = carrier_mode(img)
+    if img.mode != mode:
+        img = img.convert(mode)
+    palette = bytes(img.getpalette()) if img.mode == 'P' else None
+    return img.mode, palette, np.array(img) if copy else np.asarray(img)
+
+
+def row_strips(bands, rows):
+    """
+    Fasst Bänder beliebiger Höhe zu Streifen aus genau rows Zeilen zusammen.
+
+    Nur der letzte Streifen kann kürzer sein. Liegt ein Streifen vollständig
+    in einem Band, wird eine View geliefert, sonst eine Kopie.
+
+    Args:
+        bands: Iterierbare Folge von Pixel-Arrays (z. B. iter_bands())
+        rows (int): Zeilen pro Streifen
+
+    Yields:
+        np.ndarray: Streifen aus rows Zeilen
+    """
+    pending = []
+    count = 0
+    for band in bands:
+        start = 0
+        while start < len(band):
+            if not pending and len(band) - start >= rows:
+                yield band[start:start + rows]  # View, keine Kopie
+                start += rows
+                continue
+            part = band[start:start + rows - count]
+            pending.append(part)
+            count += len(part)
+            start += len(part)
+            if count == rows:
+                strip = np.concatenate(pending)
+                pending, count = [], 0  # Bänder vor dem yield freigeben
+                yield strip
+    if pending:
+        yield np.concatenate(pending)
+
+
+def track_progress(bands, total, progress):
+    """
+    Reicht Bänder unverändert weiter und meldet nach jedem Band den Fortschritt.
+
+    Args:
+        bands: Iterierbare Folge von Pixel-Arrays
+        total (int): Gesamtzahl der Zeilen
+        progress: Funktion progress(fertige Zeilen, total) oder None. Sie darf
+            eine Exception werfen, um die Verarbeitung abzubrechen.
+
+    Yields:
+        np.ndarray: Die Bänder aus bands
+    """
+    if progress is None:
+        yield from bands
+        return
+    done = 0
+    for band in bands:
+        yield band
+        done += len(band)
+        progress(done, total)
+
+
+def open_rows(path, band_bytes=BAND_BYTES):
+    """
+    Öffnet ein Bild zum zeilenweisen Lesen.
+
+    PNG-Dateien mit 8 Bit pro Kanal werden gestreamt, alle anderen Formate
+    über Pillow vollständig dekodiert.
+
+    Args:
+        path: Pfad zum Bild
+        band_bytes (int): Ungefähre Bandgröße beim Streamen von PNG
+
+    Returns:
+        PNGRowReader oder DecodedRowReader
+    """
+    try:
+        return PNGRowReader(path, band_bytes)
+    except ValueError:
+        return DecodedRowReader(path)
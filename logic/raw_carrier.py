@@ -0,0 +1,189 @@
+#############################
+# Unkomprimierte Trägerbilder per Memory-Mapping
+# Gruppe: B2-4
+##############################
+
+"""
+Direkter Zugriff auf die Pixeldaten unkomprimierter Bildformate über np.memmap.
+
+Bei BMP (8/24 Bit, unkomprimiert), PGM/PPM (P5/P6, 8 Bit) und NumPy-Dateien
+(.npy, uint8) liegen die Pixel an einem festen Offset in der Datei. Statt das
+Bild zu dekodieren, wird dieser Bereich in den Speicher eingeblendet. Über
+Views wird daraus ein Array in derselben Zeilen- und Kanalreihenfolge wie
+np.array(Image.open(path)) - bei BMP also von oben nach unten und RGB statt BGR.
+
+Änderungen an den Views landen direkt in der Datei. Gelesen bzw. geschrieben
+werden nur die Seiten, die tatsächlich angefasst werden.
+"""
+
+import struct
+
+import numpy as np
+
+BAND_BYTES = 4 * 1024 * 1024   # Ungefähre Größe eines Bandes in Bytes
+NPY_MAGIC = b'\x93NUMPY'
+CHANNEL_MODES = {1: 'L', 2: 'LA', 3: 'RGB', 4: 'RGBA'}
+
+
+class RawCarrier:
+    """
+    Memory-Mapping eines unkomprimierten Trägerbildes.
+
+    Die Schnittstelle entspricht png_stream.PNGRowReader (width, height,
+    channels, size, iter_bands, Iteration über Zeilen). Zusätzlich liefert
+    pixels eine View auf das gesamte Bild.
+
+    Args:
+        path: Pfad zur Bilddatei
+        writable (bool): Wenn True, werden Änderungen in die Datei geschrieben
+
+    Raises:
+        ValueError: Wenn das Format nicht unterstützt wird
+    """
+
+    def __init__(self, path, writable=False, band_bytes=BAND_BYTES):
+        self.path = path
+        self.writable = writable
+        self.palette = None
+        self.transparency = None
+        mode = 'r+' if writable else 'r'
+
+        with open(path, 'rb') as f:
+            head = f.read(64)
+
+        if head.startswith(NPY_MAGIC):
+            self._map = np.load(path, mmap_mode=mode)
+            if self._map.dtype != np.uint8 or self._map.ndim not in (2, 3):
+                raise ValueError("Nur uint8-Arrays mit 2 oder 3 Dimensionen werden unterstützt")
+            self.pixels = self._map
+            self.format = 'NPY'
+        elif head[:2] in (b'P5', b'P6'):
+            self.pixels = self._map_pnm(mode)
+            self.format = 'PPM'  # Bezeichnung wie bei Pillow, auch für PGM
+        elif head[:2] == b'BM':
+            self.pixels = self._map_bmp(head, mode)
+            self.format = 'BMP'
+        else:
+            raise ValueError("Format wird nicht per Memory-Mapping unterstützt")
+
+        self.height, self.width = self.pixels.shape[:2]
+        self.channels = 1 if self.pixels.ndim == 2 else self.pixels.shape[2]
+        if self.channels not in CHANNEL_MODES:
+            raise ValueError("Nur Bilder mit 1 bis 4 Kanälen werden unterstützt")
+        self.mode = 'P' if self.palette else CHANNEL_MODES[self.channels]
+        self.rows_per_band = max(1, band_bytes // (self.width * self.channels))
+
+    def _map_pnm(self, mode):
+        """Blendet die Pixeldaten einer binären PGM- (P5) oder PPM-Datei (P6) ein."""
+        with open(self.path, 'rb') as f:
+            data = f.read(1024)
+
+        # Header: Magic, Breite, Höhe, Maximalwert - getrennt durch Leerraum/Kommentare
+        fields = []
+        pos = 2
+        while len(fields) < 3:
+            while pos < len(data) and data[pos:pos + 1].isspace():
+                pos += 1
+            if data[pos:pos + 1] == b'#':
+                while pos < len(data) and data[pos:pos + 1] not in (b'\n', b'\r'):
+                    pos += 1
+                continue
+            start = pos
+            while pos < len(data) and data[pos:pos + 1].isdigit():
+                pos += 1
+            if start == pos:
+                raise ValueError("Ungültiger PNM-Header")
+            fields.append(int(data[start:pos]))
+        width, height, maxval = fields
+        if maxval > 255:
+            raise ValueError("Nur PNM-Dateien mit 8 Bit pro Kanal werden unterstützt")
+        offset = pos + 1  # Genau ein Leerzeichen nach dem Maximalwert
+
+        channels = 3 if data[:2] == b'P6' else 1
+        shape = (height, width, channels) if channels == 3 else (height, width)
+        self._map = np.memmap(self.path, dtype=np.uint8, mode=mode, offset=offset, shape=shape)
+        return self._map
+
+    def _map_bmp(self, head, mode):
+        """Blendet die Pixeldaten einer unkomprimierten 8- oder 24-Bit-BMP-Datei ein."""
+        offset, = struct.unpack_from('<I', head, 10)
+        header_size, width, height, _planes, bits, compression = struct.unpack_from(
+            '<IiiHHI', head, 14
+        )
+        if header_size < 40 or compression != 0 or bits not in (8, 24):
+            raise ValueError("Nur unkomprimierte BMP-Dateien mit 8 oder 24 Bit werden unterstützt")
+
+        if bits == 8:
+            # Farbtabelle (BGRX) als RGB-Palette merken, z. B. für eine PNG-Ausgabe
+            colors, = struct.unpack_from('<I', head, 46)
+            colors = colors or 256
+            with open(self.path, 'rb') as f:
+                f.seek(14 + header_size)
+                table = np.frombuffer(f.read(colors * 4), dtype=np.uint8).reshape(-1, 4)
+            self.palette = table[:, 2::-1].tobytes()
+
+        channels = bits // 8
+        stride = (width * channels + 3) // 4 * 4  # Zeilen sind auf 4 Bytes aufgefüllt
+        rows = abs(height)
+        self._map = np.memmap(self.path, dtype=np.uint8, mode=mode, offset=offset,
+                              shape=(rows, stride))
+
+        pixels = self._map[:, :width * channels]
+        if height > 0:
+            pixels = pixels[::-1]  # BMP speichert die unterste Zeile zuerst
+        if channels == 3:
+            pixels = pixels.reshape(rows, width, 3)[..., ::-1]  # BGR -> RGB
+        return pixels
+
+    @property
+    def shape(self):
+        return self.pixels.shape
+
+    @property
+    def size(self):
+        return self.pixels.size
+
+    def flush(self):
+        """Schreibt geänderte Seiten zurück in die Datei."""
+        if self.writable:
+            self._map.flush()
+
+    def close(self):
+        self.flush()
+        self.pixels = None
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        return iter(self.pixels)
+
+    def iter_bands(self):
+        """
+        Liefert Views auf jeweils rows_per_band Zeilen.
+
+        Schreibzugriffe auf die Views gehen bei writable=True direkt in die Datei.
+        """
+        for start in range(0, self.height, self.rows_per_band):
+            yield self.pixels[start:start + self.rows_per_band]
+
+
+def is_raw_carrier(path):
+    """
+    Prüft, ob eine Datei per Memory-Mapping als Träger genutzt werden kann.
+
+    Args:
+        path: Pfad zur Bilddatei
+
+    Returns:
+        bool: True bei unterstütztem BMP-, PGM/PPM- oder NPY-Format
+    """
+    try:
+        RawCarrier(path).close()
+        return True
+    except (OSError, ValueError, struct.error):
+        return False
@@ -1,5 +1,10 @@
+import numpy as np  # Importiert NumPy für die Berechnung auf ganzen Pixel-Arrays.
 from PIL import ImageOps  # Importiert das Modul ImageOps aus der Pillow-Bibliothek.
 
+# Gewichte der Graustufen-Umrechnung (ITU-R 601-2) als Festkommazahlen mit 16 Nachkommabits,
+# genau wie Pillow sie bei convert("L") verwendet.
+GRAY_WEIGHTS = (19595, 38470, 7471)
+
 def schwarz_weiss(image):
     """
     Wendet einen Schwarz-Weiß-Filter auf ein Bild an.
@@ -11,4 +16,24 @@ def schwarz_weiss(image):
     PIL.Image.Image: Ein neues Bild, das in Graustufen (Schwarz-Weiß) umgewandelt wurde.
     """
     # Verwendet die Funktion 'grayscale' aus dem ImageOps-Modul, um das Bild in Graustufen umzuwandeln.
-    return ImageOps.grayscale(image)
\ No newline at end of file
+    return ImageOps.grayscale(image)
+
+def grayscale_rgb(pixels):
+    """
+    Rechnet ein Array von RGB-Werten in Graustufen um, bitgleich zu schwarz_weiss.
+
+    Wird von der Filter-Pipeline (siehe filter_registry) für einzelne Zeilenblöcke genutzt.
+
+    Parameter:
+    pixels (np.ndarray): uint8-Array der Form (..., 3).
+
+    Rückgabewert:
+    np.ndarray: uint8-Array der Form (..., 1) mit den Grauwerten.
+    """
+    wr, wg, wb = GRAY_WEIGHTS
+    gray = pixels[..., 0] * np.uint32(wr)
+    gray += pixels[..., 1] * np.uint32(wg)
+    gray += pixels[..., 2] * np.uint32(wb)
+    gray += 0x8000  # Runden
+    gray >>= 16
+    return gray.astype(np.uint8)[..., None]
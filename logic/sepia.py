@@ -1,51 +1,81 @@
+import numpy as np  # Importiert NumPy für die Berechnung auf ganzen Pixel-Arrays.
+from PIL import Image  # Importiert das Modul Image aus der Pillow-Bibliothek.
+
+# Sepia-Farbmatrix: Zeile i enthält die Gewichte von (r, g, b) für den neuen Kanal i.
+SEPIA_MATRIX = (
+    (0.393, 0.769, 0.189),  # Rot
+    (0.349, 0.686, 0.168),  # Grün
+    (0.272, 0.534, 0.131),  # Blau
+)
+
+# Anzahl Bildzeilen pro Durchgang: Die float64-Zwischenwerte bleiben damit klein,
+# auch bei sehr großen Bildern.
+BAND_ROWS = 256
+
+
 def sepia(image):
     """
     Wendet einen Sepia-Filter auf ein Bild an.
 
     Sepia ist ein Filter, der dem Bild eine warme, braune Tönung verleiht, die an alte Fotografien erinnert.
 
+    Die Farbmatrix wird mit NumPy auf ganze Zeilenblöcke angewendet statt Pixel für Pixel.
+    Gerechnet wird in float64 in derselben Reihenfolge wie die frühere Formel pro Pixel
+    (int(0.393 * r + 0.769 * g + 0.189 * b), begrenzt auf 255) - das Ergebnis ist
+    damit bitgleich. Ein vorhandener Alphakanal bleibt erhalten.
+
     Parameter:
     image (PIL.Image.Image): Ein Bildobjekt, auf das der Sepia-Filter angewendet werden soll.
 
     Rückgabewert:
-    PIL.Image.Image: Ein neues Bild mit angewendetem Sepia-Filter.
+    PIL.Image.Image: Ein neues Bild mit angewendetem Sepia-Filter (RGB, mit Transparenz RGBA).
     """
+    # Transparenz merken: Der Alphakanal wird nicht verändert und am Ende wieder angefügt.
+    alpha = None
+    if image.has_transparency_data:
+        image = image.convert("RGBA")
+        alpha = image.getchannel("A")
+
+    # Konvertiert das Bild in den "RGB"-Modus und liest die Farbwerte als Array (Höhe, Breite, 3).
+    sepia_pixels = sepia_rgb(np.asarray(image.convert("RGB")))
+
+    sepia_image = Image.fromarray(sepia_pixels, "RGB")
+    if alpha is not None:
+        sepia_image.putalpha(alpha)
 
-    # Definiert eine innere Funktion zur Berechnung der Sepia-Farbwerte eines Pixels.
-    # Die Funktion nimmt die RGB-Werte eines Pixels (r, g, b) als Eingabe
-    # und berechnet die neuen Farbwerte basierend auf der Sepia-Formel.
-    def sepia_pixel(r, g, b):
-        """
-        Berechnet die Sepia-Farbwerte für einen Pixel.
-
-        Parameter:
-        r (int): Rotwert des Pixels (0–255).
-        g (int): Grünwert des Pixels (0–255).
-        b (int): Blauwert des Pixels (0–255).
-
-        Rückgabewert:
-        tuple: Die neuen Sepia-RGB-Werte (r, g, b), begrenzt auf 255.
-        """
-        # Sepia-Berechnung für die drei Farbkanäle:
-        # tr, tg und tb sind die transformierten Farbwerte.
-        tr = int(0.393 * r + 0.769 * g + 0.189 * b)
-        tg = int(0.349 * r + 0.686 * g + 0.168 * b)
-        tb = int(0.272 * r + 0.534 * g + 0.131 * b)
-        
-        # Stellt sicher, dass die Farbwerte nicht größer als 255 sind.
-        return min(255, tr), min(255, tg), min(255, tb)
-
-    # Konvertiert das Bild in den "RGB"-Modus, falls es nicht bereits in diesem Modus ist.
-    # Der RGB-Modus wird benötigt, um die Farbwerte (r, g, b) für jeden Pixel zu verarbeiten.
-    sepia_image = image.convert("RGB")
-    
-    # Wendet die Sepia-Funktion auf jeden Pixel des Bildes an:
-    # - sepia_image.getdata() liefert eine Liste aller Pixel im Bild (als (r, g, b)-Tupel).
-    # - Für jedes Pixel wird die Funktion `sepia_pixel` aufgerufen, um die neuen Farbwerte zu berechnen.
-    sepia_data = [sepia_pixel(r, g, b) for r, g, b in sepia_image.getdata()]
-    
-    # Aktualisiert die Pixel des Bildes mit den neuen Sepia-Farbwerten.
-    sepia_image.putdata(sepia_data)
-    
     # Gibt das Bild mit dem angewendeten Sepia-Filter zurück.
     return sepia_image
+
+
+def sepia_rgb(pixels):
+    """
+    Wendet die Sepia-Farbmatrix auf ein Array von RGB-Werten an.
+
+    Wird auch von der Filter-Pipeline (siehe filter_registry) für einzelne
+    Zeilenblöcke genutzt.
+
+    Parameter:
+    pixels (np.ndarray): uint8-Array der Form (..., 3), z. B. (Höhe, Breite, 3).
+
+    Rückgabewert:
+    np.ndarray: uint8-Array derselben Form mit den Sepia-Farbwerten.
+    """
+    sepia_pixels = np.empty_like(pixels)
+
+    for top in range(0, len(pixels), BAND_ROWS):
+        band = pixels[top:top + BAND_ROWS]
+        r = band[..., 0].astype(np.float64)
+        g = band[..., 1].astype(np.float64)
+        b = band[..., 2].astype(np.float64)
+
+        # Sepia-Berechnung für die drei Farbkanäle (Summe von links nach rechts,
+        # nicht per Matrixprodukt, damit die Rundung der früheren Formel entspricht).
+        # Die Werte sind nie negativ: Abschneiden der Nachkommastellen wie int().
+        for channel, (wr, wg, wb) in enumerate(SEPIA_MATRIX):
+            value = wr * r
+            value += wg * g
+            value += wb * b
+            np.minimum(value, 255, out=value)  # Stellt sicher, dass die Farbwerte nicht größer als 255 sind.
+            sepia_pixels[top:top + BAND_ROWS, ..., channel] = value
+
+    return sepia_pixels
@@ -8,10 +8,7 @@
 # chatgpt und Copilot
 ##############################
 
-from logic.sharpen import sharpen
-from logic.pixelate import pixelate
-from logic.schwarz_weiss import schwarz_weiss
-from logic.sepia import sepia
+from logic import filter_registry
 
 class FilterHandler:
     def __init__(self, canvas, update_info, update_canvas, selection_handler):
@@ -35,12 +32,13 @@ class FilterHandler:
         '''Setzt das Bild, das bearbeitet werden soll.'''
         self.image = image
 
-    def select_filter(self, filter_name):
+    def select_filter(self, filter_name, scale=1.0):
         '''
         Wendet den ausgewählten Filter auf den markierten Bereich des Bildes an.
         
-        :param filter_name: Der Name des Filters, der angewendet werden soll. ("Verpixeln", "Schärfen", "Schwarz-Weiß", "Sepia")
-        :return: Das bearbeitete Bild nach der Anwendung des Filters
+        :param filter_name: Der Name des Filters aus der Filter-Registry, z. B. "Verpixeln", "Schärfen", "Schwarz-Weiß", "Sepia"
+        :param scale: Maßstab des Bildes relativ zum Original (Vorschau), siehe filter_registry.apply
+        :return: Der bearbeitete Bereich (x1, y1, x2, y2) oder None, wenn kein Filter angewendet wurde
         '''
         # Hole den aktuell ausgewählten Bereich vom Selection Handler
         self.selected_area = self.selection_handler.get_selected_area()
@@ -53,18 +51,17 @@ class FilterHandler:
             # Schneide den Bereich aus dem Bild heraus
             cropped_area = self.image.crop((x1, y1, x2, y2))
 
-            # Filter anwenden
-            if filter_name == "Verpixeln":
-                filtered_area = pixelate(cropped_area)
-            elif filter_name == "Schärfen":
-                filtered_area = sharpen(cropped_area)
-            elif filter_name == "Schwarz-Weiß":
-                filtered_area = schwarz_weiss(cropped_area)
-            elif filter_name == "Sepia":
-                filtered_area = sepia(cropped_area)
-            else:
+            # Filter über die Filter-Registry anwenden
+            # (Drehen und Spiegeln ändern die Form und gehen nicht für Bereiche)
+            try:
+                filter = filter_registry.get(filter_name)
+            except ValueError:
                 self.update_info("Unbekannter Filter.")
-                return self.image  # Rückgabe des Originalbildes bei unbekanntem Filter
+                return None  # Bild bleibt bei unbekanntem Filter unverändert
+            if filter.kind == filter_registry.GEOMETRY:
+                self.update_info(f"'{filter_name}' kann nur auf das gesamte Bild angewendet werden.")
+                return None
+            filtered_area = filter_registry.apply(cropped_area, [filter_name], scale=scale)
 
             # Das gefilterte Bild zurück in das Originalbild einfügen
             self.image.paste(filtered_area, (x1, y1, x2, y2))
@@ -78,11 +75,13 @@ class FilterHandler:
                 self.rect_id = None
 
             # Rückmeldung, dass der Filter erfolgreich angewendet wurde
-            self.update_info(f"Filter '{filter_name}' angewendet.")            
+            self.update_info(f"Filter '{filter_name}' angewendet.")
+            return (x1, y1, x2, y2)
 
         else:
             # Falls kein Bereich ausgewählt wurde oder kein Bild vorhanden ist, gib eine Fehlermeldung aus
             self.update_info("Kein Bereich ausgewählt oder kein Bild geladen.")
+            return None
             
             
             
@@ -7,6 +7,13 @@
 
 from PIL import ImageFilter
 
-def sharpen(image):
-    '''Schärft das gesamte Bild'''
-    return image.filter(ImageFilter.UnsharpMask())
\ No newline at end of file
+RADIUS = 2  # Radius der Unschärfemaske in Pixeln (bei voller Auflösung, Standard von PIL)
+
+def sharpen(image, scale=1.0):
+    '''
+    Schärft das gesamte Bild
+
+    scale: Maßstab des Bildes relativ zum Original (z. B. 0.2 für eine Vorschau),
+    der Radius wird entsprechend verkleinert.
+    '''
+    return image.filter(ImageFilter.UnsharpMask(radius=RADIUS * scale))
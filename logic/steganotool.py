@@ -10,11 +10,19 @@
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import numpy as np
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from logic import (analysis_cache, background, image_diff, image_document, steganalysis,
+                   stego_codec, stego_parallel, stego_shards)
+
+MAX_GRID_CELLS = 256  # Maximale Rasterzellen pro Achse in der Analyseanzeige
+CHECK_PENDING = "Steganalyse läuft ..."  # Platzhalter im Info-Text bis zum Ergebnis
+
 
 class SteganographyTool:
     """
@@ -43,9 +51,65 @@ class SteganographyTool:
         self.main_root = root  # Speichere das Hauptfenster
         self.window = None     # Fenster für das Tool
         self.analyse_window = None # Analyse Fenster
-        self.display_window = None
+        self.display_window = None # Vergleichsfenster nach dem Encodieren
+        self.display_fig = None
+        self.display_canvas = None
         self.canvas= None
         self.fig=None
+        self.bit_depth = tk.IntVar(master=root, value=1)  # Genutzte Bits pro Farbkanal (1-4)
+        self.compression = tk.StringVar(master=root, value="keine")  # Kompression der Nutzdaten
+        self.key = tk.StringVar(master=root, value="")  # Schlüssel für verstreute Einbettung
+        self.total_values = 0  # Anzahl Kanal-Bytes des aktuellen Bildes
+        # Ergebnisse von check_steganography über Programmstarts hinweg merken
+        self.analysis_cache = analysis_cache.AnalysisCache(version=steganalysis.ANALYSIS_VERSION)
+        self.document = None  # Geladenes Bild (siehe image_document), geteilt mit main
+        # Lange Operationen laufen nacheinander in einem Hintergrund-Thread (siehe background)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.task = None             # Laufende Operation (Encode, Decode, Analyse)
+        self.progress_widgets = None # Fortschrittsbalken, Statuszeile und Abbrechen-Button
+        self.check_task = None       # Laufende Steganalyse für die Info-Anzeige
+        self.check_image = None
+        self.check_callbacks = []
+
+    def set_document(self, document):
+        """
+        Übernimmt das bereits in der Hauptanwendung geladene Bild.
+        
+        Args:
+            document (ImageDocument): Einmal dekodiertes Bild mit Vorschau und Statistik
+        """
+        self.document = document
+
+    def _document(self, path):
+        """
+        Liefert das ImageDocument zu path.
+        
+        Gehört das vorhandene Dokument zu einer anderen (oder inzwischen
+        geänderten) Datei, wird die Datei neu geladen - sonst wird nichts
+        erneut dekodiert.
+        
+        Nur im Hauptthread aufrufen: self.document wird mit der Hauptanwendung
+        geteilt. Hintergrund-Operationen bekommen das Dokument übergeben.
+        
+        Raises:
+            OSError: Wenn die Datei nicht gelesen oder dekodiert werden kann
+        """
+        if self.document is None or not self.document.is_current(path):
+            self.document = image_document.ImageDocument(path)
+        return self.document
+
+    def _statistics(self, document, progress=None):
+        """
+        Kennzahlen des Bildes aus dem Statistik-Kern (steganalysis.image_statistics).
+        
+        Info-Anzeige, Steganalyse und LSB-Analysefenster lesen alle aus
+        diesem Ergebnis - die Pixel werden pro Dokument nur einmal durchlaufen.
+        Ein Abbruch über progress wird nicht gespeichert.
+        """
+        return document.derived(
+            "statistics",
+            lambda: steganalysis.image_statistics(document.pixels, progress=progress)
+        )
 
     def ausfuehren(self, img_path):
         self.img_path = img_path # Pfad übergeben
@@ -81,6 +145,7 @@ class SteganographyTool:
         self.create_content_frame()        # Frame für Texteingabe
         self.create_button_frame()         # Frame für Steuerungsbuttons
         self.create_selection_frame()      # Frame für Modusauswahl
+        self.create_progress_frame()       # Frame für Fortschritt und Abbrechen
         
         # Initialen GUI-Zustand setzen
         self.set_initial_state()
@@ -130,6 +195,9 @@ class SteganographyTool:
         # Deaktiviere Modusauswahl
         for radio in self.radio_buttons:
             radio.config(state=tk.DISABLED)
+        self.depth_spinbox.config(state=tk.DISABLED)
+        self.compression_box.config(state=tk.DISABLED)
+        self.key_entry.config(state=tk.DISABLED)
 
     def toggle_input_method(self):
         """
@@ -430,6 +498,132 @@ class SteganographyTool:
         # Zur Liste für gemeinsame Verwaltung hinzufügen
         self.radio_buttons.append(file_radio)
 
+        # Auswahl der Bittiefe: mehr Bits pro Kanal = mehr Platz, aber sichtbarere Änderungen
+        depth_label = ttk.Label(selection_frame, text="Bits pro Kanal:")
+        depth_label.pack(side=tk.LEFT, padx=(20, 5))
+        self.depth_spinbox = tk.Spinbox(
+            selection_frame,
+            from_=1, to=stego_codec.MAX_DEPTH,  # Erlaubte Bittiefen
+            width=3,
+            state="readonly",
+            textvariable=self.bit_depth,        # Gemeinsame Variable
+            command=self.update_capacity        # Kapazität neu berechnen
+        )
+        self.depth_spinbox.pack(side=tk.LEFT, padx=5)
+
+        # Auswahl der Kompression: "auto" probiert alle Verfahren an einer Stichprobe
+        compression_label = ttk.Label(selection_frame, text="Kompression:")
+        compression_label.pack(side=tk.LEFT, padx=(20, 5))
+        self.compression_box = ttk.Combobox(
+            selection_frame,
+            textvariable=self.compression,
+            values=["keine", "auto"] + list(stego_codec.COMPRESSION_METHODS),
+            width=7,
+            state="readonly"
+        )
+        self.compression_box.pack(side=tk.LEFT, padx=5)
+
+        # Optionaler Schlüssel: Daten werden an schlüsselabhängigen Positionen verstreut
+        key_label = ttk.Label(selection_frame, text="Schlüssel:")
+        key_label.pack(side=tk.LEFT, padx=(20, 5))
+        self.key_entry = ttk.Entry(
+            selection_frame,
+            textvariable=self.key,
+            show="*",      # Eingabe verdeckt anzeigen
+            width=15
+        )
+        self.key_entry.pack(side=tk.LEFT, padx=5)
+
+    def create_progress_frame(self):
+        """
+        Erstellt die Fortschrittsanzeige unter den übrigen Bereichen.
+
+        Einbetten, Extrahieren und Analyse laufen im Hintergrund (siehe
+        background.BackgroundTask), das Fenster bleibt dabei bedienbar.
+        Der Balken zeigt die verarbeiteten Bildzeilen bzw. Teile,
+        "Abbrechen" beendet die Operation nach dem aktuellen Band.
+        """
+        progress_frame = ttk.Frame(self.window)
+        progress_frame.grid(row=4, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+        self.progress_widgets = self._progress_widgets(progress_frame)
+
+    def _progress_widgets(self, parent):
+        """
+        Legt Fortschrittsbalken, Statuszeile und Abbrechen-Button in parent an.
+
+        Returns:
+            tuple: (Progressbar, Label, Button)
+        """
+        bar = ttk.Progressbar(parent, mode="determinate", maximum=1.0)
+        bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        label = ttk.Label(parent, text="", width=30)
+        label.pack(side=tk.LEFT, padx=5)
+        button = ttk.Button(parent, text="Abbrechen", command=self.cancel_task, state=tk.DISABLED)
+        button.pack(side=tk.LEFT, padx=5)
+        return bar, label, button
+
+    def _start_task(self, status, work, on_done, on_error=None, on_cancel=None, widgets=None):
+        """
+        Führt work im Hintergrund aus und zeigt den Fortschritt an.
+
+        Es läuft immer nur eine Operation gleichzeitig. Alle Callbacks
+        laufen im Tk-Hauptthread (siehe background.BackgroundTask).
+
+        Args:
+            status (str): Name der Operation für Statuszeile und Meldungen
+            work: Funktion work(progress), läuft im Hintergrund-Thread
+            on_done: Callback mit dem Ergebnis von work
+            on_error: Callback mit der Exception (Standard: Fehlermeldung)
+            on_cancel: Callback nach einem Abbruch (Standard: Hinweis)
+            widgets: Fortschrittsanzeige (Standard: die des Steganographie-Fensters)
+
+        Returns:
+            BackgroundTask: Die gestartete Aufgabe oder None, wenn bereits eine läuft
+        """
+        if self.task is not None and self.task.running:
+            messagebox.showwarning("Hinweis", "Es läuft bereits eine Operation!")
+            return None
+        widgets = widgets or self.progress_widgets
+
+        def show(done, total, text):
+            # Das Fenster kann inzwischen geschlossen worden sein
+            if widgets is None or not widgets[0].winfo_exists():
+                return
+            bar, label, button = widgets
+            bar.config(value=done / total if total else 0)
+            label.config(text=text)
+            button.config(state=tk.NORMAL if text else tk.DISABLED)
+
+        def progress(done, total):
+            show(done, total, f"{status}: {done / total:.0%}" if total else f"{status} ...")
+
+        def finished(callback):
+            def run(*args):
+                self.task = None
+                show(0, None, "")
+                callback(*args)
+            return run
+
+        if on_error is None:
+            on_error = lambda e: messagebox.showerror("Fehler", f"{status} fehlgeschlagen: {str(e)}")
+        if on_cancel is None:
+            on_cancel = lambda: messagebox.showinfo("Abgebrochen", f"{status} wurde abgebrochen.")
+        progress(0, None)
+        self.task = background.BackgroundTask(
+            self.main_root, work,
+            on_done=finished(on_done),
+            on_error=finished(on_error),
+            on_cancel=finished(on_cancel),
+            on_progress=progress,
+            executor=self.executor
+        ).start()
+        return self.task
+
+    def cancel_task(self):
+        """Bricht die laufende Operation ab (wirksam nach dem aktuellen Band)."""
+        if self.task is not None:
+            self.task.cancel()
+
 
 
 ###############
@@ -502,7 +696,7 @@ class SteganographyTool:
                 # Aktiviere Encode-Button für den Start des Versteckprozesses
                 self.encode_button.config(state=tk.NORMAL)
 
-    def get_file_info(self, img_path=None):
+    def get_file_info(self, img_path=None, callback=None):
         """
         Analysiert das ausgewählte Bild und zeigt relevante Informationen an.
         
@@ -514,10 +708,12 @@ class SteganographyTool:
         - Berechnet verfügbaren Speicherplatz für Steganographie
         
         2. Steganographie-Prüfung:
-        - Sucht nach Anzeichen versteckter Daten
-        - Berechnet LSB-Statistiken
-        - Gibt Hinweise auf mögliche versteckte Inhalte
-        
+        - Liest den Header am Bildanfang (Magic, Version, Flags, Größe)
+        - Zeigt Größe, Bittiefe und Kompression gefundener Daten an
+        - Ohne Header: Steganalyse mit geschätzter Einbettungsrate
+        - Ist das Ergebnis nicht im Analyse-Cache, läuft die Prüfung im
+          Hintergrund; bis dahin steht CHECK_PENDING im Info-Text
+
         3. GUI-Aktualisierung:
         - Zeigt alle Informationen im Info-Textfeld
         - Erstellt eine Bildvorschau (maximal 380x380 Pixel)
@@ -527,6 +723,16 @@ class SteganographyTool:
         - Prüft ob eine Datei ausgewählt wurde
         - Fängt mögliche Fehler bei der Bildverarbeitung ab
         - Zeigt Fehlermeldungen in einem Dialogfenster an
+
+        Args:
+            img_path: Pfad zum Bild (aus der Hauptanwendung) oder None für
+                      das im Steganographie-Fenster geladene Bild
+            callback: Funktion callback(info_text), die den vollständigen
+                      Info-Text erhält, sobald die Steganalyse im Hintergrund
+                      fertig ist (optional)
+
+        Returns:
+            str: Info-Text, ggf. mit CHECK_PENDING statt des Prüfergebnisses
         """
         # Prüfe ob eine Datei ausgewählt wurde
         if img_path:
@@ -540,77 +746,92 @@ class SteganographyTool:
             if not img_path:
                 self.info_text.config(state=tk.NORMAL)
             
-            # Öffne und analysiere das Bild
-            with Image.open(self.current_file) as img:
-                # Warnung bei Nicht-PNG-Formaten
-                #if img.format != 'PNG':
-                #    messagebox.showwarning(
-                #        "Warnung",
-                #        "Für beste Ergebnisse bitte PNG-Dateien verwenden!"
-                #    )
-                
-                # Berechne Dateigröße in MB
-                file_size = os.path.getsize(self.current_file) / (1024 * 1024)
-                
-                # Ermittle Bildabmessungen
-                width, height = img.size
-                
-                # Bestimme Anzahl und Art der Farbkanäle
-                channels = len(img.getbands())
-                strChannels = "RGBA" if channels == 4 else "RGB"
+            # Metadaten nur aus den Kopfdaten der Datei (ohne Pixel zu dekodieren)
+            info = stego_codec.carrier_info(self.current_file)
+            # Warnung bei Nicht-PNG-Formaten
+            #if info["format"] != 'PNG':
+            #    messagebox.showwarning(
+            #        "Warnung",
+            #        "Für beste Ergebnisse bitte PNG-Dateien verwenden!"
+            #    )
+            
+            # Berechne Dateigröße in MB
+            file_size = info["file_size"] / (1024 * 1024)
+            
+            # Ermittle Bildabmessungen
+            width, height = info["width"], info["height"]
+            
+            # Bestimme Anzahl und Art der Farbkanäle (wie beim Einbetten dekodiert)
+            channels = info["channels"]
+            strChannels = info["mode"]
+            
+            # Berechne verfügbaren Speicherplatz für Steganographie
+            # Gewählte Bittiefe pro Farbkanal pro Pixel, abzüglich Header
+            self.total_values = width * height * channels
+            self.available_bytes = info["capacities"][self.bit_depth.get()]
+
+            # Suche nach Anzeichen versteckter Daten
+            # (bereits geprüfte Dateien sofort aus dem Cache, sonst im Hintergrund)
+            image = self.current_file
+            results = self.analysis_cache.get(image)
+            hidden = "\n" + CHECK_PENDING if results is None else self._check_text(results)
+
+            # Erstelle formatierten Informationstext
+            info_text = (
+                f"Dateiname : {os.path.basename(self.current_file)}\n"
+                f"Dateityp  : {info['format']}\n"
+                f"Bildgröße : {width}x{height}\n"
+                f"Farbkanäle: {channels}, {strChannels}\n"
+                f"Dateigröße: {file_size:.2f} MB\n"
+                f"{self._capacity_text()}\n"
+                f"{hidden}"
+            )
+            # Aktualisiere Info-Textfeld
+            if not img_path:
+                self.info_text.delete(1.0, tk.END)    # Lösche alten Inhalt
+                self.info_text.insert(tk.END, info_text)  # Füge neue Infos ein
+            
+                # Erstelle Bildvorschau
+                max_size = (380, 380)  # Maximale Vorschaugröße
+                document = self._document(self.current_file)  # Bild einmal laden
+                preview = document.thumbnail(max_size)  # Skaliertes Bild (einmal berechnet)
+                self.preview_image = ImageTk.PhotoImage(preview)  # Erstelle Tkinter-Bildobjekt
+                self.img_label.config(
+                    image=self.preview_image,  # Setze Vorschaubild
+                    text=""                    # Entferne Platzhaltertext
+                )
+            
+                # Aktiviere GUI-Elemente
+                self.decode_button.config(state=tk.NORMAL)  # Aktiviere Decode-Button
+                for radio in self.radio_buttons:            # Aktiviere Modusauswahl
+                    radio.config(state=tk.NORMAL)
+                self.depth_spinbox.config(state="readonly")  # Aktiviere Bittiefe
+                self.compression_box.config(state="readonly")  # Aktiviere Kompression
+                self.key_entry.config(state=tk.NORMAL)         # Aktiviere Schlüssel
                 
-                # Berechne verfügbaren Speicherplatz für Steganographie
-                # Ein Bit pro Farbkanal pro Pixel
-                self.available_bytes = (width * height * channels) // 8
+                # Aktualisiere Button-Zustände basierend auf Eingabemodus
+                self.toggle_input_method()
+            
+                # Deaktiviere info_text (read-only)
+                self.info_text.config(state=tk.DISABLED)
 
-                # Suche nach Anzeichen versteckter Daten
-                hidden = ""
-                results = self.check_steganography(self.current_file)
-                
-                # Wenn Auffälligkeiten gefunden wurden
-                if (results.get('details')):
-                    hidden = (
-                        "\n" + results.get('details')[0] + 
-                        "\nMittelwert LSBs: " + 
-                        str(np.round(results.get('details')[1], 2)) + 
-                        "\nEvtl. versteckte Daten enthalten"
-                    )
+            if results is None:
+                def show_check(results):
+                    # Inzwischen ein anderes Bild geladen: Ergebnis verwerfen
+                    if image != self.current_file:
+                        return
+                    check_text = self._check_text(results)
+                    if not img_path and self.info_text.winfo_exists():
+                        self.info_text.config(state=tk.NORMAL)
+                        start = self.info_text.search(CHECK_PENDING, "1.0", tk.END)
+                        if start:
+                            self.info_text.delete(f"{start} -1c", f"{start} lineend")
+                            self.info_text.insert(f"{start} -1c", check_text)
+                        self.info_text.config(state=tk.DISABLED)
+                    if callback is not None:
+                        callback(info_text.replace("\n" + CHECK_PENDING, check_text))
+                self._check_in_background(image, show_check)
 
-                # Erstelle formatierten Informationstext
-                info_text = (
-                    f"Dateiname : {os.path.basename(self.current_file)}\n"
-                    f"Dateityp  : {img.format}\n"
-                    f"Bildgröße : {width}x{height}\n"
-                    f"Farbkanäle: {channels}, {strChannels}\n"
-                    f"Dateigröße: {file_size:.2f} MB\n"
-                    f"Verfügbar : {self.available_bytes//1024} kBytes\n"
-                    f"{hidden}"
-                )
-                # Aktualisiere Info-Textfeld
-                if not img_path:
-                    self.info_text.delete(1.0, tk.END)    # Lösche alten Inhalt
-                    self.info_text.insert(tk.END, info_text)  # Füge neue Infos ein
-                
-                    # Erstelle Bildvorschau
-                    max_size = (380, 380)  # Maximale Vorschaugröße
-                    img.thumbnail(max_size, Image.LANCZOS)  # Skaliere Bild
-                    self.preview_image = ImageTk.PhotoImage(img)  # Erstelle Tkinter-Bildobjekt
-                    self.img_label.config(
-                        image=self.preview_image,  # Setze Vorschaubild
-                        text=""                    # Entferne Platzhaltertext
-                    )
-                
-                    # Aktiviere GUI-Elemente
-                    self.decode_button.config(state=tk.NORMAL)  # Aktiviere Decode-Button
-                    for radio in self.radio_buttons:            # Aktiviere Modusauswahl
-                        radio.config(state=tk.NORMAL)
-                    
-                    # Aktualisiere Button-Zustände basierend auf Eingabemodus
-                    self.toggle_input_method()
-                
-                    # Deaktiviere info_text (read-only)
-                    self.info_text.config(state=tk.DISABLED)
-                    
         except Exception as e:
             # Fehlerbehandlung
             messagebox.showerror(
@@ -623,70 +844,172 @@ class SteganographyTool:
         return info_text
     
 
-    def check_steganography(self, image):
+    def _capacity_text(self):
+        """Liefert die Zeile mit dem verfügbaren Platz für das Info-Textfeld."""
+        return (f"Verfügbar : {self.available_bytes//1024} kBytes "
+                f"({self.bit_depth.get()} Bit/Kanal)")
+
+    def update_capacity(self):
+        """
+        Berechnet den verfügbaren Platz nach Änderung der Bittiefe neu
+        und aktualisiert die entsprechende Zeile im Info-Textfeld.
+        """
+        self.available_bytes = stego_codec.capacity_for_values(
+            self.total_values, self.bit_depth.get()
+        )
+        self.info_text.config(state=tk.NORMAL)
+        start = self.info_text.search("Verfügbar", "1.0", tk.END)
+        if start:
+            self.info_text.delete(start, f"{start} lineend")
+            self.info_text.insert(start, self._capacity_text())
+        self.info_text.config(state=tk.DISABLED)
+
+    def _check_text(self, results):
+        """Liefert die Zeilen zum Ergebnis von check_steganography für den Info-Text."""
+        if results.get('details'):
+            return "\n" + "\n".join(results.get('details'))
+        return ""
+
+    def _check_in_background(self, image, callback):
         """
-        Analysiert ein PNG-Bild auf mögliche versteckte Daten mittels LSB-Analyse.
+        Führt die Steganalyse für image im Hintergrund aus.
         
-        Die Methode untersucht die Least Significant Bits (LSBs) des Bildes auf
-        statistische Auffälligkeiten, die auf versteckte Daten hinweisen könnten.
+        Läuft bereits eine Prüfung desselben Bildes, erhält callback deren
+        Ergebnis; eine Prüfung eines anderen Bildes wird abgebrochen. Das
+        Ergebnis wird im Hauptthread in den Analyse-Cache geschrieben
+        (die SQLite-Verbindung gehört diesem Thread).
         
-        Analyseschritte:
-        1. Extraktion der LSBs aller Pixel
-        2. Berechnung des Mittelwerts der LSB-Verteilung
-        3. Vergleich mit erwarteter Normalverteilung
-        - Erwartungswert bei zufälligen LSBs: ~0.5
-        - Auffällig bei Werten < 0.49 oder > 0.51
+        Args:
+            image: Pfad zum Bild
+            callback: Funktion callback(results) mit dem Ergebnis von check_steganography
+        """
+        if self.check_task is not None and self.check_task.running:
+            if self.check_image == image:
+                self.check_callbacks.append(callback)
+                return
+            self.check_task.cancel()
+        try:
+            document = self._document(image)  # Im Hauptthread, nicht im Hintergrund
+        except Exception as e:
+            callback(self._check_error(e))
+            return
+        callbacks = [callback]
+
+        def done(results):
+            if "error" not in results:
+                self.analysis_cache.put(image, results)  # Fehler werden nicht gespeichert
+            for function in callbacks:
+                function(results)
+
+        self.check_image, self.check_callbacks = image, callbacks
+        self.check_task = background.BackgroundTask(
+            self.main_root,
+            lambda progress: self._check_pixels(document, progress),
+            on_done=done,
+            executor=self.executor
+        ).start()
+
+    def check_steganography(self, image, progress=None):
+        """
+        Prüft, ob ein Bild versteckte Daten enthält.
+        
+        Zuerst wird der Header dieses Tools gelesen (siehe
+        stego_codec.read_header). Magic und Version stehen in den ersten
+        Kanal-Bytes, das Ergebnis ist damit exakt und schnell.
+        
+        Ohne Header folgt eine statistische Steganalyse (siehe
+        steganalysis.analyse): Chi-Quadrat-Test, RS-Analyse und
+        Sample-Pair-Analyse aus einem einzigen Durchlauf über die Pixel.
+        Damit werden auch Einbettungen anderer Werkzeuge erkannt.
+        
+        Die Ergebnisse werden im Analyse-Cache gespeichert (siehe
+        analysis_cache). Bei einer unveränderten Datei (Pfad, Größe und
+        Änderungszeit gleich) wird das Bild nicht erneut gelesen.
         
         Args:
-            image: Pfad zum PNG-Bild
+            image: Pfad zum Bild
+            progress: Funktion progress(Zeilen, Höhe) für die Steganalyse (optional)
         
         Returns:
             dict: Dictionary mit Analyseergebnissen:
                 {
-                    "lsb_anomalies": bool,  # True wenn Auffälligkeiten gefunden
-                    "details": list         # Details zu gefundenen Auffälligkeiten
+                    "payload_found": bool,  # True wenn ein gültiger Header vorliegt
+                    "header": dict,         # Header-Felder (oder None)
+                    "analysis": dict,       # Steganalyse-Bericht (oder None)
+                    "suspicious": bool,     # True bei Header oder auffälliger Statistik
+                    "details": list         # Beschreibung für die Info-Anzeige
                 }
         
         Fehlerbehandlung:
             Bei Fehlern wird ein Dictionary mit Fehlermeldung zurückgegeben
         """
+        # Bereits analysierte Datei: Ergebnis ohne Pixelzugriff aus dem Cache
+        cached = self.analysis_cache.get(image)
+        if cached is not None:
+            return cached
+        
+        try:
+            document = self._document(image)
+        except Exception as e:
+            return self._check_error(e)
+        results = self._check_pixels(document, progress)
+        if "error" not in results:
+            self.analysis_cache.put(image, results)  # Fehler werden nicht gespeichert
+        return results
+
+    def _check_pixels(self, document, progress=None):
+        """
+        Prüft die Pixel eines ImageDocument ohne Analyse-Cache (siehe check_steganography).
+        
+        Läuft auch im Hintergrund-Thread; ein Abbruch über progress
+        (background.Cancelled) wird weitergereicht.
+        """
         try:
-            # Bild öffnen und in NumPy-Array konvertieren
-            img = Image.open(image)
-            img_array = np.array(img)
+            # Header und Statistik aus dem bereits dekodierten Bild
+            header = stego_codec.read_header_pixels(document.pixels)
             
             # Initialisiere Ergebnis-Dictionary
             results = {
-                "lsb_anomalies": False,  # Flag für gefundene Auffälligkeiten
-                "details": []            # Liste für Detailinformationen
+                "payload_found": header is not None,
+                "header": header,
+                "analysis": None,
+                "suspicious": header is not None,
+                "details": []
             }
             
-            # LSB-Analyse durchführen
-            # Extrahiere LSBs mittels Bitwise-AND mit 1
-            lsb_data = img_array & 1
-            
-            # Berechne Mittelwert der LSB-Verteilung
-            mean_lsb = np.mean(lsb_data)
-            print(mean_lsb)  # Debug-Ausgabe
-            
-            # Prüfe auf ungewöhnliche LSB-Verteilung
-            # Bei normalen Bildern sollte der Mittelwert nahe 0.5 liegen
-            lsb_unusual = mean_lsb < 0.49 or mean_lsb > 0.51
+            if header is not None:
+                compression = header["compression"] or "keine"
+                results["details"].append("Versteckte Daten gefunden")
+                results["details"].append(
+                    f"Größe: {header['size']} Bytes, {header['depth']} Bit/Kanal, "
+                    f"Kompression: {compression}"
+                )
+            else:
+                # Kein Header: statistische Auswertung der LSBs
+                stats = self._statistics(document, progress)
+                analysis = steganalysis.report(stats)
+                results["analysis"] = analysis
+                results["suspicious"] = analysis["suspicious"]
+                results["details"].append(f"LSB-Anteil: {stats.lsb_share:.3f}")
+                results["details"].append(
+                    f"Steganalyse: geschätzte Einbettungsrate {analysis['rate']:.1%}, "
+                    f"Chi-Quadrat p = {analysis['chi_p_value']:.2f}"
+                )
+                if analysis["suspicious"]:
+                    results["details"].append("Auffällig: LSB-Einbettung wahrscheinlich")
             
-            # Wenn Auffälligkeiten gefunden wurden
-            if lsb_unusual:
-                results["lsb_anomalies"] = True
-                # Füge Detailinformationen hinzu
-                results["details"].append("Ungewöhnliche LSB-Verteilung gefunden")
-                results["details"].append(mean_lsb)
-                    
             return results
                 
+        except background.Cancelled:
+            raise
         except Exception as e:
-            # Bei Fehlern wird ein Dictionary mit Fehlermeldung zurückgegeben
-            return {
-                "error": f"Fehler bei der Analyse: {str(e)}"
-            }
+            return self._check_error(e)
+
+    def _check_error(self, e):
+        """Bei Fehlern wird ein Dictionary mit Fehlermeldung zurückgegeben."""
+        return {
+            "error": f"Fehler bei der Analyse: {str(e)}"
+        }
 
     def encode(self):
         """
@@ -698,13 +1021,20 @@ class SteganographyTool:
         - Extraktion der zu versteckenden Daten
         - Größenvalidierung
         
-        2. Datenverarbeitung:
-        - Hinzufügen eines 4-Byte-Headers mit der Datengröße
-        - Konvertierung der Daten in Bits
-        - Modifikation der Pixel-LSBs
+        2. Datenverarbeitung (gestreamt, siehe stego_codec.embed_file):
+        - Optional Kompression der Daten (zlib, bz2, lzma oder automatisch)
+        - Hinzufügen eines 14-Byte-Headers (Magic, Version, Flags, Datengröße, CRC32)
+        - Blockweises Lesen der Daten und Zerlegung in Gruppen zu k Bits
+        - Zeilenweise Modifikation der unteren k Bits jedes Farbkanals
+        - Sehr große Träger werden in Shared Memory geladen und auf alle Kerne
+          verteilt (siehe stego_parallel.embed_file)
+        - Mit Schlüssel werden die Daten an schlüsselabhängigen Positionen
+          verstreut statt ab Pixel 0 am Stück eingebettet
         
         3. Speicherung:
-        - Speichern des modifizierten Bildes als PNG
+        - Die veränderten Zeilen werden direkt als PNG geschrieben
+        - Unkomprimierte Träger (BMP, PGM/PPM, NPY) können stattdessen im selben
+          Format gespeichert werden; die Kopie wird per np.memmap direkt verändert
         - Anzeige des Vergleichs zwischen Original und modifiziertem Bild
         
         Fehlerbehandlung:
@@ -724,74 +1054,185 @@ class SteganographyTool:
             if not text:
                 messagebox.showerror("Fehler", "Bitte geben Sie einen Text ein!")
                 return
-            data = text.encode()
+            data_size = len(text.encode())
         else:
             if not self.secret_file:
                 messagebox.showerror("Fehler", "Bitte wählen Sie eine Datei zum Verstecken aus!")
                 return
-            with open(self.secret_file, 'rb') as f:
-                data = f.read()
-
-        # Prüfe Datengröße
-        if len(data) > self.available_bytes:
-            messagebox.showerror(
-                "Fehler",
-                f"Daten zu groß! Maximal möglich: {self.available_bytes} Bytes"
-            )
+            data_size = os.path.getsize(self.secret_file)
+
+        # Prüfe Datengröße (mit Kompression erst nach dem Packen möglich)
+        compression = self.compression.get()
+        compression = None if compression == "keine" else compression
+        key = self.key.get() or None  # Leeres Feld = Daten am Stück einbetten
+        if compression is None and data_size > self.available_bytes:
+            # Angebot: Daten auf mehrere Trägerbilder verteilen
+            if messagebox.askyesno(
+                "Daten zu groß",
+                f"Daten zu groß! Maximal möglich: {self.available_bytes} Bytes\n\n"
+                "Daten auf mehrere Bilder verteilen?"
+            ):
+                payload = text.encode() if self.input_method.get() == "text" else self.secret_file
+                self.encode_shards(payload, compression, key)
             return
                 
         try:
-            print(f"Datengröße: {len(data)} Bytes")
+            print(f"Datengröße: {data_size} Bytes")
 
             print (self.current_file)
-            with Image.open(self.current_file) as img:
-                original_pixels = np.array(img, dtype=np.uint8)
-                pixels = original_pixels.copy()
-            
 
-            # Füge die Größe der Daten am Anfang hinzu
-            data_size = len(data)
-            full_data = data_size.to_bytes(4, 'big') + data
-            
-
-            # Konvertiere Daten in Binärstring
-            binary_data = ''.join(format(byte, '08b') for byte in full_data)
-            binary_array = np.array([int(bit) for bit in binary_data], dtype=np.uint8)
-            
-    
-            # Überprüfe ob genügend Platz vorhanden ist
-            if len(binary_array) > pixels.size:
-                messagebox.showerror("Fehler", "Nicht genügend Platz im Bild!")
+            # Zielpfad für das neue Bild
+            # Unkomprimierte Träger (BMP, PGM/PPM, NPY) werden im selben Format
+            # per Memory-Mapping verändert, alle anderen als PNG gespeichert
+            filetypes = [("PNG Dateien", "*.png")]
+            extension = os.path.splitext(self.current_file)[1].lower()
+            if stego_codec.uses_memmap(self.current_file):
+                filetypes.insert(0, (f"{extension[1:].upper()} Dateien", f"*{extension}"))
+            output_path = filedialog.asksaveasfilename(
+                defaultextension=filetypes[0][1][1:],
+                filetypes=filetypes
+            )
+            if not output_path:
                 return
-            
+            if not stego_codec.uses_memmap(self.current_file, output_path):
+                # Alles außer dem Memory-Mapping-Modus wird als PNG geschrieben
+                output_path = os.path.splitext(output_path)[0] + ".png"
+
+            # Eingaben im Hauptthread lesen, Tk-Variablen sind nicht threadsicher
+            image = self.current_file
+            data = text.encode() if self.input_method.get() == "text" else None
+            secret_file = self.secret_file
+            depth = self.bit_depth.get()
+            document = self._document(image)  # Original für den Vergleich, im Hauptthread laden
+
+            def work(progress):
+                # Trägerbild und Daten zeilen- bzw. blockweise verarbeiten,
+                # die veränderten Zeilen gehen direkt in den PNG-Encoder
+                # (große Träger parallel auf allen Kernen)
+                payload = io.BytesIO(data) if data is not None else open(secret_file, 'rb')
+                try:
+                    with payload:
+                        stego_parallel.embed_file(image, payload, output_path, data_size,
+                                                  depth=depth, compression=compression,
+                                                  key=key, progress=progress)
+                except BaseException:
+                    if os.path.exists(output_path):
+                        os.remove(output_path)  # Unvollständige Datei entfernen
+                    raise
+                # Trägerbild streifenweise mit dem Original vergleichen
+                original_pixels = document.pixels
+                with stego_codec.open_carrier(output_path) as rows:
+                    return image_diff.compare(original_pixels, rows.iter_bands())
+
+            def done(diff):
+                messagebox.showinfo("Erfolg", "Daten wurden erfolgreich versteckt!")
+                # Öffne Diff Fenster / Zeige die Bilder an
+                self.display_images(diff)
 
-            # Erstelle eine flache Kopie des Arrays und konvertiere zu uint8
-            flat_pixels = pixels.ravel().astype(np.uint8)
+            def error(e):
+                if isinstance(e, ValueError):
+                    messagebox.showerror("Fehler", "Nicht genügend Platz im Bild!")
+                else:
+                    messagebox.showerror("Fehler", f"Fehler beim Encodieren: {str(e)}")
 
- 
-            # Modifiziere nur LSB 
-            #flat_pixels[:len(binary_array)] = (flat_pixels[:len(binary_array)] & ~1) | binary_array
-            flat_pixels[:len(binary_array)] = (flat_pixels[:len(binary_array)] & 254) | binary_array
+            self._start_task("Encodieren", work, done, on_error=error)
 
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Fehler beim Encodieren: {str(e)}")
 
-            # Reshape zurück zur originalen Form
-            modified_pixels = flat_pixels.reshape(pixels.shape)
+    def encode_shards(self, payload, compression, key):
+        """
+        Verteilt Daten, die nicht in das aktuelle Bild passen, auf mehrere Bilder.
+        
+        Das aktuelle Bild wird zuerst gefüllt, danach die weiteren gewählten
+        Bilder in der gewählten Reihenfolge. Die Teile werden parallel
+        eingebettet (siehe stego_shards.embed) und als PNG im gewählten
+        Ordner gespeichert ("<Name>-<Nr>.png").
+        
+        Args:
+            payload: Zu versteckende Daten (bytes) oder Pfad zur Datei
+            compression (str): Kompression je Teil (None, 'auto', ...)
+            key (str): Schlüssel für die verstreute Einbettung (oder None)
+        """
+        extra = filedialog.askopenfilenames(
+            title="Weitere Trägerbilder auswählen",
+            filetypes=[("Bilddateien", "*.png *.bmp *.jpg *.jpeg *.ppm *.pgm *.tif *.tiff")]
+        )
+        if not extra:
+            return
+        output_dir = filedialog.askdirectory(title="Zielordner für die Bilder")
+        if not output_dir:
+            return
+        
+        carriers = [self.current_file] + [path for path in extra if path != self.current_file]
+        outputs = [
+            os.path.join(output_dir, f"{os.path.splitext(os.path.basename(path))[0]}-{number}.png")
+            for number, path in enumerate(carriers, 1)
+        ]
+        depth = self.bit_depth.get()
 
-            # Speichere das neue Bild
-            output_path = filedialog.asksaveasfilename(
-                defaultextension=".png",
-                filetypes=[("PNG Dateien", "*.png")]
-            )
-                
-            if output_path:
-                Image.fromarray(modified_pixels).save(output_path, 'PNG')
-                messagebox.showinfo("Erfolg", "Daten wurden erfolgreich versteckt!")
+        def done(shards):
+            names = "\n".join(os.path.basename(shard["output"]) for shard in shards)
+            messagebox.showinfo("Erfolg", f"Daten wurden auf {len(shards)} Bilder verteilt:\n{names}")
 
-            # Öffne Diff Fenster / Zeige die Bilder an
-            self.display_images(original_pixels, modified_pixels)
+        def error(e):
+            if isinstance(e, ValueError):
+                messagebox.showerror("Fehler", f"Nicht genügend Platz in den Bildern: {str(e)}")
+            else:
+                messagebox.showerror("Fehler", f"Fehler beim Encodieren: {str(e)}")
+
+        # Fortschritt je fertigem Teil; bei Fehler oder Abbruch werden alle Teile entfernt
+        self._start_task(
+            "Verteilen",
+            lambda progress: stego_shards.embed(payload, carriers, outputs, depth=depth,
+                                                compression=compression, key=key,
+                                                progress=progress),
+            done, on_error=error
+        )
 
-        except Exception as e:
-            messagebox.showerror("Fehler", f"Fehler beim Encodieren: {str(e)}")
+    def decode_shards(self, manifest, key):
+        """
+        Setzt Daten zusammen, die auf mehrere Bilder verteilt wurden.
+        
+        Der Benutzer wählt die übrigen Bilder in beliebiger Reihenfolge aus,
+        die Teile werden parallel extrahiert und direkt an ihre Stelle in der
+        Zieldatei geschrieben (siehe stego_shards.extract).
+        
+        Args:
+            manifest (dict): Manifest des aktuellen Bildes (siehe stego_shards.read_manifest)
+            key (str): Schlüssel, falls die Daten verstreut eingebettet wurden
+        """
+        messagebox.showinfo(
+            "Mehrteilige Daten",
+            f"Das Bild enthält Teil {manifest['index'] + 1} von {manifest['count']}.\n"
+            f"Bitte die übrigen Bilder auswählen."
+        )
+        images = list(filedialog.askopenfilenames(
+            title="Bilder mit den übrigen Teilen auswählen",
+            filetypes=[("PNG Dateien", "*.png"), ("Alle Dateien", "*.*")]
+        ))
+        if manifest["count"] > 1 and not images:
+            return
+        output_path = filedialog.asksaveasfilename(title="Datei speichern unter")
+        if not output_path:
+            return
+        images = [self.current_file] + [path for path in images if path != self.current_file]
+
+        def error(e):
+            if isinstance(e, ValueError):
+                messagebox.showerror("Fehler", f"Daten konnten nicht zusammengesetzt werden: {str(e)}")
+            else:
+                messagebox.showerror("Fehler", f"Fehler beim Decodieren: {str(e)}")
+
+        # Bei Fehler oder Abbruch entfernt stego_shards.extract die Zieldatei
+        self._start_task(
+            "Zusammensetzen",
+            lambda progress: stego_shards.extract(images, output_path, key, progress=progress),
+            lambda size: messagebox.showinfo(
+                "Erfolg", f"{size} Bytes aus {len(images)} Bildern wurden zusammengesetzt!"
+            ),
+            on_error=error
+        )
 
     def decode(self):
         """
@@ -799,13 +1240,16 @@ class SteganographyTool:
         
         Funktionsablauf:
         1. Bildverarbeitung:
-        - Lädt das Bild und konvertiert es in ein NumPy-Array
-        - Extrahiert die LSBs aller Pixel
+        - Prüft im Hintergrund, ob das Bild einen Teil mehrteiliger Daten
+          enthält (Manifest, siehe stego_shards) - dann weiter mit decode_shards
+        - Liest das Bild zeilenweise (PNG wird gestreamt)
+        - Bricht ab, sobald die im Header angegebenen Daten vollständig sind
         
         2. Datenextraktion:
-        - Liest die ersten 32 Bits zur Bestimmung der Datengröße
-        - Extrahiert die entsprechende Menge an Datenbits
-        - Konvertiert die Bits zurück in Bytes
+        - Liest die ersten 112 Bits (Header) und bricht ohne gültiges Magic sofort ab
+        - Extrahiert die entsprechende Menge an Datenbits (Bittiefe aus dem Header)
+        - Entpackt komprimierte Daten blockweise
+        - Konvertiert die Bits zurück in Bytes und prüft die CRC32
         
         3. Datenausgabe (abhängig vom gewählten Modus):
         Text-Modus:
@@ -813,7 +1257,8 @@ class SteganographyTool:
         - Zeigt Text im Textfeld an
         
         Datei-Modus:
-        - Speichert die Bytes in eine vom Benutzer gewählte Datei
+        - Fragt zuerst nach der Zieldatei
+        - Schreibt die Bytes blockweise in die vom Benutzer gewählte Datei
         
         Fehlerbehandlung:
         - Prüft ob ein Bild geladen ist
@@ -831,93 +1276,117 @@ class SteganographyTool:
             return
                 
         try:
-            # Bild öffnen und in NumPy-Array konvertieren
-            img = Image.open(self.current_file)
-            pixels = np.array(img)
-
-            # Array für effizientere Verarbeitung eindimensional machen
-            flat_pixels = pixels.ravel()
-            
-            # Extrahiere die ersten 32 Bits für die Größeninformation
-            # Wandle die LSBs in String-Bits um
-            size_bits = (flat_pixels[:32] & 1).astype(str)
-            # Konvertiere Bit-String in Integer
-            data_size = int(''.join(size_bits), 2)
-            
-            # Validiere die extrahierte Größe
-            available_bytes = (flat_pixels.size - 32) // 8  # Verfügbare Bytes nach Header
-            if data_size > available_bytes:
-                return None  # Ungültige Größe
-                
-            # Berechne benötigte Anzahl an Bits
-            bits_needed = data_size * 8
-            
-            # Extrahiere die Datenbits (nach den 32 Größenbits)
-            data_bits = (flat_pixels[32:32+bits_needed] & 1).astype(str)
-            binary_data = ''.join(data_bits)
-            
-            # Konvertiere Binärdaten zurück in Bytes
-            # Verarbeite jeweils 8 Bits als ein Byte
-            data_bytes = bytes(
-                int(binary_data[i:i+8], 2)
-                for i in range(0, len(binary_data), 8)
+            image = self.current_file
+            key = self.key.get() or None
+            text_mode = self.input_method.get() == "text"
+
+            def error(e):
+                if isinstance(e, ValueError):
+                    # Kein Header, ungültige Größe oder falsche Prüfsumme
+                    messagebox.showerror("Fehler", f"Keine gültigen Daten gefunden: {str(e)}")
+                else:
+                    messagebox.showerror("Fehler", f"Fehler beim Decodieren: {str(e)}")
+
+            def probed(manifest):
+                # Auf mehrere Bilder verteilte Daten
+                if manifest is not None:
+                    self.decode_shards(manifest, key)
+                elif text_mode:
+                    self._decode_text(image, key, error)
+                else:
+                    self._decode_file(image, key, error)
+
+            # Zuerst nur das Manifest am Anfang der Daten lesen (im Hintergrund:
+            # mit Schlüssel muss dafür das ganze Bild dekodiert werden)
+            self._start_task(
+                "Prüfen",
+                lambda progress: stego_shards.read_manifest(image, key, progress=progress),
+                probed, on_error=error
             )
-                
-            # Datenausgabe je nach gewähltem Modus
-            if self.input_method.get() == "text":
-                try:
-                    # Versuche Bytes als Text zu dekodieren
-                    decoded_text = data_bytes.decode()
-                    # Aktualisiere Textfeld
-                    self.text_input.delete(1.0, tk.END)
-                    self.text_input.insert(tk.END, decoded_text)
-                    messagebox.showinfo("Erfolg", "Text wurde erfolgreich extrahiert!")
-                except:
-                    messagebox.showerror("Fehler", "Enthaltene Daten sind kein Text!")
-            else:
-                # Datei-Modus: Speichere Bytes in Datei
-                output_path = filedialog.asksaveasfilename(
-                    title="Datei speichern unter"
-                )
-                if output_path:
-                    with open(output_path, 'wb') as f:
-                        f.write(data_bytes)
-                    messagebox.showinfo("Erfolg", "Datei wurde erfolgreich extrahiert!")
                         
         except Exception as e:
             # Allgemeine Fehlerbehandlung
             messagebox.showerror("Fehler", f"Fehler beim Decodieren: {str(e)}")
+
+    def _decode_text(self, image, key, error):
+        """Text-Modus von decode: Daten extrahieren und im Textfeld anzeigen."""
+        def work(progress):
+            # Bild zeilenweise lesen, nur bis die Daten vollständig sind
+            buffer = io.BytesIO()
+            stego_codec.extract_file(image, buffer, key=key, progress=progress)
+            return buffer.getvalue()
+
+        def done(data_bytes):
+            try:
+                # Versuche Bytes als Text zu dekodieren
+                decoded_text = data_bytes.decode()
+            except UnicodeDecodeError:
+                messagebox.showerror("Fehler", "Enthaltene Daten sind kein Text!")
+                return
+            # Aktualisiere Textfeld
+            self.text_input.delete(1.0, tk.END)
+            self.text_input.insert(tk.END, decoded_text)
+            messagebox.showinfo("Erfolg", "Text wurde erfolgreich extrahiert!")
+
+        self._start_task("Decodieren", work, done, on_error=error)
+
+    def _decode_file(self, image, key, error):
+        """Datei-Modus von decode: Daten blockweise direkt in die Zieldatei schreiben."""
+        output_path = filedialog.asksaveasfilename(
+            title="Datei speichern unter"
+        )
+        if not output_path:
+            return
+
+        def work(progress):
+            try:
+                with open(output_path, 'wb') as f:
+                    stego_parallel.extract_file(image, f, key=key, progress=progress)
+            except BaseException:
+                # Unvollständige Datei entfernen (fehlt, wenn schon open scheiterte)
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise
+
+        self._start_task(
+            "Decodieren", work,
+            lambda result: messagebox.showinfo("Erfolg", "Datei wurde erfolgreich extrahiert!"),
+            on_error=error
+        )
             
-    def display_images(self, original_pixels, encoded_pixels):
+    def display_images(self, diff):
         """
         Erstellt ein Vergleichsfenster zur Visualisierung der Steganographie-Effekte.
         
         Zeigt drei Bilder nebeneinander:
         1. Originalbild:
-        - Unmodifiziertes Ausgangsbild
+        - Unmodifiziertes Ausgangsbild (Vorschau)
         
         2. Encodiertes Bild:
-        - Bild mit versteckten Daten
+        - Bild mit versteckten Daten (Vorschau)
         - Änderungen für das menschliche Auge meist nicht sichtbar
         
-        3. Differenzbild:
-        - Visualisiert die Unterschiede zwischen Original und kodiertem Bild
-        - Verwendet Heatmap zur Hervorhebung der Änderungen
+        3. Differenz:
+        - Anteil geänderter Bits je Block als Heatmap
         - Enthält Colorbar zur Intensitätsanzeige
         
+        Darüber stehen die exakten Zählwerte: geänderte Pixel, Kanal-Bytes
+        und Bits sowie die betroffenen Bitebenen.
+        
         Args:
-            original_pixels (numpy.ndarray): Pixel-Array des Originalbildes
-            encoded_pixels (numpy.ndarray): Pixel-Array des encodierten Bildes
+            diff (image_diff.ImageDiff): Vergleich von Original und Trägerbild
         
         Technische Details:
         - Nutzt Matplotlib für die Visualisierung
-        - Erstellt ein neues Toplevel-Fenster für die Anzeige
-        - Normalisiert die Differenzwerte für bessere Sichtbarkeit
+        - Erstellt ein neues Toplevel-Fenster (bzw. nutzt das vorhandene)
+        - Vorschaubilder und Raster sind in der Größe begrenzt
+          (image_diff.THUMBNAIL_SIZE, image_diff.DIFF_CELLS), der Aufbau
+          dauert daher auch bei sehr großen Trägern nur kurz
         """
         # Prüfe ob bereits ein Fenster existiert
         if self.display_window is None or not tk.Toplevel.winfo_exists(self.display_window):
             # Erstelle neues Fenster
-            self.display_window = tk.Toplevel(self.display_window)
+            self.display_window = tk.Toplevel(self.main_root)
             self.display_window.title("Bildvergleich")
             #self.display_window.attributes("-zoomed", True)  # Maximiere Fenster
 
@@ -930,8 +1399,8 @@ class SteganographyTool:
             close_button.pack(pady=20)
 
             # Frame für die Bildanzeige
-            self.image_frame = tk.Frame(self.display_window)
-            self.image_frame.pack(
+            self.display_frame = tk.Frame(self.display_window)
+            self.display_frame.pack(
                 side=tk.RIGHT,
                 padx=10, 
                 fill=tk.BOTH, 
@@ -939,163 +1408,82 @@ class SteganographyTool:
             )
             
             # Canvas für Matplotlib erstellen
-            self.fig = Figure(figsize=(12, 4))  # Breites Format für 3 Bilder
-            self.canvas = FigureCanvasTkAgg(self.fig, master=self.image_frame)
-            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-            # Lösche eventuell vorhandene alte Plots
-            self.fig.clear()
-            
-            # Subplot 1: Originalbild
-            ax1 = self.fig.add_subplot(131)  # 1 Zeile, 3 Spalten, Position 1
-            ax1.imshow(original_pixels)
-            ax1.set_title('Original')
-            ax1.axis('off')  # Keine Achsen anzeigen
-            
-            # Subplot 2: Encodiertes Bild
-            ax2 = self.fig.add_subplot(132)  # 1 Zeile, 3 Spalten, Position 2
-            ax2.imshow(encoded_pixels)
-            ax2.set_title('Encodiert')
-            ax2.axis('off')
-            
-            # Subplot 3: Differenzbild
-            # Berechne absolute Differenz und konvertiere zu float für Normalisierung
-            diff = np.abs(encoded_pixels.astype(np.float32) - 
-                        original_pixels.astype(np.float32))
-            
-            # Normalisiere Differenz für bessere Sichtbarkeit
-            if diff.max() > 0:
-                # Skaliere auf Bereich 0-255
-                diff = diff / diff.max() * 255
-                    
-            # Bei RGB-Bildern: Konvertiere zu Grauwert für Differenzanzeige
-            if len(diff.shape) == 3:
-                diff = np.mean(diff, axis=2)
-                    
-            # Erstelle Differenz-Plot
-            ax3 = self.fig.add_subplot(133)  # 1 Zeile, 3 Spalten, Position 3
-            # Verwende 'hot' Colormap für intuitive Darstellung der Änderungen
-            diff_plot = ax3.imshow(diff, cmap='hot')
-            ax3.set_title('Differenz')
-            ax3.axis('off')
-            
-            # Füge Colorbar für Differenzplot hinzu
-            # Zeigt die Intensität der Änderungen an
-            self.fig.colorbar(diff_plot, ax=ax3)
-            
-            # Optimiere Layout
-            self.fig.tight_layout()
-            
-            # Aktualisiere Canvas
-            self.canvas.draw()
-
-
-
-        if not self.current_file:
-            messagebox.showerror("Fehler", "Bitte wählen Sie zuerst ein Bild aus!")
-            return
-
-        if self.display_window is None or not tk.Toplevel.winfo_exists(self.display_window):
-            self.display_window = tk.Toplevel(self.root)
-            self.display_window.title("Analyse")
-            #self.window.attributes("-zoomed", True)
-
-            # Schließen Button
-            close_button = tk.Button(self.window, text="Schließen", command=self.display_window.destroy)
-            close_button.pack(pady=20)
-
-            # Frame für Bildanzeige
-            self.image_frame = tk.Frame(self.display_window)
-            self.image_frame.pack(side=tk.RIGHT, padx=10, fill=tk.BOTH, expand=True)
-            
-            # Canvas für Matplotlib
-            self.fig = Figure(figsize=(12, 4))
-            self.canvas = FigureCanvasTkAgg(self.fig, master=self.image_frame)
-            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-            # Clear previous plots
-            self.fig.clear()
-
-            # Bild öffnen und in Graustufen konvertieren
-            img = Image.open(self.current_file)
-            if img.mode != 'L':  # Falls nicht bereits Graustufen
-                img = img.convert('L')
-            
-            img_array = np.array(img)
-
-            # Erzeuge gleichgroße LSB-Normalverteilung
-            rnd_array = np.random.randint(0,255, (img_array.shape))
-
-
-            # LSB extrahieren
-            lsb_data = img_array & 1
-            
-            # Plot erstellen
-            ax1 = self.fig.add_subplot(131)
-            #ax1.figure(figsize=(15, 12))
-            
-            # LSB-Normalverteilung
-            ax1.imshow(rnd_array, cmap='gray')
-            #ax1.imshow(img_array, cmap='gray')
-            ax1.set_title('Typische LSB-Normalverteilung')
-            ax1.axis('off')
-            
-            # LSB Visualisierung
-            ax2 = self.fig.add_subplot(132)
-            #if len(img_array.shape) == 3:
-            #    lsb_display = np.stack([lsb_data[:,:,0], lsb_data[:,:,1], lsb_data[:,:,2]], axis=-1)
-            #else:
-            #    lsb_display = lsb_data
-            #ax2.imshow(lsb_display, cmap='binary')
-            ax2.imshow(lsb_data, cmap='binary')
-            ax2.set_title('LSB-Visualisierung')
-            ax2.axis('off')
-            
-            # LSB-Verteilung als Barplot / #Histogramm
-            no_zeros = np.count_nonzero(lsb_data==0)
-            no_ones =  np.count_nonzero(lsb_data==1)
-            no_total = lsb_data.size
-            x = [0,1]
-            y = [(no_zeros/no_total),(no_ones/no_total)]
-            ax3 = self.fig.add_subplot(133)
-            #ax3.hist(lsb_data.flatten(), bins=2)
-            ax3.set (xticks = x)
-            ax3.bar(x,y, width=0.5)
-            ax3.set_title('LSB-Verteilung')
-            ax3.set_xlabel('LSB-Wert (0 oder 1)')
-            ax3.set_ylabel('Häufigkeit')
-
-
-
-            
-            #Layout anpassen
-            self.fig.tight_layout()
-            self.canvas.draw()       
+            self.display_fig = Figure(figsize=(12, 4))  # Breites Format für 3 Bilder
+            self.display_canvas = FigureCanvasTkAgg(self.display_fig, master=self.display_frame)
+            self.display_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        # Lösche eventuell vorhandene alte Plots
+        fig = self.display_fig
+        fig.clear()
+        original, encoded = diff.thumbnails
+        if diff.channels <= 2:
+            # Graustufen (bei LA ohne Alphakanal)
+            original, encoded = original[:, :, 0], encoded[:, :, 0]
+        
+        # Subplot 1: Originalbild
+        ax1 = fig.add_subplot(131)  # 1 Zeile, 3 Spalten, Position 1
+        ax1.imshow(original, cmap='gray')
+        ax1.set_title('Original')
+        ax1.axis('off')  # Keine Achsen anzeigen
+        
+        # Subplot 2: Encodiertes Bild
+        ax2 = fig.add_subplot(132)  # 1 Zeile, 3 Spalten, Position 2
+        ax2.imshow(encoded, cmap='gray')
+        ax2.set_title('Encodiert')
+        ax2.axis('off')
+        
+        # Subplot 3: Anteil geänderter Bits je Block
+        # Verwende 'hot' Colormap für intuitive Darstellung der Änderungen
+        ax3 = fig.add_subplot(133)  # 1 Zeile, 3 Spalten, Position 3
+        diff_plot = ax3.imshow(diff.block_share, cmap='hot', interpolation='nearest')
+        ax3.set_title(f'Geänderte Bits je {diff.block}x{diff.block} Block')
+        ax3.axis('off')
+        
+        # Füge Colorbar für Differenzplot hinzu
+        fig.colorbar(diff_plot, ax=ax3)
+        
+        # Exakte Zählwerte über den Bildern
+        planes = ", ".join(f"Bit {bit}: {count}" for bit, count in enumerate(diff.bit_planes) if count)
+        fig.suptitle(
+            f"Geändert: {diff.changed_pixels} von {diff.total_pixels} Pixeln, "
+            f"{diff.changed_values} von {diff.total_values} Kanalwerten, "
+            f"{diff.changed_bits} Bits ({planes or 'keine'})"
+        )
+        
+        # Optimiere Layout
+        fig.tight_layout()
+        
+        # Aktualisiere Canvas
+        self.display_canvas.draw()
 
     def analyse_image(self, image=None):
         """
         Führt eine detaillierte LSB-Analyse des Bildes durch und visualisiert die Ergebnisse.
         
         Die Analyse umfasst drei Hauptkomponenten:
-        1. LSB-Normalverteilung:
-        - Zeigt eine zufällige Verteilung als Referenz
-        - Repräsentiert das erwartete Muster bei unmodifizierten Bildern
-        
-        2. LSB-Visualisierung:
-        - Extrahiert und zeigt die Least Significant Bits
+        1. LSB-Visualisierung:
+        - Zeigt die Least Significant Bits der linken oberen Ecke (max. 256x256)
         - Ermöglicht visuelle Erkennung von Mustern
         - Auffällige Muster können auf versteckte Daten hinweisen
         
-        3. LSB-Verteilungsanalyse:
-        - Zeigt die statistische Verteilung der LSB-Werte (0 und 1)
-        - Berechnet relative Häufigkeiten
-        - Bei unmodifizierten Bildern sollte die Verteilung nahe 50/50 sein
+        2. LSB-Anteil pro Block:
+        - Anteil der 1en in jedem 32x32-Block über alle Farbkanäle
+        - Bei versteckten Daten nahe 0.5, auch in glatten Bildbereichen
+        
+        3. Chi-Quadrat-Test pro Block:
+        - p-Wert des Tests auf angeglichene Wertepaare (2k, 2k+1)
+        - Werte nahe 1 weisen auf eingebettete Daten hin
         
-        Die Visualisierung erfolgt in einem separaten Fenster mit drei Subplot-Bereichen.
+        Die Statistik stammt aus dem Statistik-Kern (siehe steganalysis.image_statistics).
+        Angezeigt werden nur das Block-Raster (bei sehr großen Bildern auf
+        höchstens MAX_GRID_CELLS Zellen pro Achse verkleinert) und der
+        Ausschnitt - der Fensteraufbau dauert damit unabhängig von der
+        Bildgröße etwa gleich lang. Die Statistik wird im Hintergrund
+        berechnet, das Fenster zeigt bis dahin den Fortschritt an.
         
         Fehlerbehandlung:
         - Prüft ob ein Bild geladen ist
-        - Konvertiert Farb- zu Graustufenbildern für die Analyse
+        - Zeigt Fehler beim Lesen des Bildes in einem Dialogfenster an
         """
         if image:
             self.current_file = image
@@ -1134,6 +1522,11 @@ class SteganographyTool:
                 expand=True
             )
             
+            # Fortschritt der Blockstatistik (läuft im Hintergrund)
+            progress_frame = tk.Frame(self.analyse_window)
+            progress_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
+            widgets = self._progress_widgets(progress_frame)
+
             # Matplotlib Figure und Canvas erstellen
             self.fig = Figure(figsize=(12, 4))
             self.canvas = FigureCanvasTkAgg(self.fig, master=self.image_frame)
@@ -1142,61 +1535,99 @@ class SteganographyTool:
             # Lösche eventuell vorhandene alte Plots
             self.fig.clear()
 
-            # Bild laden und zu Graustufen konvertieren
-            img = Image.open(self.current_file)
-            if img.mode != 'L':  # Falls nicht bereits Graustufen
-                img = img.convert('L')
-            
-            img_array = np.array(img)
+            # Blockstatistik aus dem Statistik-Kern (wird mit check_steganography
+            # geteilt) im Hintergrund berechnen, danach im Hauptthread zeichnen
+            image = self.current_file
+            window = self.analyse_window
 
-            # Erzeuge Referenz-Normalverteilung
-            # Zufallswerte im gleichen Format wie das Originalbild
-            rnd_array = np.random.randint(0, 255, (img_array.shape))
+            def close(*args):
+                if window.winfo_exists():
+                    window.destroy()
 
-            # Extrahiere LSBs des Originalbildes
-            lsb_data = img_array & 1
-            
-            # Plot 1: LSB-Normalverteilung (Referenz)
-            ax1 = self.fig.add_subplot(131)
-            ax1.imshow(rnd_array, cmap='gray')
-            ax1.set_title('Typische LSB-Normalverteilung')
-            ax1.axis('off')
-            
-            # Plot 2: LSB-Visualisierung des Originalbildes
-            ax2 = self.fig.add_subplot(132)
-            ax2.imshow(lsb_data, cmap='binary')
-            ax2.set_title('LSB-Visualisierung')
-            ax2.axis('off')
-            
-            # Plot 3: LSB-Verteilungsanalyse als Balkendiagramm
-            # Berechne relative Häufigkeiten
-            no_zeros = np.count_nonzero(lsb_data==0)  # Anzahl der 0en
-            no_ones = np.count_nonzero(lsb_data==1)   # Anzahl der 1en
-            no_total = lsb_data.size                   # Gesamtanzahl Pixel
-            
-            # Erstelle Daten für Balkendiagramm
-            x = [0, 1]  # X-Achse: LSB-Werte
-            # Y-Achse: Relative Häufigkeiten
-            y = [(no_zeros/no_total), (no_ones/no_total)]
-            
-            # Plot Balkendiagramm
-            ax3 = self.fig.add_subplot(133)
-            ax3.set(xticks=x)  # Setze X-Achsen-Beschriftung
-            ax3.bar(x, y, width=0.5)  # Erstelle Balken
-            ax3.set_title('LSB-Verteilung')
-            ax3.set_xlabel('LSB-Wert (0 oder 1)')
-            ax3.set_ylabel('Häufigkeit')
-
-            # Optimiere Layout
-            self.fig.tight_layout()
-            
-            # Aktualisiere Canvas
-            self.canvas.draw()
+            def error(e):
+                messagebox.showerror("Fehler", f"Fehler bei der Analyse: {str(e)}")
+                close()
+
+            try:
+                document = self._document(image)  # Im Hauptthread, nicht im Hintergrund
+            except Exception as e:
+                error(e)
+                return
+            task = self._start_task(
+                "Analyse",
+                lambda progress: self._statistics(document, progress),
+                lambda stats: self._plot_analysis(stats, window),
+                on_error=error, on_cancel=close, widgets=widgets
+            )
+            if task is None:
+                close()
+
+    def _plot_analysis(self, stats, window):
+        """
+        Zeichnet die Blockstatistik in das Analysefenster (siehe analyse_image).
+        
+        Es wird nie das ganze Bild an Matplotlib übergeben, nur das
+        Block-Raster und ein Ausschnitt.
+        
+        Args:
+            stats (ImageStatistics): Ergebnis von steganalysis.image_statistics
+            window: Analysefenster, für das die Statistik berechnet wurde
+        """
+        # Fenster inzwischen geschlossen
+        if not window.winfo_exists():
+            return
+        if not stats.block_mean.size:
+            messagebox.showerror(
+                "Fehler",
+                f"Fehler bei der Analyse: Bild ist kleiner als ein Block ({stats.block} Pixel)"
+            )
+            window.destroy()
+            return
+        block = stats.block
+
+        # Plot 1: LSB-Ebene der linken oberen Ecke in voller Auflösung
+        # (dort beginnt die Einbettung am Stück; verkleinert wären die Muster nicht sichtbar)
+        ax1 = self.fig.add_subplot(131)
+        ax1.imshow(stats.preview, cmap='binary', interpolation='nearest')
+        ax1.set_title('LSB-Ebene (Ausschnitt)')
+        ax1.axis('off')
+        
+        # Plot 2: LSB-Anteil pro Block - 0.5 bei Rauschen wie bei versteckten Daten,
+        # glatte Bildbereiche weichen davon ab
+        ax2 = self.fig.add_subplot(132)
+        mean_plot = ax2.imshow(
+            steganalysis.reduce_grid(stats.block_mean, MAX_GRID_CELLS, np.mean),
+            cmap='coolwarm', vmin=0, vmax=1, interpolation='nearest'
+        )
+        ax2.set_title(f'LSB-Anteil je {block}x{block} Block\n'
+                      f'(gesamt {stats.lsb_share:.3f})')
+        ax2.axis('off')
+        self.fig.colorbar(mean_plot, ax=ax2)
+        
+        # Plot 3: Chi-Quadrat-p-Wert pro Block - helle Blöcke sind verdächtig
+        ax3 = self.fig.add_subplot(133)
+        p_plot = ax3.imshow(
+            steganalysis.reduce_grid(stats.block_p_value, MAX_GRID_CELLS, np.max),
+            cmap='hot', vmin=0, vmax=1, interpolation='nearest'
+        )
+        ax3.set_title('Chi-Quadrat p-Wert je Block')
+        ax3.axis('off')
+        self.fig.colorbar(p_plot, ax=ax3)
+
+        # Optimiere Layout
+        self.fig.tight_layout()
+        
+        # Aktualisiere Canvas
+        self.canvas.draw()
 
 
 
 if __name__ == "__main__":
-    print ("Standalonefunktion deaktiviert. Bitte die Hauptapp starten!")
+    # Ohne GUI: Batch-Verarbeitung über die Kommandozeile (siehe stego_cli)
+    # Die GUI wird weiterhin über main.py gestartet.
+    import sys
+    from logic import stego_cli
+    sys.exit(stego_cli.main())
 #    root = tk.Tk()
 #    app = SteganographyTool(root)
 #   root.mainloop()
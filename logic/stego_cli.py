@@ -0,0 +1,437 @@
+#############################
+# Kommandozeile für das Steganographie-Tool
+# Gruppe: B2-4
+##############################
+
+"""
+Batch-Verarbeitung ohne GUI: Einbetten, Extrahieren, Kapazitätsabfrage und
+Steganalyse für viele Trägerbilder auf einmal.
+
+Aufruf (aus dem Projektverzeichnis):
+    python -m logic.steganotool embed --payload geheim.txt --output-dir out/ bilder/
+    python -m logic.steganotool extract --output-dir daten/ "out/*.png" --jobs 8
+    python -m logic.steganotool capacity bilder/ --summary kapazitaet.jsonl
+    python -m logic.steganotool scan archiv/ -r --jobs 8 --summary scan.jsonl --resume
+    python -m logic.steganotool shard --payload gross.bin --output-dir out/ bilder/ --jobs 8
+    python -m logic.steganotool join --output gross.bin "out/*.png" --jobs 8
+
+Eingaben können Dateien, Verzeichnisse oder Glob-Muster sein. Die Dateien
+werden mit --jobs N parallel in einem Prozess-Pool verarbeitet. Für jede Datei
+wird eine JSON-Zeile (JSONL) mit Status und Laufzeit geschrieben, der
+Fortschritt erscheint auf stderr - ein Display wird nicht benötigt.
+
+Beim Befehl scan ist die JSONL-Datei zugleich der Checkpoint: Jede Zeile wird
+sofort geschrieben. Mit --resume werden die vorhandenen Zeilen gelesen und
+Dateien mit unveränderter Größe und Änderungszeit übersprungen - nach einem
+Abbruch geht so höchstens die gerade laufende Arbeit verloren.
+
+shard verteilt eine Datei auf mehrere Trägerbilder (ein Auftrag pro Teil,
+siehe stego_shards), join setzt die Teile in beliebiger Reihenfolge wieder
+zusammen und prüft sie anschließend als Ganzes.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logic import steganalysis, stego_codec, stego_parallel, stego_shards
+
+# Dateiendungen, die bei Verzeichnis-Eingaben berücksichtigt werden
+IMAGE_EXTENSIONS = ('.png', '.bmp', '.jpg', '.jpeg', '.ppm', '.pgm', '.npy', '.tif', '.tiff')
+
+
+def collect_inputs(patterns, recursive=False):
+    """
+    Löst Dateien, Verzeichnisse und Glob-Muster in eine sortierte Dateiliste auf.
+
+    Args:
+        patterns (list): Pfade oder Glob-Muster
+        recursive (bool): Verzeichnisse rekursiv durchsuchen
+
+    Returns:
+        list: Eindeutige Dateipfade in stabiler Reihenfolge
+    """
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            if recursive:
+                walker = (os.path.join(root, name)
+                          for root, _dirs, names in os.walk(pattern) for name in names)
+            else:
+                walker = (os.path.join(pattern, name) for name in os.listdir(pattern))
+            files.extend(path for path in walker
+                         if path.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path))
+        elif glob.has_magic(pattern):
+            files.extend(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            files.append(pattern)
+    return sorted(set(files))
+
+
+def carrier_capacity(path, depth=1, need=None):
+    """
+    Ermittelt Abmessungen und Kapazität eines Trägers ohne die Pixel zu dekodieren.
+
+    Args:
+        path: Pfad zum Trägerbild
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+        need (int): Größe der geplanten Nutzdaten in Bytes (optional)
+
+    Returns:
+        dict: Felder aus stego_codec.carrier_info, dazu depth und capacity
+            (Bytes bei dieser Bittiefe); mit need zusätzlich fits und
+            min_depth (kleinste passende Bittiefe oder None)
+    """
+    result = stego_codec.carrier_info(path)
+    result["depth"] = depth
+    result["capacity"] = result["capacities"][depth]
+    if need is not None:
+        result["fits"] = result["capacity"] >= need
+        result["min_depth"] = next((bits for bits, size in result["capacities"].items() if size >= need), None)
+    return result
+
+
+def scan_file(path):
+    """
+    Prüft ein Bild auf versteckte Daten wie check_steganography, aber ohne GUI.
+
+    Zuerst wird der Header dieses Tools gesucht, ohne Header folgt die
+    statistische Steganalyse (Bild wird bandweise gelesen).
+
+    Args:
+        path: Pfad zum Bild
+
+    Returns:
+        dict: payload_found, suspicious und entweder header oder rate,
+            chi_p_value und rates (geschätzte Einbettungsrate pro Kanal)
+    """
+    header = stego_codec.read_header(path)
+    if header is not None:
+        return {"payload_found": True, "suspicious": True, "header": header}
+    analysis = steganalysis.analyse_file(path)
+    return {
+        "payload_found": False,
+        "suspicious": analysis["suspicious"],
+        "rate": round(analysis["rate"], 6),
+        "chi_p_value": round(analysis["chi_p_value"], 6),
+        "rates": {channel["name"]: round(channel["rate"], 6) for channel in analysis["channels"]},
+    }
+
+
+def load_checkpoint(path):
+    """
+    Liest einen vorhandenen Scan-Bericht als Checkpoint.
+
+    Args:
+        path: JSONL-Datei eines früheren scan-Laufs
+
+    Returns:
+        dict: Absoluter Pfad -> (Größe, Änderungszeit) aller erfolgreich
+            geprüften Dateien; leer, wenn die Datei nicht existiert
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8') as report:
+        for line in report:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Letzte Zeile nach einem Abbruch evtl. unvollständig
+            if entry.get("command") == "scan" and entry.get("status") == "ok":
+                done[os.path.abspath(entry["input"])] = (entry["size"], entry["mtime_ns"])
+    return done
+
+
+def run_job(job):
+    """
+    Führt einen einzelnen Auftrag aus (läuft im Worker-Prozess).
+
+    Args:
+        job (dict): command, input und die befehlsabhängigen Optionen
+
+    Returns:
+        dict: Ergebniszeile für die JSONL-Zusammenfassung
+    """
+    result = {"command": job["command"], "input": job["input"]}
+    start = time.perf_counter()
+    try:
+        if job["command"] == "embed":
+            with open(job["payload"], 'rb') as payload:
+                result["bytes"] = stego_parallel.embed_file(job["input"], payload, job["output"],
+                                                            depth=job["depth"],
+                                                            compression=job["compression"],
+                                                            workers=job["workers"],
+                                                            key=job["key"])
+            result["output"] = job["output"]
+        elif job["command"] == "extract":
+            try:
+                with open(job["output"], 'wb') as output:
+                    result["bytes"] = stego_parallel.extract_file(job["input"], output,
+                                                                  job["workers"], job["key"])
+            except Exception:
+                # Unvollständige Datei entfernen (fehlt, wenn schon open scheiterte)
+                if os.path.exists(job["output"]):
+                    os.remove(job["output"])
+                raise
+            result["output"] = job["output"]
+        elif job["command"] == "capacity":
+            result.update(carrier_capacity(job["input"], job["depth"], job["need"]))
+        elif job["command"] == "scan":
+            result["size"], result["mtime_ns"] = job["size"], job["mtime_ns"]
+            result.update(scan_file(job["input"]))
+        elif job["command"] == "shard":
+            shard = stego_shards.embed_shard(job)
+            result.update(output=shard["output"], index=shard["index"], count=shard["count"],
+                          bytes=shard["length"])
+        elif job["command"] == "join":
+            manifest = stego_shards.extract_shard(job["input"], job["output"], job["key"])
+            result.update((name, value) for name, value in manifest.items() if name != "image")
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def build_jobs(args, files):
+    """Erstellt die Auftragsliste für den gewählten Befehl."""
+    if args.command == "shard":
+        # Ein Auftrag pro benötigtem Träger, nicht pro Eingabedatei
+        outputs = [os.path.join(args.output_dir, os.path.splitext(os.path.basename(path))[0] + ".png")
+                   for path in files]
+        _check_outputs(files, outputs)
+        compression = None if args.compress == "none" else args.compress
+        return [dict(job, command="shard", input=job["image"])
+                for job in stego_shards.shard_jobs(args.payload, files, outputs, args.bits,
+                                                   compression, args.key)]
+    jobs = []
+    for path in files:
+        job = {"command": args.command, "input": path}
+        stem, extension = os.path.splitext(os.path.basename(path))
+        if args.command == "embed":
+            if args.keep_format and stego_codec.uses_memmap(path):
+                job["output"] = os.path.join(args.output_dir, stem + extension)
+            else:
+                job["output"] = os.path.join(args.output_dir, stem + ".png")
+            job["payload"] = args.payload
+            job["depth"] = args.bits
+            job["compression"] = None if args.compress == "none" else args.compress
+            job["workers"] = args.workers
+            job["key"] = args.key
+        elif args.command == "extract":
+            job["output"] = os.path.join(args.output_dir, stem + args.suffix)
+            job["workers"] = args.workers
+            job["key"] = args.key
+        elif args.command == "capacity":
+            job["depth"] = args.bits
+            job["need"] = args.need
+        elif args.command == "scan":
+            stat = os.stat(path)
+            job["size"], job["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+        elif args.command == "join":
+            job["output"] = args.output
+            job["key"] = args.key
+        jobs.append(job)
+    if args.command in ("embed", "extract"):
+        _check_outputs(files, [job["output"] for job in jobs])
+    return jobs
+
+
+def _check_outputs(files, outputs):
+    """
+    Prüft, dass keine zwei Eingabedateien in dieselbe Ausgabedatei schreiben.
+
+    Das passiert bei gleichem Dateinamen in verschiedenen Verzeichnissen
+    (a/x.jpg, b/x.png) oder bei gleichem Namen mit anderer Endung (x.bmp, x.png).
+
+    Raises:
+        ValueError: Mit allen Eingabedateien, die sich eine Ausgabedatei teilen
+    """
+    targets = {}
+    for path, output in zip(files, outputs):
+        targets.setdefault(os.path.normcase(os.path.abspath(output)), []).append(path)
+    clashes = [f"{output} <- {', '.join(paths)}" for output, paths in targets.items() if len(paths) > 1]
+    if clashes:
+        raise ValueError("Mehrere Eingabedateien würden dieselbe Ausgabedatei schreiben:\n  "
+                         + "\n  ".join(clashes))
+
+
+def run_jobs(jobs, worker_count, summary, progress=sys.stderr, results=None):
+    """
+    Verarbeitet alle Aufträge und schreibt die Ergebnisse sofort als JSONL.
+
+    Args:
+        jobs (list): Aufträge aus build_jobs
+        worker_count (int): Anzahl Worker-Prozesse (1 = im aktuellen Prozess)
+        summary: Textdatei für die JSONL-Zeilen
+        progress: Textdatei für Fortschrittsmeldungen
+        results (list): Sammelt zusätzlich alle Ergebniszeilen (optional)
+
+    Returns:
+        int: Anzahl fehlgeschlagener Aufträge
+    """
+    failed = 0
+    start = time.perf_counter()
+
+    def report(done, result):
+        nonlocal failed
+        if result["status"] != "ok":
+            failed += 1
+        if results is not None:
+            results.append(result)
+        summary.write(json.dumps(result, ensure_ascii=False) + "\n")
+        summary.flush()
+        print(f"[{done}/{len(jobs)}] {result['input']}: {result['status']} "
+              f"({result['seconds']:.3f} s)", file=progress, flush=True)
+
+    if worker_count <= 1:
+        for done, job in enumerate(jobs, 1):
+            report(done, run_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=worker_count) as pool:
+            futures = [pool.submit(run_job, job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                report(done, future.result())
+
+    elapsed = time.perf_counter() - start
+    rate = len(jobs) / elapsed if elapsed else 0.0
+    print(f"{len(jobs)} Dateien in {elapsed:.2f} s ({rate:.1f} Dateien/s), {failed} Fehler",
+          file=progress, flush=True)
+    return failed
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m logic.steganotool",
+        description="LSB-Steganographie für viele Bilder ohne GUI",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(sub):
+        sub.add_argument("inputs", nargs="+", help="Dateien, Verzeichnisse oder Glob-Muster")
+        sub.add_argument("-r", "--recursive", action="store_true",
+                         help="Verzeichnisse rekursiv durchsuchen")
+        sub.add_argument("-j", "--jobs", type=int, default=1,
+                         help="Anzahl paralleler Worker-Prozesse (Standard: 1)")
+        sub.add_argument("--summary", default="-",
+                         help="Ziel für die JSONL-Zusammenfassung (Standard: stdout)")
+
+    embed = commands.add_parser("embed", help="Daten in Trägerbildern verstecken")
+    add_common(embed)
+    embed.add_argument("-p", "--payload", required=True, help="Zu versteckende Datei")
+    embed.add_argument("-o", "--output-dir", required=True, help="Zielverzeichnis")
+    embed.add_argument("-b", "--bits", type=int, default=1, choices=range(1, stego_codec.MAX_DEPTH + 1),
+                       help="Genutzte Bits pro Farbkanal (Standard: 1)")
+    embed.add_argument("-c", "--compress", default="none",
+                       choices=["none", "auto"] + list(stego_codec.COMPRESSION_METHODS),
+                       help="Nutzdaten vor dem Einbetten komprimieren (Standard: none)")
+    embed.add_argument("--keep-format", action="store_true",
+                       help="Unkomprimierte Träger (BMP, PGM/PPM, NPY) im selben Format "
+                            "per Memory-Mapping schreiben statt als PNG")
+
+    extract = commands.add_parser("extract", help="Versteckte Daten extrahieren")
+    add_common(extract)
+    extract.add_argument("-o", "--output-dir", required=True, help="Zielverzeichnis")
+    extract.add_argument("--suffix", default=".bin", help="Endung der extrahierten Dateien")
+    for sub in (embed, extract):
+        sub.add_argument("-w", "--workers", type=int, default=1,
+                         help="Worker-Prozesse pro Bild für sehr große Träger (Standard: 1)")
+        sub.add_argument("-k", "--key",
+                         help="Schlüssel: Daten an schlüsselabhängigen Positionen verstreuen")
+
+    capacity = commands.add_parser("capacity", help="Kapazität der Trägerbilder anzeigen")
+    add_common(capacity)
+    capacity.add_argument("-b", "--bits", type=int, default=1, choices=range(1, stego_codec.MAX_DEPTH + 1),
+                          help="Genutzte Bits pro Farbkanal (Standard: 1)")
+    capacity.add_argument("--need", type=int, metavar="BYTES",
+                          help="Größe der Nutzdaten: gibt fits und min_depth pro Träger aus")
+
+    scan = commands.add_parser("scan", help="Bilder auf versteckte Daten untersuchen (Steganalyse)")
+    add_common(scan)
+    scan.add_argument("--resume", action="store_true",
+                      help="Bericht (--summary) fortsetzen, unveränderte Dateien überspringen")
+
+    shard = commands.add_parser("shard", help="Eine Datei auf mehrere Trägerbilder verteilen")
+    add_common(shard)
+    shard.add_argument("-p", "--payload", required=True, help="Zu versteckende Datei")
+    shard.add_argument("-o", "--output-dir", required=True, help="Zielverzeichnis")
+    shard.add_argument("-b", "--bits", type=int, default=1, choices=range(1, stego_codec.MAX_DEPTH + 1),
+                       help="Genutzte Bits pro Farbkanal (Standard: 1)")
+    shard.add_argument("-c", "--compress", default="none",
+                       choices=["none", "auto"] + list(stego_codec.COMPRESSION_METHODS),
+                       help="Teile vor dem Einbetten komprimieren (Standard: none)")
+
+    join = commands.add_parser("join", help="Verteilte Daten wieder zusammensetzen")
+    add_common(join)
+    join.add_argument("-o", "--output", required=True, help="Zieldatei")
+    for sub in (shard, join):
+        sub.add_argument("-k", "--key",
+                         help="Schlüssel: Daten an schlüsselabhängigen Positionen verstreuen")
+    return parser
+
+
+def main(argv=None):
+    """
+    Einstiegspunkt der Kommandozeile.
+
+    Returns:
+        int: Exit-Code (0 = alle Dateien erfolgreich)
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    resume = getattr(args, "resume", False)
+    if resume and args.summary == "-":
+        parser.error("--resume benötigt eine Berichtsdatei (--summary)")
+
+    files = collect_inputs(args.inputs, args.recursive)
+    if not files:
+        print("Keine Eingabedateien gefunden", file=sys.stderr)
+        return 2
+
+    if getattr(args, "output_dir", None):
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    try:
+        jobs = build_jobs(args, files)
+    except ValueError as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+    if args.command == "join":
+        open(args.output, 'wb').close()  # Die Worker schreiben an ihre Offsets
+    if resume:
+        # Bereits geprüfte, unveränderte Dateien überspringen
+        done = load_checkpoint(args.summary)
+        jobs = [job for job in jobs
+                if done.get(os.path.abspath(job["input"])) != (job["size"], job["mtime_ns"])]
+        print(f"{len(files) - len(jobs)} unveränderte Dateien übersprungen",
+              file=sys.stderr, flush=True)
+
+    results = []
+    if args.summary == "-":
+        failed = run_jobs(jobs, args.jobs, sys.stdout, results=results)
+    else:
+        with open(args.summary, 'a' if resume else 'w', encoding='utf-8') as summary:
+            failed = run_jobs(jobs, args.jobs, summary, results=results)
+
+    if args.command == "join":
+        try:
+            if failed:
+                raise ValueError(f"{failed} Teile konnten nicht gelesen werden")
+            size = stego_shards.finish(args.output, results)
+        except ValueError as e:
+            os.remove(args.output)  # Unvollständige Datei entfernen
+            print(f"Fehler: {e}", file=sys.stderr)
+            return 1
+        print(f"{size} Bytes aus {len(results)} Teilen nach {args.output} geschrieben",
+              file=sys.stderr, flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1197 @@
+#############################
+# Steganographie-Codec (ohne GUI)
+# Gruppe: B2-4
+##############################
+
+"""
+Vektorisierter LSB-Codec für das Steganographie-Tool.
+
+Das Modul enthält die reine Bit-Logik ohne Tkinter-Abhängigkeit, damit sie
+auch aus Skripten oder Batch-Prozessen genutzt werden kann.
+
+Aufbau der versteckten Daten:
+- Die ersten 112 Kanal-Bytes enthalten den Header, immer ein Bit pro Kanal-Byte
+  (14 Byte, big-endian):
+    Magic "B24S" (4) | Version (1) | Flags (1) | Datengröße (4) | CRC32 (4)
+  Die Flags enthalten Bittiefe (Bits 0-1), Kompressionsverfahren (Bits 2-3)
+  und die verstreute Einbettung (Bit 4). Datengröße und CRC32 beziehen sich
+  auf die gespeicherten (ggf. komprimierten) Nutzdaten.
+- Danach folgen die Nutzdaten mit k Bits pro Kanal-Byte (k = 1..4, MSB zuerst)
+
+Verstreute Einbettung (key): Die Nutzdaten landen nicht ab Kanal-Byte 112 am
+Stück, sondern an schlüsselabhängigen Positionen. Die Positionen liefert eine
+Feistel-Permutation über den Indexraum mit Cycle-Walking (_KeyedPermutation),
+blockweise berechnet - eine Permutationstabelle in Bildgröße entsteht nie.
+Dafür wird das Trägerbild vollständig geladen (bzw. per np.memmap eingeblendet).
+
+Über Magic und Version werden Bilder ohne versteckte Daten nach wenigen
+Dutzend Pixeln erkannt (read_header), statt eine zufällige Länge zu lesen und
+bis zu Bildgröße Datenmüll zu verarbeiten. Die CRC32 deckt beschädigte oder
+abgeschnittene Nutzdaten beim Extrahieren auf.
+
+Ältere Versionen des Tools schrieben nur die Datengröße (32 Bits, big-endian)
+und danach die Nutzdaten mit einem Bit pro Kanal-Byte. Fehlt die Magic,
+lesen extract und extract_rows dieses Format, sofern die Größe ins Bild
+passt (ohne Prüfsumme). read_header erkennt es bewusst nicht.
+
+Bei k = 2 und 4 wird jedes Nutzdaten-Byte mit 8/k Shift/Mask-Operationen in
+Gruppen zerlegt. Bei k = 3 werden je drei Bytes zu einer 24-Bit-Zahl
+zusammengefasst und in acht Gruppen zerlegt. Pro Nutzdaten-Byte werden dadurch
+nur 8/k Kanal-Bytes gelesen bzw. geschrieben.
+
+Optional werden die Nutzdaten vor dem Einbetten mit zlib, bz2 oder lzma
+komprimiert (fest gewählt oder "auto": Probe der ersten 256 KiB mit allen
+Verfahren). Die komprimierten Daten werden dafür in eine SpooledTemporaryFile
+geschrieben, die ab 16 MiB auf die Festplatte ausweicht - nur so ist die
+Länge für den Header vorab bekannt. Beim Extrahieren wird blockweise entpackt.
+
+Für große Bilder gibt es zusätzlich extract_rows/extract_file: Sie lesen das
+Trägerbild zeilenweise (siehe png_stream) und hören auf, sobald die im Header
+angegebene Datenmenge vollständig ist. Die Daten werden blockweise in eine
+Ausgabedatei geschrieben.
+
+Das Gegenstück embed_rows/embed_file liest Trägerbild und Nutzdaten ebenfalls
+blockweise und schreibt die veränderten Zeilen direkt in den PNG-Encoder.
+Im Speicher liegen dabei nur wenige Zeilen und ein Block der Nutzdaten.
+
+Performance:
+Die Umwandlung Bytes <-> Bits erfolgt ausschließlich mit np.unpackbits bzw.
+np.packbits, das Setzen der LSBs mit In-Place-Bitmasken. Es entstehen keine
+Python-Objekte pro Bit oder Byte. Zielwert: mindestens 100 MB/s Nutzdaten
+auf einem Kern (entspricht 800 MB/s bearbeiteter Kanal-Bytes).
+"""
+
+import bz2
+import hashlib
+import io
+import lzma
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from logic import png_stream, raw_carrier
+
+MAGIC = b'B24S'                  # Kennung am Anfang des Headers
+HEADER_VERSION = 1               # Aktuelle Version des Header-Formats
+HEADER_FORMAT = '>4sBBII'        # Magic, Version, Flags, Datengröße, CRC32
+HEADER_BYTES = struct.calcsize(HEADER_FORMAT)
+HEADER_BITS = HEADER_BYTES * 8   # Header-Länge in Kanal-Bytes (1 Bit pro Kanal)
+LEGACY_HEADER_BITS = 32          # Altes Format: nur Datengröße (4 Byte), 1 Bit pro Kanal
+PROBE_BAND_BYTES = 64 * 1024     # Bandgröße, wenn nur der Header gelesen wird
+MAX_DEPTH = 4                    # Maximale Anzahl Bits pro Kanal-Byte
+DEPTH_MASK = 0x03                # Flags: Bits 0-1 = Bittiefe - 1
+COMPRESSION_SHIFT = 2            # Flags: Bits 2-3 = Kompressionsverfahren
+SCATTER_FLAG = 0x10              # Flags: Bit 4 = verstreut mit Schlüssel eingebettet
+SCATTER_CHUNK = 1 << 20          # Anzahl Positionen pro Block bei verstreuter Einbettung
+FEISTEL_ROUNDS = 4               # Runden der Feistel-Permutation
+CHUNK_SIZE = 1024 * 1024         # Blockgröße beim Streamen der Nutzdaten
+SAMPLE_SIZE = 256 * 1024         # Probengröße für die automatische Kompressionswahl
+SPOOL_SIZE = 16 * 1024 * 1024    # Ab dieser Größe landen komprimierte Daten auf der Festplatte
+
+# Kompressionsverfahren -> Kennung im Header (0 = unkomprimiert)
+COMPRESSION_METHODS = {'zlib': 1, 'bz2': 2, 'lzma': 3}
+COMPRESSION_NAMES = {method: name for name, method in COMPRESSION_METHODS.items()}
+_COMPRESSORS = {
+    1: lambda: zlib.compressobj(9),
+    2: lambda: bz2.BZ2Compressor(9),
+    3: lambda: lzma.LZMACompressor(),
+}
+_DECOMPRESSORS = {
+    1: zlib.decompressobj,
+    2: bz2.BZ2Decompressor,
+    3: lzma.LZMADecompressor,
+}
+
+
+def capacity(pixels, depth=1):
+    """
+    Berechnet die maximale Nutzdatengröße für ein Trägerbild.
+
+    Args:
+        pixels (numpy.ndarray): Pixel-Array des Trägerbildes (uint8)
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+
+    Returns:
+        int: Anzahl der Bytes, die nach dem Header versteckt werden können
+    """
+    return capacity_for_values(np.asarray(pixels).size, depth)
+
+
+def capacity_for_values(total_values, depth=1):
+    """
+    Berechnet die maximale Nutzdatengröße aus der Anzahl der Kanal-Bytes.
+
+    Args:
+        total_values (int): Breite * Höhe * Kanäle des Trägerbildes
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+
+    Returns:
+        int: Anzahl der Bytes, die nach dem Header versteckt werden können
+    """
+    _check_depth(depth)
+    return max(0, (total_values - HEADER_BITS) * depth // 8)
+
+
+def embed(pixels, payload, inplace=False, depth=1, compression=None, key=None):
+    """
+    Versteckt Nutzdaten in den LSBs eines Pixel-Arrays.
+
+    Args:
+        pixels (numpy.ndarray): Pixel-Array des Trägerbildes (uint8)
+        payload (bytes): Zu versteckende Daten
+        inplace (bool): Wenn True, wird das übergebene Array direkt verändert
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+        compression (str): None, 'auto', 'zlib', 'bz2' oder 'lzma'
+        key (str): Schlüssel für die verstreute Einbettung (None = am Stück)
+
+    Returns:
+        numpy.ndarray: Pixel-Array mit versteckten Daten (gleiche Form wie pixels)
+
+    Raises:
+        ValueError: Wenn die Daten nicht in das Bild passen
+    """
+    method = 0
+    if compression:
+        stored, _size, method, _crc = _prepare_payload(io.BytesIO(payload), len(payload),
+                                                       compression, CHUNK_SIZE)
+        payload = stored.read()
+    payload = memoryview(payload).cast('B')
+    if len(payload) > capacity(pixels, depth):
+        raise ValueError(
+            f"Daten zu groß! Maximal möglich: {capacity(pixels, depth)} Bytes"
+        )
+
+    if inplace:
+        result = pixels
+    else:
+        result = np.array(pixels, dtype=np.uint8, copy=True)
+
+    if key is not None:
+        _embed_keyed(result, io.BytesIO(payload), len(payload), depth, method,
+                     zlib.crc32(payload), key)
+        return result
+
+    # Header und Nutzdaten als Bitgruppen, ohne Zwischenkopie der Nutzdaten
+    header = _pack_header(len(payload), depth, method, zlib.crc32(payload))
+    header_bits = np.unpackbits(np.frombuffer(header, dtype=np.uint8))
+    data_values = _split_bits(np.frombuffer(payload, dtype=np.uint8), depth)
+
+    # reshape(-1) liefert bei zusammenhängenden Arrays eine View
+    flat = result.reshape(-1)
+    _write_lsb(flat[:HEADER_BITS], header_bits, 1)
+    _write_lsb(flat[HEADER_BITS:HEADER_BITS + data_values.size], data_values, depth)
+
+    if not np.shares_memory(flat, result):
+        # Nicht zusammenhängendes Array: Ergebnis zurückschreiben
+        result[...] = flat.reshape(result.shape)
+    return result
+
+
+def embed_rows(bands, payload, payload_size, chunk_size=CHUNK_SIZE, depth=1,
+               compression=0, crc=None):
+    """
+    Versteckt Nutzdaten aus einem Dateiobjekt in einer Folge von Pixel-Bändern.
+
+    Die Nutzdaten werden nur blockweise gelesen. Bänder hinter dem Ende der
+    Daten werden unverändert weitergereicht.
+
+    Args:
+        bands: Iterierbare Folge von uint8-Arrays (z. B. PNGRowReader.iter_bands())
+        payload: Binäres Dateiobjekt mit den zu versteckenden Daten
+        payload_size (int): Anzahl der zu versteckenden Bytes
+        chunk_size (int): Mindestanzahl Bytes, die pro Lesevorgang gelesen werden
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+        compression (int): Kennung aus COMPRESSION_METHODS, falls payload bereits
+                           komprimiert ist (wird nur im Header vermerkt)
+        crc (int): CRC32 der Nutzdaten; None = vorab aus payload berechnen
+                   (payload muss dann zurückspulbar sein)
+
+    Yields:
+        numpy.ndarray: Die (ggf. veränderten) Bänder in derselben Form
+    """
+    if crc is None:
+        crc = _payload_crc(payload, payload_size, chunk_size)
+    source = _ValueSource(payload, payload_size, depth, chunk_size, compression, crc)
+    for band in bands:
+        if source.exhausted:
+            yield band
+            continue
+        band = np.array(band, dtype=np.uint8, copy=True)
+        source.write_next(band.reshape(-1))
+        yield band
+
+    if not source.exhausted:
+        raise ValueError("Nicht genügend Platz im Bild!")
+
+
+def embed_inplace(bands, payload, payload_size, chunk_size=CHUNK_SIZE, depth=1,
+                  compression=0, crc=None):
+    """
+    Versteckt Nutzdaten direkt in beschreibbaren Pixel-Views (z. B. np.memmap).
+
+    Es werden nur die Bänder angefasst, die für Header und Nutzdaten nötig sind.
+
+    Args:
+        bands: Iterierbare Folge beschreibbarer uint8-Views
+        payload: Binäres Dateiobjekt mit den zu versteckenden Daten
+        payload_size (int): Anzahl der zu versteckenden Bytes
+        chunk_size (int): Mindestanzahl Bytes, die pro Lesevorgang gelesen werden
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+        compression (int): Kennung aus COMPRESSION_METHODS, falls payload bereits
+                           komprimiert ist (wird nur im Header vermerkt)
+        crc (int): CRC32 der Nutzdaten; None = vorab aus payload berechnen
+                   (payload muss dann zurückspulbar sein)
+
+    Raises:
+        ValueError: Wenn die Daten nicht in die Bänder passen
+    """
+    if crc is None:
+        crc = _payload_crc(payload, payload_size, chunk_size)
+    source = _ValueSource(payload, payload_size, depth, chunk_size, compression, crc)
+    for band in bands:
+        if source.exhausted:
+            return
+        # Band als zusammenhängende Kopie bearbeiten und zurückschreiben,
+        # da Views (z. B. BMP: BGR, von unten nach oben) nicht flach sind
+        modified = np.array(band, copy=True)
+        source.write_next(modified.reshape(-1))
+        band[...] = modified
+
+    if not source.exhausted:
+        raise ValueError("Nicht genügend Platz im Bild!")
+
+
+def open_carrier(image_path, writable=False, band_bytes=png_stream.BAND_BYTES):
+    """
+    Öffnet ein Trägerbild für den zeilenweisen Zugriff.
+
+    Unkomprimierte Formate werden per Memory-Mapping eingeblendet, PNG wird
+    gestreamt, alle anderen Formate werden über Pillow dekodiert.
+
+    Args:
+        image_path: Pfad zum Bild
+        writable (bool): Nur für Memory-Mapping: Änderungen in die Datei schreiben
+        band_bytes (int): Ungefähre Größe der gelieferten Bänder in Bytes
+
+    Returns:
+        raw_carrier.RawCarrier, png_stream.PNGRowReader oder png_stream.DecodedRowReader
+    """
+    if raw_carrier.is_raw_carrier(image_path):
+        return raw_carrier.RawCarrier(image_path, writable, band_bytes)
+    if writable:
+        raise ValueError("Format kann nicht direkt verändert werden")
+    return png_stream.open_rows(image_path, band_bytes)
+
+
+def uses_memmap(image_path, output_path=None):
+    """
+    Prüft, ob embed_file für diese Kombination den Memory-Mapping-Modus nutzt.
+
+    Das ist der Fall, wenn der Träger unkomprimiert ist und die Ausgabe
+    entweder fehlt (Träger wird direkt verändert) oder dieselbe Endung hat.
+    """
+    if not raw_carrier.is_raw_carrier(image_path):
+        return False
+    if output_path is None:
+        return True
+    return os.path.splitext(output_path)[1].lower() == os.path.splitext(image_path)[1].lower()
+
+
+def embed_file(image_path, payload, output_path, payload_size=None,
+               chunk_size=CHUNK_SIZE, compress_level=6, depth=1, compression=None,
+               key=None, progress=None):
+    """
+    Versteckt Nutzdaten in einer Bilddatei.
+
+    Trägerbild, Nutzdaten und Ausgabe werden gestreamt; PNG-Träger werden nie
+    vollständig dekodiert. Bei unkomprimierten Trägern (siehe uses_memmap)
+    wird die Datei kopiert und die Kopie per np.memmap direkt verändert,
+    ohne Dekodieren und Neukodieren. Sonst wird ein PNG geschrieben.
+
+    Args:
+        image_path: Pfad zum Trägerbild
+        payload: Binäres Dateiobjekt mit den zu versteckenden Daten
+        output_path: Pfad für das neue Bild; None verändert einen
+                     unkomprimierten Träger direkt
+        payload_size (int): Anzahl der zu versteckenden Bytes
+                            (Standard: Restlänge von payload)
+        chunk_size (int): Blockgröße beim Lesen der Nutzdaten
+        compress_level (int): zlib-Kompressionsstufe der PNG-Ausgabe
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+        compression (str): None, 'auto', 'zlib', 'bz2' oder 'lzma'
+        key (str): Schlüssel für die verstreute Einbettung (None = am Stück).
+                   Nicht unkomprimierte Träger werden dafür vollständig geladen.
+        progress: Funktion progress(Zeilen, Höhe), wird nach jedem Band
+                  aufgerufen; eine Exception darin bricht das Einbetten ab
+
+    Returns:
+        int: Anzahl der im Bild gespeicherten Bytes (nach der Kompression)
+
+    Raises:
+        ValueError: Wenn die Daten nicht in das Bild passen, output_path bei
+                    einem nicht unkomprimierten Träger fehlt oder nicht auf
+                    .png endet
+    """
+    _check_output(image_path, output_path)
+    if payload_size is None:
+        position = payload.tell()
+        payload_size = payload.seek(0, 2) - position
+        payload.seek(position)
+
+    stored, stored_size, method, crc = _prepare_payload(payload, payload_size,
+                                                        compression, chunk_size)
+    try:
+        return _embed_stored(image_path, stored, output_path, stored_size,
+                             chunk_size, compress_level, depth, method, crc, key, progress)
+    finally:
+        if stored is not payload:
+            stored.close()
+
+
+def _embed_stored(image_path, payload, output_path, payload_size,
+                  chunk_size, compress_level, depth, compression, crc, key=None, progress=None):
+    """Bettet bereits (ggf. komprimiert) vorbereitete Nutzdaten ein, siehe embed_file."""
+    if uses_memmap(image_path, output_path):
+        with raw_carrier.RawCarrier(image_path) as rows:
+            _check_capacity(payload_size, rows.size, depth)
+        if output_path is not None:
+            shutil.copyfile(image_path, output_path)
+            image_path = output_path
+        with raw_carrier.RawCarrier(image_path, writable=True) as rows:
+            if key is not None:
+                _embed_keyed(rows.pixels, payload, payload_size, depth, compression, crc, key)
+            else:
+                embed_inplace(png_stream.track_progress(rows.iter_bands(), rows.height, progress),
+                              payload, payload_size, chunk_size, depth, compression, crc)
+        return payload_size
+
+    with open_carrier(image_path) as rows:
+        _check_capacity(payload_size, rows.size, depth)
+        with png_stream.PNGRowWriter(output_path, rows.width, rows.height, rows.mode,
+                                     rows.palette, rows.transparency,
+                                     compress_level) as writer:
+            if key is not None:
+                pixels = _load_pixels(rows, writable=True)
+                _embed_keyed(pixels, payload, payload_size, depth, compression, crc, key)
+                bands = (pixels[start:start + rows.rows_per_band]
+                         for start in range(0, rows.height, rows.rows_per_band))
+                for band in png_stream.track_progress(bands, rows.height, progress):
+                    writer.write(band)
+                return payload_size
+            bands = png_stream.track_progress(rows.iter_bands(), rows.height, progress)
+            for band in embed_rows(bands, payload, payload_size, chunk_size,
+                                   depth, compression, crc):
+                writer.write(band)
+    return payload_size
+
+
+def extract(pixels, key=None):
+    """
+    Liest versteckte Nutzdaten aus den LSBs eines Pixel-Arrays.
+
+    Args:
+        pixels (numpy.ndarray): Pixel-Array des präparierten Bildes (uint8)
+        key (str): Schlüssel, falls die Daten verstreut eingebettet wurden
+
+    Returns:
+        bytes: Die extrahierten (bei Bedarf entpackten) Nutzdaten
+
+    Raises:
+        ValueError: Wenn kein gültiger Header gefunden wird, die gespeicherte
+                    Größe nicht zum Bild passt oder die Prüfsumme falsch ist
+    """
+    flat = np.asarray(pixels).reshape(-1)
+    if flat.size < HEADER_BITS:
+        raise ValueError("Bild zu klein für versteckte Daten")
+
+    header_bits = flat[:HEADER_BITS] & 1
+    if _is_legacy(header_bits):
+        data_size = _read_legacy_size(header_bits, flat.size)
+        start = LEGACY_HEADER_BITS
+        return np.packbits(flat[start:start + data_size * 8] & 1).tobytes()
+    data_size, depth, method, crc, scattered = _read_header(header_bits, flat.size)
+    if scattered:
+        output = io.BytesIO()
+        _extract_keyed(pixels, output, key, CHUNK_SIZE)
+        return output.getvalue()
+    count = _value_count(data_size, depth)
+    data_values = flat[HEADER_BITS:HEADER_BITS + count] & ((1 << depth) - 1)
+    data = _join_bits(data_values, depth, data_size).tobytes()
+    if zlib.crc32(data) != crc:
+        raise ValueError("Prüfsumme der versteckten Daten stimmt nicht")
+    if not method:
+        return data
+    output = io.BytesIO()
+    writer = _DecompressingWriter(output, method, CHUNK_SIZE)
+    writer.write(data)
+    writer.close()
+    return output.getvalue()
+
+
+def extract_rows(rows, output, total_values=None, chunk_size=CHUNK_SIZE):
+    """
+    Liest versteckte Nutzdaten zeilenweise und schreibt sie blockweise in output.
+
+    Es werden nur so viele Zeilen angefordert, wie für Header und Nutzdaten
+    nötig sind. Der Speicherbedarf hängt von chunk_size ab, nicht vom Bild.
+    Komprimierte Nutzdaten werden blockweise entpackt.
+
+    Args:
+        rows: Iterierbare Folge von Pixel-Zeilen (uint8-Arrays beliebiger Form)
+        output: Binäres Dateiobjekt für die extrahierten Daten
+        total_values (int): Anzahl aller Kanal-Bytes des Bildes (zur Prüfung des Headers)
+        chunk_size (int): Anzahl Bytes, die pro Block geschrieben werden
+
+    Returns:
+        int: Anzahl der in output geschriebenen Bytes (nach dem Entpacken)
+
+    Raises:
+        ValueError: Wenn kein gültiger Header gefunden wird, Header oder
+                    Datenmenge nicht zum Bild passen oder die Prüfsumme falsch ist
+    """
+    reader = _LSBReader(rows)
+    header_bits = reader.read(HEADER_BITS)
+    if header_bits.size < HEADER_BITS:
+        raise ValueError("Bild zu klein für versteckte Daten")
+    if _is_legacy(header_bits):
+        return _extract_legacy(header_bits, reader, output, total_values, chunk_size)
+    data_size, depth, method, crc, scattered = _read_header(header_bits, total_values)
+    if scattered:
+        raise ValueError("Daten sind verstreut eingebettet: Schlüssel erforderlich")
+    sink = _DecompressingWriter(output, method, chunk_size) if method else output
+
+    # Blockgröße als Vielfaches der Bittiefe, damit die Bitgruppen aufgehen
+    chunk_size = max(depth, chunk_size // depth * depth)
+    remaining = data_size
+    checksum = 0
+    while remaining:
+        count = min(remaining, chunk_size)
+        needed = _value_count(count, depth)
+        values = reader.read(needed, depth)
+        if values.size < needed:
+            raise ValueError("Bild enthält weniger Daten als im Header angegeben")
+        data = _join_bits(values, depth, count).tobytes()
+        checksum = zlib.crc32(data, checksum)
+        sink.write(data)
+        remaining -= count
+
+    if checksum != crc:
+        raise ValueError("Prüfsumme der versteckten Daten stimmt nicht")
+
+    if method:
+        sink.close()
+        return sink.written
+    return data_size
+
+
+def extract_file(image_path, output, chunk_size=CHUNK_SIZE, key=None, progress=None):
+    """
+    Extrahiert versteckte Daten aus einer Bilddatei, ohne das ganze Bild zu laden.
+
+    Unkomprimierte Formate werden per Memory-Mapping gelesen, es werden nur
+    die Seiten mit Header und Nutzdaten angefasst. Verstreut eingebettete
+    Daten (key) erfordern das vollständige Bild.
+
+    Args:
+        image_path: Pfad zum präparierten Bild
+        output: Binäres Dateiobjekt für die extrahierten Daten
+        chunk_size (int): Anzahl Bytes, die pro Block geschrieben werden
+        key (str): Schlüssel, falls die Daten verstreut eingebettet wurden
+        progress: Funktion progress(Zeilen, Höhe), wird nach jedem gelesenen
+                  Band aufgerufen; eine Exception darin bricht das Lesen ab
+
+    Returns:
+        int: Anzahl der extrahierten Bytes (nach dem Entpacken)
+    """
+    if key is not None:
+        header = read_header(image_path)
+        if header is not None and header["scattered"]:
+            with open_carrier(image_path) as rows:
+                return _extract_keyed(_load_pixels(rows), output, key, chunk_size)
+    with open_carrier(image_path) as rows:
+        bands = png_stream.track_progress(rows.iter_bands(), rows.height, progress)
+        return extract_rows(bands, output, rows.size, chunk_size)
+
+
+def read_header(image_path):
+    """
+    Liest nur den Header versteckter Daten, ohne die Nutzdaten anzufassen.
+
+    Es werden lediglich die ersten HEADER_BITS Kanal-Bytes gelesen (bei PNG
+    wird nur das erste kleine Band entpackt). Damit lässt sich sehr günstig
+    und exakt feststellen, ob ein Bild Daten dieses Tools enthält.
+
+    Args:
+        image_path: Pfad zum Bild
+
+    Returns:
+        dict: version, size (gespeicherte Bytes), depth, compression (Name oder
+              None), scattered und crc - oder None, wenn kein gültiger Header
+              vorhanden ist
+    """
+    with open_carrier(image_path, band_bytes=PROBE_BAND_BYTES) as rows:
+        return _header_info(rows.iter_bands(), rows.size)
+
+
+def carrier_info(image_path):
+    """
+    Liefert Metadaten und Kapazität eines Trägers, ohne Pixel zu dekodieren.
+
+    Gelesen werden nur die Kopfdaten der Datei (Pillow bzw. BMP-/PNM-/NPY-
+    Header über raw_carrier). Damit lassen sich sehr viele Dateien pro
+    Sekunde prüfen, z. B. um passende Träger für eine Nutzlast auszuwählen.
+
+    Args:
+        image_path: Pfad zum Bild
+
+    Returns:
+        dict: width, height, channels und mode (wie beim Einbetten dekodiert),
+            format, file_size (Bytes) und capacities (Bittiefe -> Bytes)
+
+    Raises:
+        OSError: Wenn die Datei nicht gelesen oder erkannt werden kann
+    """
+    try:
+        with raw_carrier.RawCarrier(image_path) as carrier:
+            width, height, mode = carrier.width, carrier.height, carrier.mode
+            image_format = carrier.format
+    except (ValueError, struct.error):
+        with Image.open(image_path) as img:
+            width, height = img.size
+            mode, image_format = png_stream.carrier_mode(img), img.format
+    total_values = width * height * png_stream.MODES[mode][1]
+    return {
+        "width": width,
+        "height": height,
+        "channels": png_stream.MODES[mode][1],
+        "mode": mode,
+        "format": image_format,
+        "file_size": os.path.getsize(image_path),
+        "capacities": {depth: capacity_for_values(total_values, depth)
+                     for depth in range(1, MAX_DEPTH + 1)},
+    }
+
+
+def read_header_pixels(pixels):
+    """
+    Wie read_header, aber für ein bereits dekodiertes Pixel-Array.
+
+    Args:
+        pixels (np.ndarray): Pixel-Array des Trägerbildes
+
+    Returns:
+        dict oder None (siehe read_header)
+    """
+    return _header_info((pixels,), pixels.size)
+
+
+def _header_info(bands, total_values):
+    """Liest und prüft den Header aus den ersten Bändern eines Trägers."""
+    header_bits = _LSBReader(bands).read(HEADER_BITS)
+    if header_bits.size < HEADER_BITS:
+        return None
+    try:
+        data_size, depth, method, crc, scattered = _read_header(header_bits, total_values)
+    except ValueError:
+        return None
+    return {
+        "version": HEADER_VERSION,
+        "size": data_size,
+        "depth": depth,
+        "compression": COMPRESSION_NAMES.get(method),
+        "scattered": scattered,
+        "crc": crc,
+    }
+
+
+def _check_depth(depth):
+    if not 1 <= depth <= MAX_DEPTH:
+        raise ValueError(f"Bittiefe muss zwischen 1 und {MAX_DEPTH} liegen")
+
+
+def _check_capacity(payload_size, total_values, depth):
+    if payload_size > capacity_for_values(total_values, depth):
+        raise ValueError(
+            f"Daten zu groß! Maximal möglich: {capacity_for_values(total_values, depth)} Bytes"
+        )
+
+
+def _check_output(image_path, output_path):
+    """Prüft, ob output_path zur Ausgabe von embed_file passt (siehe uses_memmap)."""
+    if uses_memmap(image_path, output_path):
+        return
+    if output_path is None:
+        raise ValueError("Für dieses Format wird ein Zielpfad benötigt, "
+                         "nur unkomprimierte Träger können direkt verändert werden")
+    if os.path.splitext(output_path)[1].lower() != '.png':
+        raise ValueError(f"Zielbild wird als PNG gespeichert, Endung .png erforderlich: {output_path}")
+
+
+def _pack_header(data_size, depth, compression=0, crc=0, scattered=False):
+    """Erzeugt den Header: Magic, Version, Flags (Bittiefe, Kompression, Streuung), Größe, CRC32."""
+    _check_depth(depth)
+    flags = depth - 1 | compression << COMPRESSION_SHIFT
+    if scattered:
+        flags |= SCATTER_FLAG
+    return struct.pack(HEADER_FORMAT, MAGIC, HEADER_VERSION, flags, data_size, crc)
+
+
+def _read_header(header_bits, total_values=None):
+    """
+    Prüft Magic und Version und wandelt die Header-Bits in Datengröße,
+    Bittiefe, Kompressionsverfahren und Prüfsumme um.
+
+    Returns:
+        tuple: (gespeicherte Datengröße in Bytes, Bittiefe, Kompressionskennung,
+                CRC32, verstreut eingebettet)
+
+    Raises:
+        ValueError: Wenn kein Header dieses Tools vorliegt oder er nicht zum Bild passt
+    """
+    header = np.packbits(header_bits).tobytes()
+    magic, version, flags, data_size, crc = struct.unpack(HEADER_FORMAT, header)
+    if magic != MAGIC:
+        raise ValueError("Keine versteckten Daten gefunden")
+    if version != HEADER_VERSION:
+        raise ValueError(f"Nicht unterstützte Header-Version: {version}")
+    depth = (flags & DEPTH_MASK) + 1
+    compression = flags >> COMPRESSION_SHIFT & 0x03
+    if total_values is not None and data_size > capacity_for_values(total_values, depth):
+        raise ValueError("Ungültige Datengröße im Header")
+    return data_size, depth, compression, crc, bool(flags & SCATTER_FLAG)
+
+
+def _is_legacy(header_bits):
+    """Prüft, ob den Header-Bits die Magic fehlt (altes Format oder keine Daten)."""
+    return np.packbits(header_bits[:len(MAGIC) * 8]).tobytes() != MAGIC
+
+
+def _read_legacy_size(header_bits, total_values=None):
+    """
+    Liest die Datengröße des alten Formats aus den ersten 32 Header-Bits.
+
+    Raises:
+        ValueError: Wenn die Größe nicht ins Bild passt (dann enthält es
+                    auch keine Daten im alten Format)
+    """
+    data_size = int.from_bytes(np.packbits(header_bits[:LEGACY_HEADER_BITS]).tobytes(), 'big')
+    if total_values is not None and data_size > (total_values - LEGACY_HEADER_BITS) // 8:
+        raise ValueError("Keine versteckten Daten gefunden")
+    return data_size
+
+
+def _extract_legacy(header_bits, reader, output, total_values, chunk_size):
+    """
+    Liest Nutzdaten im alten Format (siehe Moduldoku) blockweise nach output.
+
+    Die ersten Nutzdaten-Bits stecken bereits in header_bits, der Rest wird
+    aus reader gelesen.
+
+    Returns:
+        int: Anzahl der in output geschriebenen Bytes
+    """
+    data_size = _read_legacy_size(header_bits, total_values)
+    bits = header_bits[LEGACY_HEADER_BITS:]
+    remaining = data_size
+    while remaining:
+        count = min(remaining, chunk_size)
+        needed = count * 8
+        if bits.size < needed:
+            bits = np.concatenate((bits, reader.read(needed - bits.size)))
+        if bits.size < needed:
+            raise ValueError("Bild enthält weniger Daten als im Header angegeben")
+        output.write(np.packbits(bits[:needed]).tobytes())
+        bits = bits[needed:]
+        remaining -= count
+    return data_size
+
+
+def _choose_compression(sample):
+    """
+    Wählt das Verfahren, das die Probe am stärksten verkleinert.
+
+    Returns:
+        int: Kennung aus COMPRESSION_METHODS oder 0, wenn sich Kompression
+             nicht lohnt (weniger als 10 % Ersparnis)
+    """
+    best, best_size = 0, len(sample) * 0.9
+    for method, create in _COMPRESSORS.items():
+        compressor = create()
+        size = len(compressor.compress(sample)) + len(compressor.flush())
+        if size < best_size:
+            best, best_size = method, size
+    return best
+
+
+def _payload_crc(payload, payload_size, chunk_size):
+    """Berechnet die CRC32 der nächsten payload_size Bytes und spult payload zurück."""
+    if not payload.seekable():
+        raise ValueError("Für die Prüfsumme wird ein zurückspulbares Dateiobjekt benötigt")
+    start = payload.tell()
+    crc = 0
+    remaining = payload_size
+    while remaining:
+        data = payload.read(min(remaining, chunk_size))
+        if not data:
+            raise ValueError("Nutzdaten kürzer als angegeben")
+        crc = zlib.crc32(data, crc)
+        remaining -= len(data)
+    payload.seek(start)
+    return crc
+
+
+def _prepare_payload(payload, payload_size, compression, chunk_size):
+    """
+    Bereitet die Nutzdaten zum Einbetten vor: optional komprimieren und CRC32 bilden.
+
+    Komprimierte Daten (und Daten aus nicht zurückspulbaren Quellen) werden
+    blockweise in eine temporäre Datei geschrieben, die Prüfsumme entsteht
+    dabei nebenbei. Sonst wird payload einmal vorab für die CRC32 gelesen.
+
+    Args:
+        payload: Binäres Dateiobjekt mit den Nutzdaten
+        payload_size (int): Anzahl der zu lesenden Bytes
+        compression (str): None, 'auto', 'zlib', 'bz2' oder 'lzma'
+        chunk_size (int): Blockgröße beim Lesen
+
+    Returns:
+        tuple: (Dateiobjekt an der Startposition, gespeicherte Größe, Kennung, CRC32).
+               Ohne Kompression (oder wenn sie die Daten nicht verkleinert)
+               wird nach Möglichkeit payload selbst mit Kennung 0 zurückgegeben.
+               Die gespeicherte Größe ist dann nie größer als payload_size.
+
+    Raises:
+        ValueError: Bei unbekanntem Verfahren oder zu kurzen Nutzdaten
+    """
+    start = payload.tell() if payload.seekable() else None
+    prefix = b''
+    if not compression:
+        method = 0
+    elif compression == 'auto':
+        prefix = payload.read(min(payload_size, SAMPLE_SIZE))
+        method = _choose_compression(prefix)
+    elif compression in COMPRESSION_METHODS:
+        method = COMPRESSION_METHODS[compression]
+    else:
+        raise ValueError(f"Unbekanntes Kompressionsverfahren: {compression}")
+
+    if not method and start is not None:
+        payload.seek(start)
+        return payload, payload_size, 0, _payload_crc(payload, payload_size, chunk_size)
+
+    compressor = _COMPRESSORS[method]() if method else None
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    crc = 0
+    try:
+        data = prefix
+        remaining = payload_size - len(prefix)
+        while True:
+            if compressor is not None:
+                data = compressor.compress(data)
+            spool.write(data)
+            crc = zlib.crc32(data, crc)
+            if not remaining:
+                break
+            data = payload.read(min(remaining, chunk_size))
+            if not data:
+                raise ValueError("Nutzdaten kürzer als angegeben")
+            remaining -= len(data)
+        if compressor is not None:
+            data = compressor.flush()
+            spool.write(data)
+            crc = zlib.crc32(data, crc)
+    except Exception:
+        spool.close()
+        raise
+
+    stored_size = spool.tell()
+    if stored_size >= payload_size and start is not None:
+        # Nicht komprimierbar (oder Probe bei 'auto' nicht repräsentativ):
+        # unkomprimiert einbetten, die Kapazität wird sonst überschritten
+        spool.close()
+        payload.seek(start)
+        return payload, payload_size, 0, _payload_crc(payload, payload_size, chunk_size)
+    spool.seek(0)
+    return spool, stored_size, method, crc
+
+
+def _load_pixels(rows, writable=False):
+    """
+    Liefert das vollständige Pixel-Array eines geöffneten Trägers.
+
+    Bei Memory-Mapping eine View (schreibgeschützt, außer mit writable=True:
+    dann eine Kopie, damit die Quelldatei unverändert bleibt).
+    """
+    if isinstance(rows, raw_carrier.RawCarrier):
+        return np.array(rows.pixels) if writable else rows.pixels
+    pixels = np.empty(rows.shape, dtype=np.uint8)
+    start = 0
+    for band in rows.iter_bands():
+        pixels[start:start + len(band)] = band
+        start += len(band)
+    return pixels
+
+
+def _embed_keyed(pixels, payload, payload_size, depth, compression, crc, key):
+    """
+    Bettet Nutzdaten an schlüsselabhängigen Positionen in pixels ein (in-place).
+
+    Der Header steht wie gewohnt in den ersten HEADER_BITS Kanal-Bytes. Die
+    Positionen der Nutzdaten werden blockweise aus der Permutation berechnet,
+    der Speicherbedarf hängt daher nur von SCATTER_CHUNK ab.
+    """
+    _check_capacity(payload_size, pixels.size, depth)
+    header = _pack_header(payload_size, depth, compression, crc, scattered=True)
+    header_bits = np.unpackbits(np.frombuffer(header, dtype=np.uint8))
+    _write_at(pixels, np.arange(HEADER_BITS), header_bits, 1)
+
+    permutation = _KeyedPermutation(key, pixels.size - HEADER_BITS)
+    chunk_bytes = SCATTER_CHUNK * depth // 8  # Vielfaches der Bittiefe
+    position = 0
+    remaining = payload_size
+    while remaining:
+        count = min(remaining, chunk_bytes)
+        data = payload.read(count)
+        if len(data) != count:
+            raise ValueError("Nutzdaten kürzer als angegeben")
+        values = _split_bits(np.frombuffer(data, dtype=np.uint8), depth)
+        indices = np.arange(position, position + values.size, dtype=np.uint64)
+        _write_at(pixels, permutation(indices) + HEADER_BITS, values, depth)
+        position += values.size
+        remaining -= count
+
+
+def _extract_keyed(pixels, output, key, chunk_size):
+    """
+    Liest verstreut eingebettete Nutzdaten aus pixels und schreibt sie nach output.
+
+    Returns:
+        int: Anzahl der in output geschriebenen Bytes (nach dem Entpacken)
+    """
+    if key is None:
+        raise ValueError("Daten sind verstreut eingebettet: Schlüssel erforderlich")
+    header_bits = _read_at(pixels, np.arange(HEADER_BITS), 1)
+    data_size, depth, method, crc, scattered = _read_header(header_bits, pixels.size)
+    permutation = _KeyedPermutation(key, pixels.size - HEADER_BITS)
+    sink = _DecompressingWriter(output, method, chunk_size) if method else output
+
+    chunk_bytes = SCATTER_CHUNK * depth // 8
+    position = 0
+    remaining = data_size
+    checksum = 0
+    while remaining:
+        count = min(remaining, chunk_bytes)
+        indices = np.arange(position, position + _value_count(count, depth), dtype=np.uint64)
+        values = _read_at(pixels, permutation(indices) + HEADER_BITS, depth)
+        data = _join_bits(values, depth, count).tobytes()
+        checksum = zlib.crc32(data, checksum)
+        sink.write(data)
+        position += indices.size
+        remaining -= count
+
+    if checksum != crc:
+        raise ValueError("Prüfsumme stimmt nicht - falscher Schlüssel oder beschädigte Daten")
+    if method:
+        sink.close()
+        return sink.written
+    return data_size
+
+
+def _write_at(pixels, positions, values, depth):
+    """Ersetzt die unteren depth Bits an den flachen Positionen positions durch values."""
+    if isinstance(pixels, np.memmap):
+        # Sortiert schreiben: zusammenhängende Seitenzugriffe in der Datei
+        order = np.argsort(positions)
+        positions, values = positions[order], values[order]
+    keep = np.uint8(0xFF ^ ((1 << depth) - 1))
+    if pixels.flags.c_contiguous:
+        flat = pixels.reshape(-1)
+        flat[positions] = (flat[positions] & keep) | values
+    else:
+        # Views (z. B. BMP) über mehrdimensionale Indizes ansprechen, ohne Kopie
+        index = np.unravel_index(positions, pixels.shape)
+        pixels[index] = (pixels[index] & keep) | values
+
+
+def _read_at(pixels, positions, depth):
+    """Liefert die unteren depth Bits an den flachen Positionen positions."""
+    if pixels.flags.c_contiguous:
+        values = pixels.reshape(-1)[positions]
+    else:
+        values = pixels[np.unravel_index(positions, pixels.shape)]
+    values &= (1 << depth) - 1
+    return values
+
+
+def _value_count(data_size, depth):
+    """Anzahl der Kanal-Bytes, die data_size Bytes bei depth Bits pro Kanal belegen."""
+    return -(-data_size * 8 // depth)
+
+
+def _split_bits(data, depth):
+    """
+    Zerlegt Bytes in Gruppen zu depth Bits (MSB zuerst).
+
+    Bei Bittiefe 3 werden je drei Bytes zu einer 24-Bit-Zahl zusammengefasst,
+    aus der mit acht Shift/Mask-Operationen acht Gruppen entstehen.
+
+    Args:
+        data (numpy.ndarray): uint8-Array mit den Nutzdaten
+        depth (int): Bits pro Gruppe (1-4)
+
+    Returns:
+        numpy.ndarray: uint8-Array mit _value_count(data.size, depth) Gruppen
+    """
+    if depth == 1:
+        return np.unpackbits(data)
+    mask = (1 << depth) - 1
+    if 8 % depth == 0:
+        # Bittiefe 2 und 4: Gruppen liegen innerhalb eines Bytes
+        per_byte = 8 // depth
+        values = np.empty((data.size, per_byte), dtype=np.uint8)
+        for j in range(per_byte):
+            np.right_shift(data, depth * (per_byte - 1 - j), out=values[:, j])
+            values[:, j] &= mask
+        return values.reshape(-1)
+
+    count = _value_count(data.size, depth)
+    padding = -data.size % depth
+    if padding:
+        data = np.concatenate((data, np.zeros(padding, dtype=np.uint8)))
+    columns = data.reshape(-1, depth)
+    words = columns[:, 0].astype(np.uint32)
+    for i in range(1, depth):
+        words <<= 8
+        words |= columns[:, i]
+
+    values = np.empty((words.size, 8), dtype=np.uint8)
+    for j in range(8):
+        values[:, j] = (words >> (depth * (7 - j))) & mask
+    return values.reshape(-1)[:count]
+
+
+def _join_bits(values, depth, data_size):
+    """
+    Setzt Gruppen zu depth Bits wieder zu Bytes zusammen (Umkehrung von _split_bits).
+
+    Args:
+        values (numpy.ndarray): uint8-Array mit den Bitgruppen
+        depth (int): Bits pro Gruppe (1-4)
+        data_size (int): Anzahl der gewünschten Bytes
+
+    Returns:
+        numpy.ndarray: uint8-Array mit data_size Bytes
+    """
+    if depth == 1:
+        return np.packbits(values)[:data_size]
+    if 8 % depth == 0:
+        # Bittiefe 2 und 4: Gruppen liegen innerhalb eines Bytes
+        per_byte = 8 // depth
+        groups = values[:data_size * per_byte].reshape(-1, per_byte)
+        data = groups[:, 0].copy()
+        for j in range(1, per_byte):
+            data <<= depth
+            data |= groups[:, j]
+        return data
+
+    padding = -values.size % 8
+    if padding:
+        values = np.concatenate((values, np.zeros(padding, dtype=np.uint8)))
+    groups = values.reshape(-1, 8)
+    words = groups[:, 0].astype(np.uint32)
+    for j in range(1, 8):
+        words <<= depth
+        words |= groups[:, j]
+
+    data = np.empty((words.size, depth), dtype=np.uint8)
+    for i in range(depth):
+        data[:, i] = words >> (8 * (depth - 1 - i))
+    return data.reshape(-1)[:data_size]
+
+
+class _KeyedPermutation:
+    """
+    Schlüsselabhängige Permutation von [0, size), ohne Tabelle in Bildgröße.
+
+    Ein balanciertes Feistel-Netz permutiert den nächstgrößeren Bereich mit
+    gerader Bitzahl (höchstens 4 * size). Ergebnisse außerhalb von [0, size)
+    werden erneut verschlüsselt (Cycle-Walking), bis sie im Bereich liegen.
+    Alle Schritte arbeiten vektorisiert; bis 2**32 Positionen mit uint32.
+    """
+
+    def __init__(self, key, size):
+        if isinstance(key, str):
+            key = key.encode()
+        self.size = size
+        bits = max(2, (size - 1).bit_length())
+        bits += bits % 2
+        self._dtype = np.uint32 if bits <= 32 else np.uint64
+        word = np.dtype(self._dtype).itemsize * 8
+        self._half = self._dtype(bits // 2)
+        self._mask = self._dtype((1 << (bits // 2)) - 1)
+        self._shift = self._dtype(word // 2 - 1)
+        # Multiplikator aus dem goldenen Schnitt (ungerade, gut durchmischend)
+        self._multiplier = self._dtype(0x9E3779B97F4A7C15 >> (64 - word))
+        digest = hashlib.blake2b(key, digest_size=8 * FEISTEL_ROUNDS,
+                                 person=b'B24S-scatter').digest()
+        round_keys = np.frombuffer(digest, dtype='<u8')
+        self._round_keys = (round_keys >> np.uint64(64 - word)).astype(self._dtype)
+
+    def _encrypt(self, x):
+        left = x >> self._half
+        right = x & self._mask
+        # Puffer rotieren statt pro Runde neue Arrays anzulegen
+        mixed = np.empty_like(x)
+        shifted = np.empty_like(x)
+        for round_key in self._round_keys:
+            np.bitwise_xor(right, round_key, out=mixed)
+            mixed *= self._multiplier
+            np.right_shift(mixed, self._shift, out=shifted)
+            mixed ^= shifted
+            mixed &= self._mask
+            mixed ^= left
+            left, right, mixed = right, mixed, left
+        left <<= self._half
+        left |= right
+        return left
+
+    def __call__(self, indices):
+        """Bildet ein Array von Indizes aus [0, size) auf ihre Positionen ab (intp)."""
+        result = self._encrypt(indices.astype(self._dtype, copy=False))
+        outside = np.flatnonzero(result >= self.size)
+        while outside.size:
+            result[outside] = self._encrypt(result[outside])
+            outside = outside[result[outside] >= self.size]
+        return result.astype(np.intp)
+
+
+class _ValueSource:
+    """
+    Liefert Header-Bits und Nutzdaten-Bitgruppen aus einem Dateiobjekt und
+    schreibt sie fortlaufend in Pixel-Bänder.
+    """
+
+    def __init__(self, payload, payload_size, depth, chunk_size, compression=0, crc=0):
+        self._payload = payload
+        self._remaining = payload_size
+        self._depth = depth
+        # Blockgröße als Vielfaches der Bittiefe, damit die Bitgruppen aufgehen
+        self._chunk_size = max(depth, chunk_size // depth * depth)
+        self._position = 0  # Bereits geschriebene Kanal-Bytes
+        header = np.frombuffer(_pack_header(payload_size, depth, compression, crc),
+                               dtype=np.uint8)
+        self._buffer = np.unpackbits(header)
+
+    @property
+    def exhausted(self):
+        return not self._buffer.size and not self._remaining
+
+    def read(self, count):
+        """Liefert bis zu count Werte; weniger nur am Ende der Nutzdaten."""
+        if self._buffer.size < count and self._remaining:
+            missing = count - self._buffer.size
+            wanted = -(-missing * self._depth // 8)           # Aufrunden auf ganze Bytes
+            wanted = -(-wanted // self._depth) * self._depth  # Vielfaches der Bittiefe
+            wanted = min(self._remaining, max(wanted, self._chunk_size))
+            data = self._payload.read(wanted)
+            if len(data) != wanted:
+                raise ValueError("Nutzdaten kürzer als angegeben")
+            self._remaining -= wanted
+            self._buffer = np.concatenate(
+                (self._buffer, _split_bits(np.frombuffer(data, dtype=np.uint8), self._depth))
+            )
+        values = self._buffer[:count]
+        self._buffer = self._buffer[count:]
+        return values
+
+    def write_next(self, flat):
+        """Schreibt die nächsten Werte in das flache Array flat (Header mit 1 Bit pro Kanal)."""
+        values = self.read(flat.size)
+        head = min(max(HEADER_BITS - self._position, 0), values.size)
+        _write_lsb(flat[:head], values[:head], 1)
+        _write_lsb(flat[head:values.size], values[head:], self._depth)
+        self._position += values.size
+
+
+class _DecompressingWriter:
+    """
+    Entpackt geschriebene Blöcke schrittweise und gibt sie an output weiter.
+
+    Pro Aufruf von decompress entstehen höchstens chunk_size Bytes, damit
+    auch stark komprimierte Daten den Speicher nicht sprengen.
+    """
+
+    def __init__(self, output, method, chunk_size):
+        self._output = output
+        self._decompressor = _DECOMPRESSORS[method]()
+        self._chunk_size = chunk_size
+        self.written = 0
+
+    def write(self, data):
+        try:
+            self._decompress(data)
+        except (zlib.error, lzma.LZMAError, OSError, EOFError) as e:
+            raise ValueError(f"Komprimierte Daten sind beschädigt: {e}") from e
+
+    def _decompress(self, data):
+        decompressor = self._decompressor
+        if hasattr(decompressor, 'unconsumed_tail'):
+            # zlib: nicht verarbeitete Eingabe bleibt in unconsumed_tail
+            while data:
+                self._emit(decompressor.decompress(data, self._chunk_size))
+                data = decompressor.unconsumed_tail
+        else:
+            # bz2/lzma: gepufferte Ausgabe mit leerer Eingabe abholen
+            self._emit(decompressor.decompress(data, self._chunk_size))
+            while not decompressor.needs_input and not decompressor.eof:
+                self._emit(decompressor.decompress(b'', self._chunk_size))
+
+    def close(self):
+        """Gibt Restdaten aus und prüft, ob der komprimierte Strom vollständig war."""
+        if hasattr(self._decompressor, 'flush'):
+            self._emit(self._decompressor.flush())
+        if not self._decompressor.eof:
+            raise ValueError("Komprimierte Daten sind unvollständig")
+
+    def _emit(self, data):
+        if data:
+            self._output.write(data)
+            self.written += len(data)
+
+
+class _LSBReader:
+    """Liefert die unteren Bits einer Folge von Pixel-Zeilen in beliebigen Portionen."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = np.empty(0, dtype=np.uint8)
+
+    def read(self, count, depth=1):
+        """Liest bis zu count Werte aus den unteren depth Bits; weniger nur am Bildende."""
+        mask = (1 << depth) - 1
+        parts = []
+        have = 0
+        while have < count:
+            if not self._buffer.size:
+                row = next(self._rows, None)
+                if row is None:
+                    break
+                self._buffer = np.asarray(row).reshape(-1)
+            part = self._buffer[:count - have]
+            self._buffer = self._buffer[part.size:]
+            parts.append(part & mask)
+            have += part.size
+        if not parts:
+            return np.empty(0, dtype=np.uint8)
+        return np.concatenate(parts)
+
+
+def _write_lsb(target, values, depth):
+    """Ersetzt die unteren depth Bits von target in-place durch values (gleiche Länge)."""
+    target &= 0xFF ^ ((1 << depth) - 1)
+    target |= values
@@ -0,0 +1,513 @@
+#############################
+# Paralleles Einbetten und Extrahieren über Shared Memory
+# Gruppe: B2-4
+##############################
+
+"""
+Verteilt Einbetten und Extrahieren sehr großer Trägerbilder auf mehrere Kerne.
+
+Pixel und Nutzdaten liegen in multiprocessing.shared_memory. Jeder Worker-
+Prozess bindet die Blöcke nur ein (kein Kopieren, kein Pickling der Daten)
+und bearbeitet einen zusammenhängenden Abschnitt des Bitstroms:
+
+    Kanal-Bytes: | Header | Abschnitt 1 | Abschnitt 2 | ... | unverändert |
+    Nutzdaten:            | Bytes 1     | Bytes 2     | ...
+
+Die Abschnittsgrenzen liegen immer auf einem Vielfachen von 8 Kanal-Bytes
+bzw. depth Nutzdaten-Bytes, damit jede Bitgruppe vollständig in genau einem
+Abschnitt liegt. Den kurzen Header schreibt bzw. liest der Hauptprozess selbst.
+
+Die Ergebnisse landen direkt im gemeinsamen Speicher: beim Einbetten im
+Pixel-Block, beim Extrahieren in einem Block für die Nutzdaten.
+
+Unterhalb von PARALLEL_MIN_VALUES Kanal-Bytes lohnt sich der Start der
+Worker nicht, dann wird stego_codec direkt im Hauptprozess verwendet. Den
+Schwellwert für die eigene Maschine liefert der Benchmark:
+
+    python -m logic.stego_parallel --workers 8
+"""
+
+import argparse
+import io
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from logic import png_stream, stego_codec
+
+# Ab dieser Anzahl Kanal-Bytes (ca. 10 Megapixel RGB) wird parallel gearbeitet
+PARALLEL_MIN_VALUES = 32 * 1024 * 1024
+
+
+class SharedPixels:
+    """
+    Pixel-Array in einem Shared-Memory-Block.
+
+    Args:
+        shape (tuple): Form des Arrays (Höhe, Breite[, Kanäle])
+        mode (str): PIL-Modus des Bildes (für das Speichern als PNG)
+        palette (bytes): Palette bei Modus 'P'
+        transparency (bytes): Inhalt des tRNS-Chunks (optional)
+    """
+
+    def __init__(self, shape, mode=None, palette=None, transparency=None):
+        self.shape = tuple(shape)
+        self.mode = mode
+        self.palette = palette
+        self.transparency = transparency
+        size = int(np.prod(self.shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        self.array = np.ndarray(self.shape, dtype=np.uint8, buffer=self._shm.buf)
+
+    @classmethod
+    def from_carrier(cls, rows, max_rows=None, progress=None):
+        """
+        Kopiert ein Trägerbild bandweise in einen neuen Shared-Memory-Block.
+
+        Args:
+            rows: Geöffneter Träger (siehe stego_codec.open_carrier)
+            max_rows (int): Nur die ersten max_rows Zeilen laden (Standard: alle)
+            progress: Funktion progress(Zeilen, max_rows), nach jedem Band aufgerufen
+
+        Returns:
+            SharedPixels
+        """
+        height = rows.height if max_rows is None else min(max_rows, rows.height)
+        shared = cls((height,) + tuple(rows.shape[1:]), rows.mode, rows.palette,
+                     rows.transparency)
+        try:
+            start = 0
+            for band in rows.iter_bands():
+                count = min(len(band), height - start)
+                shared.array[start:start + count] = band[:count]
+                start += count
+                if progress is not None:
+                    progress(start, height)
+                if start == height:
+                    break
+        except Exception:
+            shared.close()
+            raise
+        return shared
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def size(self):
+        return self.array.size
+
+    def close(self):
+        """Gibt den Shared-Memory-Block frei."""
+        if self._shm is None:
+            return
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def embed(shared, payload, depth=1, compression=None, workers=None, executor=None):
+    """
+    Versteckt Nutzdaten parallel in einem SharedPixels-Array (in-place).
+
+    Das Ergebnis ist bitgleich zu stego_codec.embed.
+
+    Args:
+        shared (SharedPixels): Trägerbild im gemeinsamen Speicher
+        payload (bytes): Zu versteckende Daten
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+        compression (str): None, 'auto', 'zlib', 'bz2' oder 'lzma'
+        workers (int): Anzahl Worker-Prozesse (Standard: Anzahl Kerne)
+        executor: Pool aus create_executor (optional, spart den Start)
+
+    Returns:
+        int: Anzahl der im Bild gespeicherten Bytes
+
+    Raises:
+        ValueError: Wenn die Daten nicht in das Bild passen
+    """
+    payload = memoryview(payload).cast('B')
+    return _embed_prepared(shared, io.BytesIO(payload), len(payload), depth, compression,
+                           workers, executor)
+
+
+def extract(shared, workers=None, executor=None):
+    """
+    Liest versteckte Nutzdaten parallel aus einem SharedPixels-Array.
+
+    Args:
+        shared (SharedPixels): Präpariertes Bild im gemeinsamen Speicher
+        workers (int): Anzahl Worker-Prozesse (Standard: Anzahl Kerne)
+        executor: Pool aus create_executor (optional)
+
+    Returns:
+        bytes: Die extrahierten (bei Bedarf entpackten) Nutzdaten
+
+    Raises:
+        ValueError: Wenn kein gültiger Header gefunden wird oder die Prüfsumme falsch ist
+    """
+    output = io.BytesIO()
+    _extract_shared(shared, output, workers, executor)
+    return output.getvalue()
+
+
+def embed_file(image_path, payload, output_path, payload_size=None, depth=1,
+               compression=None, workers=None, compress_level=6, key=None, progress=None):
+    """
+    Wie stego_codec.embed_file, aber mit parallelem Einbetten für große Träger.
+
+    Kleine Träger (unter PARALLEL_MIN_VALUES Kanal-Bytes), ein einzelner
+    Worker, unkomprimierte Träger im Memory-Mapping-Modus und die verstreute
+    Einbettung (key) werden direkt an stego_codec.embed_file weitergereicht.
+
+    Args:
+        image_path: Pfad zum Trägerbild
+        payload: Binäres Dateiobjekt mit den zu versteckenden Daten
+        output_path: Pfad für das neue Bild (PNG)
+        payload_size (int): Anzahl der zu versteckenden Bytes (Standard: Restlänge)
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+        compression (str): None, 'auto', 'zlib', 'bz2' oder 'lzma'
+        workers (int): Anzahl Worker-Prozesse (Standard: Anzahl Kerne)
+        compress_level (int): zlib-Kompressionsstufe der PNG-Ausgabe
+        key (str): Schlüssel für die verstreute Einbettung (None = am Stück)
+        progress: Funktion progress(Zeilen, Höhe), siehe stego_codec.embed_file;
+                  parallel wird das Schreiben der Zeilen gemeldet
+
+    Returns:
+        int: Anzahl der im Bild gespeicherten Bytes
+
+    Raises:
+        ValueError: Wenn die Daten nicht in das Bild passen
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or key is not None or stego_codec.uses_memmap(image_path, output_path) \
+            or _carrier_size(image_path) < PARALLEL_MIN_VALUES:
+        return stego_codec.embed_file(image_path, payload, output_path, payload_size,
+                                      compress_level=compress_level, depth=depth,
+                                      compression=compression, key=key, progress=progress)
+
+    stego_codec._check_output(image_path, output_path)
+    if payload_size is None:
+        position = payload.tell()
+        payload_size = payload.seek(0, 2) - position
+        payload.seek(position)
+
+    with stego_codec.open_carrier(image_path) as rows:
+        with SharedPixels.from_carrier(rows) as shared:
+            stored_size = _embed_prepared(shared, payload, payload_size, depth, compression,
+                                          workers)
+            with png_stream.PNGRowWriter(output_path, rows.width, rows.height, shared.mode,
+                                         shared.palette, shared.transparency,
+                                         compress_level) as writer:
+                for start in range(0, rows.height, rows.rows_per_band):
+                    writer.write(shared.array[start:start + rows.rows_per_band])
+                    if progress is not None:
+                        progress(min(start + rows.rows_per_band, rows.height), rows.height)
+    return stored_size
+
+
+def extract_file(image_path, output, workers=None, key=None, progress=None):
+    """
+    Wie stego_codec.extract_file, aber mit parallelem Extrahieren großer Nutzdaten.
+
+    Es werden nur die Zeilen in den gemeinsamen Speicher geladen, die Header
+    und Nutzdaten enthalten.
+
+    Args:
+        image_path: Pfad zum präparierten Bild
+        output: Binäres Dateiobjekt für die extrahierten Daten
+        workers (int): Anzahl Worker-Prozesse (Standard: Anzahl Kerne)
+        key (str): Schlüssel, falls die Daten verstreut eingebettet wurden
+        progress: Funktion progress(Zeilen, Zeilen gesamt), siehe stego_codec.extract_file;
+                  parallel wird das Laden der benötigten Zeilen gemeldet
+
+    Returns:
+        int: Anzahl der extrahierten Bytes (nach dem Entpacken)
+
+    Raises:
+        ValueError: Wenn kein gültiger Header gefunden wird oder die Prüfsumme falsch ist
+    """
+    workers = workers or os.cpu_count() or 1
+    header = stego_codec.read_header(image_path)
+    if header is None:
+        # Ohne Header dieses Formats: altes Format oder keine Daten
+        return stego_codec.extract_file(image_path, output, key=key, progress=progress)
+    values = stego_codec.HEADER_BITS + stego_codec._value_count(header["size"], header["depth"])
+    if workers <= 1 or header["scattered"] or values < PARALLEL_MIN_VALUES:
+        return stego_codec.extract_file(image_path, output, key=key, progress=progress)
+
+    with stego_codec.open_carrier(image_path) as rows:
+        row_values = rows.size // rows.height
+        with SharedPixels.from_carrier(rows, -(-values // row_values), progress) as shared:
+            return _extract_shared(shared, output, workers, total_values=rows.size)
+
+
+def create_executor(workers=None):
+    """
+    Startet einen wiederverwendbaren Prozess-Pool für embed/extract.
+
+    Der resource_tracker wird vorher gestartet, damit die Worker ihn erben.
+    Sonst startet jeder Worker einen eigenen, der die Blöcke des
+    Hauptprozesses beim Beenden als "verwaist" meldet.
+
+    Args:
+        workers (int): Anzahl Worker-Prozesse (Standard: Anzahl Kerne)
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    resource_tracker.ensure_running()
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+
+
+def _carrier_size(image_path):
+    """Anzahl der Kanal-Bytes eines Trägers, ohne die Pixel zu dekodieren."""
+    with stego_codec.open_carrier(image_path, band_bytes=stego_codec.PROBE_BAND_BYTES) as rows:
+        return rows.size
+
+
+def _slices(data_size, depth, workers):
+    """
+    Teilt data_size Nutzdaten-Bytes in bis zu workers Abschnitte.
+
+    Jeder Abschnitt beginnt auf einem Vielfachen von depth Bytes (= 8 Kanal-Bytes).
+
+    Returns:
+        list: (erstes Byte, Byte hinter dem Abschnitt) je Abschnitt
+    """
+    groups = -(-data_size // depth)
+    per_worker = -(-groups // workers) if groups else 0
+    bounds = []
+    for start in range(0, groups, max(1, per_worker)):
+        stop = min(data_size, (start + per_worker) * depth)
+        bounds.append((start * depth, stop))
+    return bounds
+
+
+def _run(tasks, function, workers, executor):
+    """Führt function für alle Aufgaben im (ggf. neuen) Prozess-Pool aus."""
+    if executor is not None:
+        list(executor.map(function, tasks))
+        return
+    with create_executor(workers) as pool:
+        list(pool.map(function, tasks))
+
+
+def _embed_prepared(shared, payload, payload_size, depth, compression, workers, executor=None):
+    """Komprimiert/prüft die Nutzdaten, legt sie in Shared Memory ab und bettet sie ein."""
+    workers = workers or os.cpu_count() or 1
+    stored, stored_size, method, crc = stego_codec._prepare_payload(
+        payload, payload_size, compression, stego_codec.CHUNK_SIZE
+    )
+    try:
+        stego_codec._check_capacity(stored_size, shared.size, depth)
+        data_shm = shared_memory.SharedMemory(create=True, size=max(1, stored_size))
+        try:
+            view = data_shm.buf[:stored_size]
+            position = 0
+            while position < stored_size:
+                count = stored.readinto(view[position:])
+                if not count:
+                    raise ValueError("Nutzdaten kürzer als angegeben")
+                position += count
+            view.release()
+
+            # Header im Hauptprozess, Nutzdaten in den Workern
+            flat = shared.array.reshape(-1)
+            header = stego_codec._pack_header(stored_size, depth, method, crc)
+            header_bits = np.unpackbits(np.frombuffer(header, dtype=np.uint8))
+            stego_codec._write_lsb(flat[:stego_codec.HEADER_BITS], header_bits, 1)
+
+            tasks = [(shared.name, shared.size, data_shm.name, start, stop, depth)
+                     for start, stop in _slices(stored_size, depth, workers)]
+            _run(tasks, _embed_slice, workers, executor)
+        finally:
+            data_shm.close()
+            data_shm.unlink()
+    finally:
+        if stored is not payload:
+            stored.close()
+    return stored_size
+
+
+def _extract_shared(shared, output, workers, executor=None, total_values=None):
+    """Liest Header und Nutzdaten aus shared, schreibt sie (entpackt) nach output."""
+    workers = workers or os.cpu_count() or 1
+    flat = shared.array.reshape(-1)
+    if flat.size < stego_codec.HEADER_BITS:
+        raise ValueError("Bild zu klein für versteckte Daten")
+    data_size, depth, method, crc, scattered = stego_codec._read_header(
+        flat[:stego_codec.HEADER_BITS] & 1, total_values or flat.size
+    )
+    if scattered:
+        raise ValueError("Verstreut eingebettete Daten werden nicht parallel gelesen")
+    if stego_codec.HEADER_BITS + stego_codec._value_count(data_size, depth) > flat.size:
+        raise ValueError("Bild enthält weniger Daten als im Header angegeben")
+
+    data_shm = shared_memory.SharedMemory(create=True, size=max(1, data_size))
+    try:
+        tasks = [(shared.name, shared.size, data_shm.name, start, stop, depth)
+                 for start, stop in _slices(data_size, depth, workers)]
+        _run(tasks, _extract_slice, workers, executor)
+
+        data = data_shm.buf[:data_size]
+        try:
+            if zlib.crc32(data) != crc:
+                raise ValueError("Prüfsumme der versteckten Daten stimmt nicht")
+            if not method:
+                output.write(data)
+                return data_size
+            writer = stego_codec._DecompressingWriter(output, method, stego_codec.CHUNK_SIZE)
+            for start in range(0, data_size, stego_codec.CHUNK_SIZE):
+                writer.write(data[start:start + stego_codec.CHUNK_SIZE])
+            writer.close()
+            return writer.written
+        finally:
+            data.release()
+    finally:
+        data_shm.close()
+        data_shm.unlink()
+
+
+def _attach(name):
+    """
+    Bindet einen vorhandenen Shared-Memory-Block im Worker ein.
+
+    Worker teilen sich den resource_tracker des Hauptprozesses; freigegeben
+    (unlink) wird der Block nur vom Hauptprozess.
+    """
+    return shared_memory.SharedMemory(name=name)
+
+
+def _embed_slice(task):
+    """Worker: bettet die Nutzdaten-Bytes [start, stop) in ihren Pixel-Abschnitt ein."""
+    pixels_name, total_values, data_name, start, stop, depth = task
+    pixels_shm, data_shm = _attach(pixels_name), _attach(data_name)
+    try:
+        flat = np.ndarray((total_values,), dtype=np.uint8, buffer=pixels_shm.buf)
+        data = np.ndarray((stop - start,), dtype=np.uint8, buffer=data_shm.buf, offset=start)
+        values = stego_codec._split_bits(data, depth)
+        offset = stego_codec.HEADER_BITS + start * 8 // depth
+        stego_codec._write_lsb(flat[offset:offset + values.size], values, depth)
+        del flat, data, values
+    finally:
+        pixels_shm.close()
+        data_shm.close()
+
+
+def _extract_slice(task):
+    """Worker: liest die Nutzdaten-Bytes [start, stop) aus ihrem Pixel-Abschnitt."""
+    pixels_name, total_values, data_name, start, stop, depth = task
+    pixels_shm, data_shm = _attach(pixels_name), _attach(data_name)
+    try:
+        flat = np.ndarray((total_values,), dtype=np.uint8, buffer=pixels_shm.buf)
+        data = np.ndarray((stop - start,), dtype=np.uint8, buffer=data_shm.buf, offset=start)
+        offset = stego_codec.HEADER_BITS + start * 8 // depth
+        count = stego_codec._value_count(stop - start, depth)
+        values = flat[offset:offset + count] & ((1 << depth) - 1)
+        data[:] = stego_codec._join_bits(values, depth, stop - start)
+        del flat, data, values
+    finally:
+        pixels_shm.close()
+        data_shm.close()
+
+
+def benchmark(megapixels, workers, depth=1, repeat=3):
+    """
+    Vergleicht sequentielles und paralleles Einbetten/Extrahieren im Speicher.
+
+    Für jede Bildgröße wird die volle Kapazität genutzt. Der Prozess-Pool
+    wird einmal gestartet und wiederverwendet; seine Startzeit wird getrennt
+    ausgegeben, weil sie bei Einzelaufrufen hinzukommt.
+
+    Args:
+        megapixels (list): Bildgrößen in Megapixeln (RGB)
+        workers (int): Anzahl Worker-Prozesse
+        depth (int): Bittiefe
+        repeat (int): Wiederholungen je Messung (bester Wert zählt)
+
+    Returns:
+        list: Ein dict pro Bildgröße mit Zeiten und Speedups
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    start = time.perf_counter()
+    with create_executor(workers) as pool:
+        list(pool.map(abs, range(workers)))  # Worker starten
+        startup = time.perf_counter() - start
+        for mp in megapixels:
+            side = int((mp * 1e6) ** 0.5)
+            with SharedPixels((side, side, 3)) as shared:
+                shared.array[...] = rng.integers(0, 256, shared.shape, dtype=np.uint8)
+                payload = rng.bytes(stego_codec.capacity(shared.array, depth))
+
+                def best(function):
+                    times = []
+                    for _ in range(repeat):
+                        t = time.perf_counter()
+                        function()
+                        times.append(time.perf_counter() - t)
+                    return min(times)
+
+                seq_embed = best(lambda: stego_codec.embed(shared.array, payload, True, depth))
+                par_embed = best(lambda: embed(shared, payload, depth, executor=pool))
+                seq_extract = best(lambda: stego_codec.extract(shared.array))
+                par_extract = best(lambda: extract(shared, executor=pool))
+                results.append({
+                    "megapixels": mp,
+                    "payload_mb": len(payload) / 1e6,
+                    "embed_seq": seq_embed,
+                    "embed_par": par_embed,
+                    "extract_seq": seq_extract,
+                    "extract_par": par_extract,
+                    "startup": startup,
+                })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m logic.stego_parallel",
+        description="Benchmark: sequentielles vs. paralleles LSB-Einbetten",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Anzahl Worker-Prozesse (Standard: Anzahl Kerne)")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16, 64, 128],
+                        help="Bildgrößen in Megapixeln")
+    parser.add_argument("--bits", type=int, default=1, help="Bittiefe (1-4)")
+    args = parser.parse_args(argv)
+
+    results = benchmark(args.sizes, args.workers, args.bits)
+    print(f"Worker: {args.workers}, Pool-Start: {results[0]['startup'] * 1000:.0f} ms")
+    print(f"{'MP':>6} {'MB':>8} {'Einb. seq':>10} {'Einb. par':>10} {'x':>5} "
+          f"{'Extr. seq':>10} {'Extr. par':>10} {'x':>5}")
+    crossover = None
+    for r in results:
+        embed_speedup = r["embed_seq"] / r["embed_par"]
+        extract_speedup = r["extract_seq"] / r["extract_par"]
+        print(f"{r['megapixels']:>6g} {r['payload_mb']:>8.1f} "
+              f"{r['embed_seq']:>9.3f}s {r['embed_par']:>9.3f}s {embed_speedup:>5.2f} "
+              f"{r['extract_seq']:>9.3f}s {r['extract_par']:>9.3f}s {extract_speedup:>5.2f}")
+        # Einzelaufrufe bezahlen zusätzlich den Pool-Start
+        if crossover is None and r["embed_par"] + r["startup"] < r["embed_seq"]:
+            crossover = r["megapixels"]
+    if crossover is None:
+        print("Parallelisierung lohnt sich bei keiner der gemessenen Größen")
+    else:
+        print(f"Parallelisierung lohnt sich ab ca. {crossover:g} MP (inkl. Pool-Start)")
+
+
+if __name__ == "__main__":
+    main()
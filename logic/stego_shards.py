@@ -0,0 +1,402 @@
+#############################
+# Nutzdaten auf mehrere Trägerbilder verteilen
+# Gruppe: B2-4
+##############################
+
+"""
+Verteilt Nutzdaten, die nicht in ein einzelnes Bild passen, auf mehrere
+Trägerbilder (Shards) und setzt sie beim Extrahieren wieder zusammen.
+
+Jeder Shard ist eine gewöhnliche Einbettung (stego_codec-Header, Bittiefe,
+Kompression und Schlüssel wie bisher). Seine Nutzdaten beginnen mit einem
+Manifest (36 Bytes, big-endian):
+
+    Magic "B24P" (4) | Set-ID (8) | Index (2) | Anzahl (2) |
+    Offset (8) | Gesamtgröße (8) | CRC32 der Gesamtdaten (4)
+
+Danach folgt der Abschnitt der Gesamtdaten ab Offset. Jeder Shard weiß damit,
+wohin seine Bytes gehören: Die Bilder können in beliebiger Reihenfolge
+übergeben und parallel extrahiert werden, jeder Worker schreibt seinen
+Abschnitt direkt an die richtige Stelle der Zieldatei. Zum Schluss werden
+Vollständigkeit (alle Indizes derselben Set-ID) und die CRC32 über die
+zusammengesetzte Datei geprüft.
+
+Die Aufteilung (plan) füllt die Träger in der angegebenen Reihenfolge bis
+zur Kapazität (siehe stego_codec.carrier_info). Sie rechnet mit der
+unkomprimierten Größe: Verkleinert die Kompression einen Shard nicht, bettet
+stego_codec ihn unkomprimiert ein. Eingebettet wird in einem
+Prozess-Pool, ein Shard pro Worker - die Laufzeit wird so vom größten
+Träger bestimmt, nicht von der Summe.
+"""
+
+import io
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logic import stego_codec, stego_parallel
+
+MANIFEST_MAGIC = b'B24P'
+MANIFEST_FORMAT = '>4s8sHHQQI'
+MANIFEST_SIZE = struct.calcsize(MANIFEST_FORMAT)  # 36 Bytes
+CHUNK_SIZE = 1024 * 1024  # Blockgröße beim Kopieren und Prüfen
+
+
+def plan(payload_size, carriers, depth=1):
+    """
+    Teilt die Nutzdaten auf die Trägerbilder auf.
+
+    Args:
+        payload_size (int): Größe der Nutzdaten in Bytes
+        carriers (list): Pfade der Trägerbilder (werden der Reihe nach gefüllt)
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+
+    Returns:
+        list: Ein dict pro benötigtem Träger mit image, index, offset und length
+
+    Raises:
+        ValueError: Wenn die Kapazität aller Träger nicht ausreicht
+    """
+    shards = []
+    offset = 0
+    for image in carriers:
+        if offset >= payload_size and shards:
+            break
+        room = stego_codec.carrier_info(image)["capacities"][depth] - MANIFEST_SIZE
+        if room <= 0:
+            continue
+        length = min(room, payload_size - offset)
+        shards.append({"image": image, "index": len(shards), "offset": offset, "length": length})
+        offset += length
+    if offset < payload_size or not shards:
+        raise ValueError(f"Nicht genügend Platz: {payload_size - offset} Bytes passen in keinen Träger mehr")
+    return shards
+
+
+def embed(payload, carriers, outputs, depth=1, compression=None, key=None, workers=None,
+          progress=None):
+    """
+    Versteckt Nutzdaten verteilt auf mehrere Trägerbilder, parallel je Shard.
+
+    Args:
+        payload: Pfad zur Datei mit den Nutzdaten oder bytes
+        carriers (list): Pfade der Trägerbilder
+        outputs (list): Zielpfade, einer pro Trägerbild
+        depth (int): Anzahl der genutzten Bits pro Kanal-Byte (1-4)
+        compression (str): None, 'auto', 'zlib', 'bz2' oder 'lzma' (je Shard)
+        key (str): Schlüssel für die verstreute Einbettung (None = am Stück)
+        workers (int): Anzahl Worker-Prozesse (Standard: Anzahl Kerne)
+        progress: Funktion progress(fertige Teile, Anzahl Teile); eine
+            Exception darin bricht ab (noch nicht gestartete Teile entfallen)
+
+    Returns:
+        list: Ergebnis pro genutztem Träger (siehe embed_shard), nach Index sortiert
+
+    Raises:
+        ValueError: Wenn die Daten nicht in die Träger passen
+    """
+    jobs = shard_jobs(payload, carriers, outputs, depth, compression, key)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    try:
+        results = _run(embed_shard, [(job,) for job in jobs], workers, progress)
+        return sorted(results, key=lambda result: result["index"])
+    except Exception:
+        # Ohne alle Teile sind die Daten nicht lesbar: keine halben Sätze zurücklassen
+        for job in jobs:
+            if os.path.exists(job["output"]):
+                os.remove(job["output"])
+        raise
+
+
+def shard_jobs(payload, carriers, outputs, depth=1, compression=None, key=None):
+    """
+    Erstellt die Aufträge für embed_shard (ein Auftrag pro benötigtem Träger).
+
+    Args: siehe embed
+
+    Returns:
+        list: Aufträge mit image, output, payload, Manifest und Einbettungsoptionen
+    """
+    outputs = dict(zip(carriers, outputs))
+    if isinstance(payload, (bytes, bytearray)):
+        source = bytes(payload)
+        payload_size, crc = len(source), zlib.crc32(source)
+    else:
+        source = payload
+        payload_size, crc = os.path.getsize(payload), _file_crc(payload)
+    shards = plan(payload_size, carriers, depth)
+    set_id = os.urandom(8)
+    jobs = []
+    for shard in shards:
+        manifest = struct.pack(MANIFEST_FORMAT, MANIFEST_MAGIC, set_id, shard["index"], len(shards),
+                               shard["offset"], payload_size, crc)
+        start, end = shard["offset"], shard["offset"] + shard["length"]
+        jobs.append(dict(
+            shard,
+            output=outputs[shard["image"]],
+            count=len(shards),
+            manifest=manifest,
+            # Dateien liest der Worker selbst, Bytes werden nur als Abschnitt übergeben
+            payload=source[start:end] if isinstance(source, bytes) else source,
+            depth=depth,
+            compression=compression,
+            key=key,
+        ))
+    return jobs
+
+
+def embed_shard(job):
+    """
+    Bettet einen Shard ein (läuft im Worker-Prozess).
+
+    Args:
+        job (dict): Auftrag aus shard_jobs
+
+    Returns:
+        dict: image, output, index, count, length (Bytes der Gesamtdaten)
+            und stored (im Bild gespeicherte Bytes)
+    """
+    if isinstance(job["payload"], bytes):
+        source = io.BytesIO(job["payload"])
+        offset = 0
+    else:
+        source = open(job["payload"], 'rb')
+        offset = job["offset"]
+    with source, io.BufferedReader(_ShardPayload(job["manifest"], source, offset, job["length"])) as payload:
+        stored = stego_parallel.embed_file(job["image"], payload, job["output"],
+                                           MANIFEST_SIZE + job["length"], depth=job["depth"],
+                                           compression=job["compression"], workers=1,
+                                           key=job["key"])
+    return {"image": job["image"], "output": job["output"], "index": job["index"],
+            "count": job["count"], "length": job["length"], "stored": stored}
+
+
+def read_manifest(image_path, key=None, progress=None):
+    """
+    Liest nur das Manifest eines Shards.
+
+    Die Extraktion wird abgebrochen, sobald die ersten MANIFEST_SIZE Bytes
+    vorliegen - die übrigen Nutzdaten werden nicht gelesen. Mit Schlüssel
+    muss dafür trotzdem das ganze Bild dekodiert werden.
+
+    Args:
+        image_path: Pfad zum Bild
+        key (str): Schlüssel, falls die Daten verstreut eingebettet wurden
+        progress: Funktion progress(Zeilen, Höhe), siehe stego_codec.extract_file
+
+    Returns:
+        dict: set_id, index, count, offset, total_size und crc - oder None,
+            wenn das Bild keine Daten bzw. keinen Shard enthält
+    """
+    probe = _ManifestWriter()
+    try:
+        stego_codec.extract_file(image_path, probe, key=key, progress=progress)
+    except _ManifestComplete:
+        pass
+    except ValueError:
+        return None
+    return probe.manifest
+
+
+def extract(images, output_path, key=None, workers=None, progress=None):
+    """
+    Setzt die Nutzdaten aus Shards in beliebiger Reihenfolge wieder zusammen.
+
+    Args:
+        images (list): Pfade aller Shard-Bilder
+        output_path: Pfad der Zieldatei
+        key (str): Schlüssel, falls die Daten verstreut eingebettet wurden
+        workers (int): Anzahl Worker-Prozesse (Standard: Anzahl Kerne)
+        progress: Funktion progress(fertige Teile, Anzahl Bilder), siehe embed
+
+    Returns:
+        int: Größe der zusammengesetzten Daten in Bytes
+
+    Raises:
+        ValueError: Wenn ein Bild kein Shard ist, Shards fehlen, zu
+            verschiedenen Daten gehören oder die Prüfsumme nicht stimmt
+    """
+    open(output_path, 'wb').close()  # Die Worker schreiben an ihre Offsets
+    workers = min(workers or os.cpu_count() or 1, len(images))
+    try:
+        manifests = _run(extract_shard, [(image, output_path, key) for image in images],
+                         workers, progress)
+        return finish(output_path, manifests)
+    except Exception:
+        os.remove(output_path)  # Unvollständige Datei entfernen
+        raise
+
+
+def extract_shard(image_path, output_path, key=None):
+    """
+    Extrahiert einen Shard und schreibt seinen Abschnitt an die richtige
+    Stelle der (bereits angelegten) Zieldatei (läuft im Worker-Prozess).
+
+    Args:
+        image_path: Pfad zum Shard-Bild
+        output_path: Pfad der Zieldatei
+        key (str): Schlüssel, falls die Daten verstreut eingebettet wurden
+
+    Returns:
+        dict: Manifest des Shards (siehe read_manifest) mit image und length
+
+    Raises:
+        ValueError: Wenn das Bild keinen gültigen Shard enthält
+    """
+    with open(output_path, 'r+b') as output:
+        writer = _ManifestWriter(output)
+        stego_codec.extract_file(image_path, writer, key=key)
+    if writer.manifest is None:
+        raise ValueError(f"{image_path}: Kein Teil mehrteiliger Daten")
+    return dict(writer.manifest, image=image_path, length=writer.written)
+
+
+def finish(output_path, manifests):
+    """
+    Prüft die zusammengesetzte Datei anhand der Manifeste aller Shards.
+
+    Args:
+        output_path: Pfad der Zieldatei
+        manifests (list): Rückgaben von extract_shard
+
+    Returns:
+        int: Größe der Daten in Bytes
+
+    Raises:
+        ValueError: Bei fehlenden, doppelten oder fremden Shards oder falscher Prüfsumme
+    """
+    first = manifests[0]
+    if any(manifest["set_id"] != first["set_id"] for manifest in manifests):
+        raise ValueError("Die Bilder gehören zu verschiedenen Daten")
+    indices = sorted(manifest["index"] for manifest in manifests)
+    if indices != list(range(first["count"])):
+        missing = sorted(set(range(first["count"])) - set(indices))
+        raise ValueError(f"Teile fehlen oder sind doppelt (fehlend: {missing})")
+    if sum(manifest["length"] for manifest in manifests) != first["total_size"]:
+        raise ValueError("Größe der zusammengesetzten Daten stimmt nicht")
+    if _file_crc(output_path) != first["crc"]:
+        raise ValueError("Prüfsumme der zusammengesetzten Daten stimmt nicht")
+    return first["total_size"]
+
+
+def _run(function, tasks, workers, progress=None):
+    """
+    Führt function für alle Argument-Tupel aus (ab 2 Workern im Prozess-Pool).
+
+    Returns:
+        list: Ergebnisse in der Reihenfolge ihrer Fertigstellung
+    """
+    results = []
+    if workers <= 1:
+        for args in tasks:
+            results.append(function(*args))
+            if progress is not None:
+                progress(len(results), len(tasks))
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(function, *args) for args in tasks]
+        try:
+            for future in as_completed(futures):
+                results.append(future.result())
+                if progress is not None:
+                    progress(len(results), len(tasks))
+        except BaseException:
+            for future in futures:
+                future.cancel()  # Laufende Teile werden noch beendet
+            raise
+    return results
+
+
+def _file_crc(path):
+    """CRC32 einer Datei, blockweise berechnet."""
+    crc = 0
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+class _ShardPayload(io.RawIOBase):
+    """
+    Lesbarer, seekbarer Strom aus Manifest und einem Abschnitt der Quelldatei.
+
+    Wird in io.BufferedReader verpackt an embed_file übergeben, damit der
+    Abschnitt nicht vorher in den Speicher oder eine Kopie gelesen werden muss.
+    """
+
+    def __init__(self, manifest, source, offset, length):
+        self._manifest = manifest
+        self._source = source
+        self._offset = offset
+        self._size = len(manifest) + length
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, position, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            position += self._position
+        elif whence == io.SEEK_END:
+            position += self._size
+        self._position = max(0, position)
+        return self._position
+
+    def readinto(self, buffer):
+        wanted = min(len(buffer), self._size - self._position)
+        if wanted <= 0:
+            return 0
+        head = len(self._manifest)
+        if self._position < head:
+            count = min(wanted, head - self._position)
+            buffer[:count] = self._manifest[self._position:self._position + count]
+        else:
+            self._source.seek(self._offset + self._position - head)
+            count = self._source.readinto(memoryview(buffer)[:wanted])
+        self._position += count
+        return count
+
+
+class _ManifestComplete(Exception):
+    """Manifest vollständig gelesen (bricht die Extraktion bei read_manifest ab)."""
+
+
+class _ManifestWriter:
+    """
+    Ausgabe für extract_file: liest das Manifest am Anfang der Nutzdaten und
+    schreibt den Rest an den Offset des Shards in output.
+
+    Ohne output wird nach dem Manifest mit _ManifestComplete abgebrochen.
+    """
+
+    def __init__(self, output=None):
+        self._output = output
+        self._head = b''
+        self.manifest = None
+        self.written = 0
+
+    def write(self, data):
+        if self.manifest is None:
+            needed = MANIFEST_SIZE - len(self._head)
+            self._head += bytes(data[:needed])
+            data = data[needed:]
+            if len(self._head) < MANIFEST_SIZE:
+                return
+            magic, set_id, index, count, offset, total_size, crc = struct.unpack(MANIFEST_FORMAT, self._head)
+            if magic != MANIFEST_MAGIC:
+                raise ValueError("Kein Teil mehrteiliger Daten")
+            self.manifest = {"set_id": set_id.hex(), "index": index, "count": count,
+                             "offset": offset, "total_size": total_size, "crc": crc}
+            if self._output is None:
+                raise _ManifestComplete()
+            self._output.seek(offset)
+        if len(data):
+            self._output.write(data)
+            self.written += len(data)
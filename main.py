@@ -48,7 +48,8 @@ import tkinter as tk
 from tkinter import filedialog
 from logic.steganotool import SteganographyTool 
 from logic.logic_handler import LogicHandler
-from PIL import Image, ImageTk
+from logic.image_document import ImageDocument
+from PIL import ImageTk
 
 
 class MainApplication:
@@ -66,6 +67,8 @@ class MainApplication:
         
         # Speichert den Pfad zum aktuell geladenen Bild
         self.img_path = None
+        # Einmal dekodiertes Bild, wird an alle Programmteile weitergegeben
+        self.document = None
                 
         # Erstelle eine Bildansicht im Fenster
         self.panel = tk.Label(self.root, text="Fachhochschule Südwestfalen - Programmierung für KI - Projektgruppe B2-4",image = None) 
@@ -123,6 +126,12 @@ class MainApplication:
         
         self.btn_restore = tk.Button(button_frame, text="Zurücksetzen", command=self.reset)
         self.btn_restore.grid(row=3, column=0, padx=10, pady=5)
+
+        self.btn_undo = tk.Button(button_frame, text="Rückgängig", command=self.logic.undo)
+        self.btn_undo.grid(row=4, column=0, padx=10, pady=5)
+
+        self.btn_redo = tk.Button(button_frame, text="Wiederholen", command=self.logic.redo)
+        self.btn_redo.grid(row=5, column=0, padx=10, pady=5)
                    
         self.lbl_Analyse = tk.Label(button_frame, text="Bildmodifikation",image = None) 
         self.lbl_Analyse.config(font=("Helvetica", 11, "bold"))
@@ -130,9 +139,9 @@ class MainApplication:
 
         self.btn_face = tk.Button(button_frame, text="Gesichter\nerkennen", command=self.logic.detect_faces)
         self.btn_face.grid(row=1, column=1, padx=10, pady=5)
-        self.btn_turn = tk.Button(button_frame, text="drehen", command=self.logic.turn_image)
+        self.btn_turn = tk.Button(button_frame, text="drehen", command=lambda: self.logic.apply_filter("Drehen"))
         self.btn_turn.grid(row=2, column=1, padx=10, pady=5)      
-        self.btn_mirror = tk.Button(button_frame, text="spiegeln", command=self.logic.mirror_image)
+        self.btn_mirror = tk.Button(button_frame, text="spiegeln", command=lambda: self.logic.apply_filter("Spiegeln"))
         self.btn_mirror.grid(row=3, column=1, padx=10, pady=5)
 
         # Steganographie
@@ -152,22 +161,22 @@ class MainApplication:
         self.lbl_Modify.config(font=("Helvetica", 11, "bold"))
         self.lbl_Modify.grid(row=0, column=3, columnspan=2)
         
-        self.btn_bw = tk.Button(button_frame, text="Schwarz-Weiß", command=self.logic.schwarz_weiss)
+        self.btn_bw = tk.Button(button_frame, text="Schwarz-Weiß", command=lambda: self.logic.apply_filter("Schwarz-Weiß"))
         self.btn_bw.grid(row=1, column=3, padx=10, pady=5)
         
-        self.btn_sepia = tk.Button(button_frame, text="Sepia", command=self.logic.sepia)
+        self.btn_sepia = tk.Button(button_frame, text="Sepia", command=lambda: self.logic.apply_filter("Sepia"))
         self.btn_sepia.grid(row=2, column=3, padx=10, pady=5)
 
-        self.btn_brightness = tk.Button(button_frame, text="Aufhellen", command=self.logic.aufhellen)
+        self.btn_brightness = tk.Button(button_frame, text="Aufhellen", command=lambda: self.logic.apply_filter("Aufhellen"))
         self.btn_brightness.grid(row=3, column=3, padx=10, pady=5)
 
-        self.btn_verpixeln_gesamt = tk.Button(button_frame, text="Verpixeln", command=self.logic.pixelate)
+        self.btn_verpixeln_gesamt = tk.Button(button_frame, text="Verpixeln", command=lambda: self.logic.apply_filter("Verpixeln"))
         self.btn_verpixeln_gesamt.grid(row=1, column=4, padx=10, pady=5) 
 
-        self.btn_tbd2 = tk.Button(button_frame, text="Schärfen", command=self.logic.sharpen)
+        self.btn_tbd2 = tk.Button(button_frame, text="Schärfen", command=lambda: self.logic.apply_filter("Schärfen"))
         self.btn_tbd2.grid(row=2, column=4, padx=10, pady=5)
 
-        self.btn_darken = tk.Button(button_frame, text="Abdunkeln", command=self.logic.abdunkeln)
+        self.btn_darken = tk.Button(button_frame, text="Abdunkeln", command=lambda: self.logic.apply_filter("Abdunkeln"))
         self.btn_darken.grid(row=3, column=4, padx=10, pady=5)
 
         # Filter kann erst nach Bereichsauswahl angewendet werden
@@ -191,6 +200,10 @@ class MainApplication:
         self.canvas.bind("<B1-Motion>", self.logic.update_selection)
         self.canvas.bind("<ButtonRelease-1>", self.logic.end_selection)
 
+        # Tastenkürzel für Rückgängig und Wiederholen
+        self.root.bind("<Control-z>", lambda event: self.logic.undo())
+        self.root.bind("<Control-y>", lambda event: self.logic.redo())
+
     def format_Buttons(self, button_frame):
         '''
         Formatiert alle Buttons im Button-Frame einheitlich
@@ -217,18 +230,17 @@ class MainApplication:
                     case 5 | 6:
                         button.configure(bg='#CAE8E4')
                     
-    def vorschau(self, selected_path):
+    def vorschau(self, document):
         '''
         Erstellt eine skalierte Vorschau des ausgewählten Bildes
         
         Args:
-            selected_path: Pfad zum ausgewählten Bild
+            document: ImageDocument des ausgewählten Bildes
         '''
-        # Bild laden und für Canvas-Größe skalieren
+        # Vorschau in Canvas-Größe aus dem bereits geladenen Bild
         canvas_width = int(self.can_vorschau.__getitem__('width'))
         canvas_height = int(self.can_vorschau.__getitem__('height'))
-        img = Image.open(selected_path)
-        img.thumbnail((canvas_width, canvas_height), Image.LANCZOS)
+        img = document.thumbnail((canvas_width, canvas_height))
         image_display = ImageTk.PhotoImage(img)
 
         # Bild im Vorschau Canvas anzeigen
@@ -253,14 +265,28 @@ class MainApplication:
         self.img_path = filedialog.askopenfilename(title="Bild auswählen", filetypes=filetypes)
 
         if self.img_path:
+            # Bild genau einmal dekodieren und an alle Programmteile weitergeben
+            self.document = ImageDocument(self.img_path)
+            self.stegano_tool.set_document(self.document)
+
             # Bild-Informationen anzeigen
-            self.info_text = self.stegano_tool.get_file_info(self.img_path)
+            # (Steganalyse läuft im Hintergrund, das Ergebnis kommt über set_info)
+            self.info_text = self.stegano_tool.get_file_info(self.img_path, callback=self.set_info)
             self.info.delete(1.0, tk.END)
             self.update_info(self.info_text)
-            self.vorschau(self.img_path)
-            img = Image.open(self.img_path)
-            self.logic.set_image(img)
+            self.vorschau(self.document)
+            self.logic.set_image(self.document.image)  # Wird bei der Bearbeitung nicht verändert
  
+    def set_info(self, info_text):
+        '''
+        Übernimmt die vollständigen Bildinformationen, sobald die Steganalyse fertig ist
+
+        Args:
+            info_text: Info-Text mit dem Ergebnis der Steganalyse
+        '''
+        self.info_text = info_text
+        self.update_info(info_text)
+
     def update_info(self, message):
         '''
         Aktualisiert das Info-Textfeld mit einer neuen Nachricht
@@ -278,9 +304,8 @@ class MainApplication:
         '''Setzt das Bild auf das Original zurück.'''
         if self.can_vorschau.image:
             self.canvas.image = self.can_vorschau.image  # Auf das Originalbild zurücksetzen
-            self.logic.set_image(Image.open(self.img_path))
+            self.logic.set_image(self.document.image)
             self.update_info(f"Das Bild wurde auf das Original zurückgesetzt.\n{self.info_text}")
-            self.logic.filter_applied = False
         else:
             self.update_info("Es wurde noch keine Datei geöffnet.")
    
@@ -288,7 +313,7 @@ class MainApplication:
 
     def save_as(self):
         '''Speichert das aktuelle Bild.'''
-        if hasattr(self.logic, 'image') and self.logic.image: 
+        if self.logic.master is not None:
             try: 
                 # Dialog zur Auswahl des Speicherpfades
                 speicherpfad = filedialog.asksaveasfilename(
@@ -301,8 +326,8 @@ class MainApplication:
                     ]
                 )
                 if speicherpfad:
-                    # Verwende das PIL Image aus dem LogicHandler zum Speichern
-                    self.logic.image.save(speicherpfad)
+                    # Bearbeitungen erst jetzt in voller Auflösung anwenden (siehe LogicHandler.render)
+                    self.logic.render().save(speicherpfad)
                     self.update_info("Das Bild wurde gespeichert.")
             except Exception as e:
                 self.update_info(f"Fehler beim Speichern der Datei: {str(e)}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Die Module liegen in logic/ und werden als "from logic import ..." importiert
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
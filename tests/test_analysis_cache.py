@@ -0,0 +1,133 @@
+"""
+Tests für logic/analysis_cache.py: Schlüssel aus Pfad, Größe und
+Änderungszeit, Versionsprüfung und LRU-Verdrängung bei max_bytes.
+"""
+
+import itertools
+import json
+import os
+
+import pytest
+
+from logic import analysis_cache
+
+RESULT = {"header": None, "rate": 0.25, "suspicious": True, "name": "Käfer"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Streng steigende Zeit, damit die LRU-Reihenfolge eindeutig ist."""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(analysis_cache.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for number in range(4):
+        path = tmp_path / f"bild{number}.png"
+        path.write_bytes(bytes(100 + number))
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def cache():
+    with analysis_cache.AnalysisCache(":memory:") as cache:
+        yield cache
+
+
+def test_put_get(cache, files, monkeypatch):
+    assert cache.get(files[0]) is None
+    cache.put(files[0], RESULT)
+    assert cache.get(files[0]) == RESULT
+    assert cache.get(files[1]) is None
+    # Relativer und absoluter Pfad ergeben denselben Schlüssel
+    monkeypatch.chdir(os.path.dirname(files[0]))
+    assert cache.get(os.path.basename(files[0])) == RESULT
+
+
+def test_key_changes_with_mtime(cache, files):
+    cache.put(files[0], RESULT)
+    stat = os.stat(files[0])
+    os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.get(files[0]) is None
+
+
+def test_key_changes_with_size(cache, files):
+    cache.put(files[0], RESULT)
+    stat = os.stat(files[0])
+    with open(files[0], "ab") as f:
+        f.write(b"x")
+    # Gleiche Änderungszeit, nur die Größe unterscheidet sich
+    os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(files[0]).st_mtime_ns == stat.st_mtime_ns
+    assert cache.get(files[0]) is None
+
+
+def test_missing_file(cache, tmp_path):
+    missing = str(tmp_path / "fehlt.png")
+    cache.put(missing, RESULT)
+    assert cache.get(missing) is None
+
+
+def test_version_mismatch(cache, files):
+    cache.put(files[0], RESULT)
+    cache.version = 2
+    assert cache.get(files[0]) is None
+    cache.put(files[0], {"rate": 0.5})
+    assert cache.get(files[0]) == {"rate": 0.5}
+    cache.version = 1
+    assert cache.get(files[0]) is None
+
+
+def test_version_mismatch_across_instances(tmp_path, files):
+    path = str(tmp_path / "cache" / "analysis.sqlite3")
+    with analysis_cache.AnalysisCache(path, version=1) as cache:
+        cache.put(files[0], RESULT)
+    with analysis_cache.AnalysisCache(path, version=1) as cache:
+        assert cache.get(files[0]) == RESULT
+    with analysis_cache.AnalysisCache(path, version=2) as cache:
+        assert cache.get(files[0]) is None
+
+
+def test_lru_eviction(clock, files):
+    size = len(json.dumps(RESULT, ensure_ascii=False))
+    with analysis_cache.AnalysisCache(":memory:", max_bytes=3 * size) as cache:
+        for path in files[:3]:
+            cache.put(path, RESULT)
+        # Lesen macht bild0 zum zuletzt genutzten Eintrag
+        assert cache.get(files[0]) == RESULT
+
+        cache.put(files[3], RESULT)
+        assert cache.get(files[1]) is None  # Am längsten nicht gelesen
+        assert cache.get(files[0]) == RESULT
+        assert cache.get(files[2]) == RESULT
+        assert cache.get(files[3]) == RESULT
+
+
+def test_eviction_at_exact_limit(clock, files):
+    size = len(json.dumps(RESULT, ensure_ascii=False))
+    with analysis_cache.AnalysisCache(":memory:", max_bytes=2 * size) as cache:
+        cache.put(files[0], RESULT)
+        cache.put(files[1], RESULT)
+        assert cache.get(files[0]) == RESULT and cache.get(files[1]) == RESULT
+        # Ein Eintrag, der allein größer ist als max_bytes, verdrängt alles
+        cache.max_bytes = size - 1
+        cache.put(files[2], RESULT)
+        assert all(cache.get(path) is None for path in files[:3])
+
+
+def test_unusable_database(tmp_path, files):
+    # Pfad unterhalb einer Datei: Verzeichnis kann nicht angelegt werden
+    blocker = tmp_path / "datei"
+    blocker.write_bytes(b"")
+    with analysis_cache.AnalysisCache(str(blocker / "analysis.sqlite3")) as cache:
+        cache.put(files[0], RESULT)
+        assert cache.get(files[0]) is None
+
+
+def test_clear(cache, files):
+    cache.put(files[0], RESULT)
+    cache.clear()
+    assert cache.get(files[0]) is None
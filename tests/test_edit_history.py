@@ -0,0 +1,143 @@
+"""
+Tests für logic/edit_history.py: Aufzeichnen, Rückgängig, Wiederholen,
+Neuberechnung von Checkpoints aus und Einhaltung des Speicherbudgets.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from logic import edit_history, filter_registry
+
+OPERATIONS = ["Aufhellen", "Spiegeln", "Sepia", "Abdunkeln", "Drehen", "Aufhellen",
+              "Schwarz-Weiß", "Spiegeln", "Aufhellen", "Drehen", "Abdunkeln", "Sepia"]
+
+
+class Replay:
+    """Führt Filter per filter_registry aus und zählt die nachgeholten Bearbeitungen."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, image, operations):
+        self.calls.append(len(operations))
+        return filter_registry.apply(image, operations)
+
+
+@pytest.fixture
+def base():
+    rng = np.random.default_rng(24)
+    return Image.fromarray(rng.integers(0, 256, (12, 16, 3), dtype=np.uint8))
+
+
+def direct(base, operations):
+    """Referenz: alle Bearbeitungen vom Ausgangszustand aus."""
+    return filter_registry.apply(base, operations)
+
+
+def same(a, b):
+    return a.mode == b.mode and a.size == b.size and np.array_equal(np.asarray(a), np.asarray(b))
+
+
+def record_all(history, base, operations):
+    image = base
+    for operation in operations:
+        image = filter_registry.apply(image, [operation])
+        history.record(operation, image)
+    return image
+
+
+def test_record_undo_redo(base):
+    history = edit_history.EditHistory(base, Replay(), interval=3)
+    assert not history.can_undo and not history.can_redo
+    image = record_all(history, base, OPERATIONS[:7])
+    assert history.position == 7
+    assert history.applied == OPERATIONS[:7]
+
+    for position in range(6, 2, -1):
+        image = history.undo()
+        assert same(image, direct(base, OPERATIONS[:position]))
+    assert history.applied == OPERATIONS[:3]
+    assert history.can_redo
+
+    for position in range(4, 8):
+        image = history.redo(image)
+        assert same(image, direct(base, OPERATIONS[:position]))
+    assert not history.can_redo
+    with pytest.raises(ValueError):
+        history.redo(image)
+
+
+def test_undo_to_base(base):
+    history = edit_history.EditHistory(base, Replay())
+    record_all(history, base, OPERATIONS[:2])
+    history.undo()
+    assert same(history.undo(), base)
+    with pytest.raises(ValueError):
+        history.undo()
+
+
+def test_record_after_undo_discards_redo(base):
+    history = edit_history.EditHistory(base, Replay(), interval=2)
+    record_all(history, base, OPERATIONS[:6])
+    for _ in range(3):
+        image = history.undo()
+    history.record("Sepia", filter_registry.apply(image, ["Sepia"]))
+    assert history.operations == OPERATIONS[:3] + ["Sepia"]
+    assert not history.can_redo
+    assert max(history.checkpoints) <= history.position
+    assert same(history.image_at(4), direct(base, OPERATIONS[:3] + ["Sepia"]))
+
+
+@pytest.mark.parametrize("interval", [1, 3, 5])
+def test_image_at_matches_direct_replay(base, interval):
+    replay = Replay()
+    history = edit_history.EditHistory(base, replay, interval=interval)
+    record_all(history, base, OPERATIONS)
+    assert sorted(history.checkpoints) == list(range(0, len(OPERATIONS) + 1, interval))
+
+    for position in range(len(OPERATIONS) + 1):
+        replay.calls.clear()
+        assert same(history.image_at(position), direct(base, OPERATIONS[:position]))
+        # Höchstens interval - 1 Bearbeitungen ab dem nächsten Checkpoint
+        assert sum(replay.calls) == position % interval
+
+
+def test_checkpoints_are_copies(base):
+    history = edit_history.EditHistory(base, Replay(), interval=1)
+    image = filter_registry.apply(base, ["Aufhellen"])
+    history.record("Aufhellen", image)
+    expected = np.asarray(image).copy()
+    image.paste((0, 0, 0), (0, 0, 16, 12))
+    base.paste((0, 0, 0), (0, 0, 16, 12))
+    assert np.array_equal(np.asarray(history.image_at(1)), expected)
+    assert not np.array_equal(np.asarray(history.image_at(0)), np.asarray(base))
+
+
+def test_eviction_keeps_budget_and_base(base):
+    size = edit_history.image_size(base)
+    # Platz für den Ausgangszustand und zwei weitere Checkpoints
+    budget = 3 * size
+    history = edit_history.EditHistory(base, Replay(), budget=budget, interval=2)
+    # Ohne Schwarz-Weiß: alle Checkpoints sind gleich groß
+    operations = [operation for operation in OPERATIONS if operation != "Schwarz-Weiß"]
+
+    image = base
+    for operation in operations:
+        image = filter_registry.apply(image, [operation])
+        history.record(operation, image)
+        assert history.nbytes <= budget
+        assert 0 in history.checkpoints
+
+    # Die ältesten Checkpoints sind verdrängt, die neuesten bleiben
+    assert sorted(history.checkpoints) == [0, 8, 10]
+    # Über die entstandenen Lücken hinweg wird korrekt neu berechnet
+    for position in range(len(operations) + 1):
+        assert same(history.image_at(position), direct(base, operations[:position]))
+
+
+def test_budget_smaller_than_base(base):
+    history = edit_history.EditHistory(base, Replay(), budget=1, interval=1)
+    record_all(history, base, OPERATIONS[:4])
+    assert list(history.checkpoints) == [0]
+    assert same(history.image_at(4), direct(base, OPERATIONS[:4]))
@@ -0,0 +1,52 @@
+"""
+Tests für logic/filter_registry.py: Die zusammengefasste Pipeline muss
+bitgleich zur Anwendung der einzelnen Filter nacheinander sein.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from logic import filter_registry
+
+SHAPES = {"L": (37, 53), "LA": (37, 53, 2), "RGB": (37, 53, 3), "RGBA": (37, 53, 4)}
+
+CHAINS = [
+    ["Aufhellen", "Schwarz-Weiß", "Sepia"],
+    ["Sepia", "Abdunkeln", "Aufhellen"],
+    ["Aufhellen", "Abdunkeln", "Sepia", "Schwarz-Weiß", "Aufhellen"],
+    ["Schwarz-Weiß", "Spiegeln", "Sepia", "Aufhellen"],
+]
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(22)
+
+
+def sequential(image, names):
+    """Referenz: die Filterfunktionen einzeln nacheinander."""
+    for name in names:
+        image = filter_registry.get(name).function(image)
+    return image
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA", "L", "LA"])
+@pytest.mark.parametrize("names", CHAINS)
+def test_fused_matches_sequential(rng, monkeypatch, mode, names):
+    # Kleine Zeilenblöcke, damit auch der Übergang zwischen Blöcken geprüft wird
+    monkeypatch.setattr(filter_registry, "BAND_PIXELS", 53 * 5)
+    image = Image.fromarray(rng.integers(0, 256, SHAPES[mode], dtype=np.uint8), mode)
+    original = np.asarray(image).copy()
+
+    result = filter_registry.apply(image, names)
+    expected = sequential(image, names)
+    assert result.mode == expected.mode
+    assert result.size == expected.size
+    assert np.array_equal(np.asarray(result), np.asarray(expected))
+    assert np.array_equal(np.asarray(image), original)  # Eingabe bleibt unverändert
+
+
+def test_unknown_filter():
+    with pytest.raises(ValueError, match="Unbekannter Filter"):
+        filter_registry.apply(Image.new("RGB", (4, 4)), ["Aufhellen", "Gibt es nicht"])
@@ -0,0 +1,57 @@
+"""
+Tests für die streifenweise Filterung großer Bilder (image_processing.process_file):
+Das Ergebnis muss auch an den Streifengrenzen bitgleich zur Filterung des ganzen Bildes sein.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from logic import filter_registry, image_processing
+
+CHAINS = [
+    ["Schärfen"],
+    ["Verpixeln"],
+    ["Verpixeln", "Schärfen"],
+    ["Aufhellen", "Schärfen", "Sepia", "Verpixeln", "Abdunkeln"],
+]
+
+
+@pytest.fixture(scope="module")
+def pixels():
+    # Zufallsrauschen mit Kanten, damit Nachbarschaftsfilter überall etwas verändern
+    rng = np.random.default_rng(25)
+    values = rng.integers(0, 256, (97, 61, 4), dtype=np.uint8)
+    rows, columns = np.mgrid[0:97, 0:61]
+    values[..., 0] = (columns * 5 + rows * 3) % 256
+    return values
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA", "L", "LA"])
+@pytest.mark.parametrize("names", CHAINS, ids=lambda names: "+".join(names))
+def test_strips_match_whole_image(tmp_path, pixels, mode, names):
+    source = tmp_path / "quelle.png"
+    target = tmp_path / "ziel.png"
+    Image.fromarray(pixels).convert(mode).save(source)
+
+    # Sehr kleine Streifen: höchstens so hoch wie der Rand, viele Streifengrenzen
+    info = image_processing.process_file(source, target, names, tile_bytes=1)
+    assert info["tiles"] > 5
+
+    with Image.open(source) as image:
+        expected = filter_registry.apply(image, names)
+    with Image.open(target) as result:
+        assert result.mode == expected.mode
+        assert np.array_equal(np.asarray(result), np.asarray(expected))
+
+
+def test_halo_adds_up():
+    assert image_processing.tile_halo(["Sepia"]) == 0
+    assert image_processing.tile_halo(["Verpixeln", "Schärfen"]) == 11
+
+
+def test_geometry_is_rejected(tmp_path, pixels):
+    source = tmp_path / "quelle.png"
+    Image.fromarray(pixels).convert("RGB").save(source)
+    with pytest.raises(ValueError):
+        image_processing.process_file(source, tmp_path / "ziel.png", ["Drehen"])
@@ -0,0 +1,69 @@
+"""
+Regressionstest für logic/sepia.py: Die vektorisierte Fassung muss dieselben
+Werte liefern wie die frühere Berechnung Pixel für Pixel.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from logic.sepia import sepia
+
+
+def sepia_pixel(r, g, b):
+    """Frühere Formel pro Pixel (vor der Vektorisierung)."""
+    tr = int(0.393 * r + 0.769 * g + 0.189 * b)
+    tg = int(0.349 * r + 0.686 * g + 0.168 * b)
+    tb = int(0.272 * r + 0.534 * g + 0.131 * b)
+    return min(255, tr), min(255, tg), min(255, tb)
+
+
+def reference(image):
+    """Farbwerte wie bei der früheren Implementierung (Umwandlung nach RGB, dann pro Pixel)."""
+    rgb = np.asarray(image.convert("RGB"))
+    return np.array([[sepia_pixel(*map(int, pixel)) for pixel in row] for row in rgb],
+                    dtype=np.uint8)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(21)
+
+
+def test_rgb_matches_per_pixel_formula(rng):
+    image = Image.fromarray(rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+    result = sepia(image)
+    assert result.mode == "RGB"
+    assert np.array_equal(np.asarray(result), reference(image))
+
+
+def test_extreme_colors():
+    # Ecken des Farbwürfels und Werte rund um die Begrenzung auf 255
+    values = [0, 1, 127, 128, 200, 254, 255]
+    colors = np.array([(r, g, b) for r in values for g in values for b in values], dtype=np.uint8)
+    image = Image.fromarray(colors.reshape(len(values), -1, 3))
+    assert np.array_equal(np.asarray(sepia(image)), reference(image))
+
+
+def test_grayscale_matches_per_pixel_formula(rng):
+    image = Image.fromarray(rng.integers(0, 256, (32, 40), dtype=np.uint8))
+    assert np.array_equal(np.asarray(sepia(image)), reference(image))
+
+
+def test_palette_matches_per_pixel_formula(rng):
+    image = Image.fromarray(rng.integers(0, 256, (32, 40, 3), dtype=np.uint8)).quantize(64)
+    assert image.mode == "P"
+    result = sepia(image)
+    assert result.mode == "RGB"
+    assert np.array_equal(np.asarray(result), reference(image))
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "LA"])
+def test_alpha_is_kept(rng, mode):
+    channels = {"RGBA": 4, "LA": 2}[mode]
+    image = Image.fromarray(rng.integers(0, 256, (32, 40, channels), dtype=np.uint8))
+    assert image.mode == mode
+    result = sepia(image)
+    assert result.mode == "RGBA"
+    assert np.array_equal(np.asarray(result.getchannel("A")), np.asarray(image.getchannel("A")))
+    assert np.array_equal(np.asarray(result)[..., :3], reference(image))
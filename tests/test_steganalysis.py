@@ -0,0 +1,77 @@
+"""
+Tests für logic/steganalysis.py: Die geschätzte Einbettungsrate von RS und SPA
+muss bei 0 %, 50 % und 100 % eingebetteter LSBs passen - auch bei fast
+vollständiger Einbettung, wo die quadratischen Gleichungen keine reelle
+Lösung mehr haben.
+"""
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from logic import steganalysis, stego_codec
+
+IMAGES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Bilder")
+
+
+def load(name, mode):
+    with Image.open(os.path.join(IMAGES, name)) as image:
+        # Ausschnitt aus der Bildmitte, damit der Test schnell bleibt
+        left, top = max(0, image.width // 2 - 256), max(0, image.height // 2 - 256)
+        image = image.crop((left, top, left + min(512, image.width), top + min(512, image.height)))
+        return np.asarray(image.convert(mode))
+
+
+def embed_random(pixels, rate, seed):
+    """Ersetzt die LSBs eines Anteils rate aller Kanal-Bytes durch Zufallsbits."""
+    rng = np.random.default_rng(seed)
+    flat = pixels.reshape(-1).copy()
+    positions = rng.permutation(flat.size)[:int(rate * flat.size)]
+    flat[positions] = (flat[positions] & 0xFE) | rng.integers(0, 2, positions.size, dtype=np.uint8)
+    return flat.reshape(pixels.shape)
+
+
+@pytest.mark.parametrize("name", ["Katze.jpg", "100x100-grau.png"])
+@pytest.mark.parametrize("mode", ["L", "RGB"])
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_rate_estimates(name, mode, seed):
+    pixels = load(name, mode)
+
+    clean = steganalysis.analyse(pixels)
+    assert clean["rate"] < steganalysis.RATE_THRESHOLD
+    assert not clean["suspicious"]
+
+    half = steganalysis.analyse(embed_random(pixels, 0.5, seed))
+    assert abs(half["rate"] - 0.5) < 0.1
+    assert half["suspicious"]
+
+    full = steganalysis.analyse(embed_random(pixels, 1.0, seed))
+    assert full["suspicious"]
+    assert full["rate"] > 0.8
+    for channel in full["channels"]:
+        assert channel["rs"]["rate"] > 0.8
+        assert channel["spa"]["rate"] > 0.8
+
+
+def test_full_capacity_embedding():
+    # Alle LSBs durch Nutzdaten des Tools ersetzt
+    pixels = load("Katze.jpg", "RGB")
+    payload = np.random.default_rng(11).bytes(stego_codec.capacity(pixels))
+    result = steganalysis.analyse(stego_codec.embed(pixels, payload))
+    assert result["suspicious"]
+    for channel in result["channels"]:
+        assert channel["rs"]["rate"] > 0.8
+        assert channel["spa"]["rate"] > 0.8
+
+
+@pytest.mark.parametrize("coefficients, expected", [
+    ((1.0, -0.5, 0.06), 0.4),    # Lösungen 0.2 und 0.3
+    ((1.0, -1.0, 1.0), 1.0),     # Keine reelle Lösung: jenseits der Schätzgrenze
+    ((0.0, 2.0, -0.5), 0.5),     # Linear
+    ((0.0, 0.0, 1.0), 0.0),      # Entartet
+    ((1.0, -3.0, 2.0), 1.0),     # Lösungen 1 und 2, Begrenzung auf [0, 1]
+])
+def test_estimate_rate(coefficients, expected):
+    assert steganalysis._estimate_rate(*coefficients, lambda x: 2 * x) == pytest.approx(expected)
@@ -0,0 +1,282 @@
+"""
+Tests für logic/stego_codec.py: Header, Bitgruppen, Einbetten und Extrahieren
+(Array und Datei), Kapazitätsgrenze sowie beschädigte oder abgeschnittene Daten.
+"""
+
+import io
+import zlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from logic import stego_codec
+
+SHAPES = {"L": (40, 36), "LA": (40, 36, 2), "RGB": (40, 36, 3), "RGBA": (40, 36, 4)}
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(8)
+
+
+def carrier(rng, mode="RGB"):
+    return rng.integers(0, 256, SHAPES[mode], dtype=np.uint8)
+
+
+def save(tmp_path, pixels, name="carrier.png"):
+    path = str(tmp_path / name)
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+@pytest.mark.parametrize("compression", [0, 1, 2, 3])
+@pytest.mark.parametrize("scattered", [False, True])
+def test_header_round_trip(depth, compression, scattered):
+    header = stego_codec._pack_header(1234, depth, compression, 0xDEADBEEF, scattered)
+    assert len(header) == stego_codec.HEADER_BYTES
+    bits = np.unpackbits(np.frombuffer(header, dtype=np.uint8))
+    assert stego_codec._read_header(bits) == (1234, depth, compression, 0xDEADBEEF, scattered)
+
+
+def test_header_rejects_wrong_magic_version_and_size():
+    header = bytearray(stego_codec._pack_header(100, 1))
+    bits = lambda data: np.unpackbits(np.frombuffer(bytes(data), dtype=np.uint8))
+
+    with pytest.raises(ValueError, match="Keine versteckten Daten"):
+        stego_codec._read_header(bits(b"XXXX" + header[4:]))
+    header[4] = stego_codec.HEADER_VERSION + 1
+    with pytest.raises(ValueError, match="Header-Version"):
+        stego_codec._read_header(bits(header))
+    header[4] = stego_codec.HEADER_VERSION
+    with pytest.raises(ValueError, match="Datengröße"):
+        stego_codec._read_header(bits(header), total_values=stego_codec.HEADER_BITS + 799)
+    assert stego_codec._read_header(bits(header), total_values=stego_codec.HEADER_BITS + 800)[0] == 100
+
+
+@pytest.mark.parametrize("depth", [0, 5])
+def test_invalid_depth(depth):
+    with pytest.raises(ValueError, match="Bittiefe"):
+        stego_codec._pack_header(1, depth)
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 4, 5, 17, 256])
+def test_split_join_bits(rng, depth, size):
+    data = rng.integers(0, 256, size, dtype=np.uint8)
+    values = stego_codec._split_bits(data, depth)
+    assert values.size == stego_codec._value_count(size, depth)
+    assert values.max(initial=0) < 1 << depth
+    assert np.array_equal(stego_codec._join_bits(values, depth, size), data)
+
+
+def test_split_bits_msb_first():
+    data = np.array([0b10110100, 0b01111110, 0b11000001], dtype=np.uint8)
+    assert stego_codec._split_bits(data[:1], 2).tolist() == [0b10, 0b11, 0b01, 0b00]
+    assert stego_codec._split_bits(data[:1], 4).tolist() == [0b1011, 0b0100]
+    # 24-Bit-Wort 10110100 01111110 11000001 in Gruppen zu drei Bits
+    assert stego_codec._split_bits(data, 3).tolist() == [5, 5, 0, 7, 7, 3, 0, 1]
+
+
+@pytest.mark.parametrize("mode", list(SHAPES))
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_embed_extract(rng, mode, depth):
+    pixels = carrier(rng, mode)
+    payload = rng.bytes(stego_codec.capacity(pixels, depth) // 2)
+    result = stego_codec.embed(pixels, payload, depth=depth)
+    assert result.shape == pixels.shape
+    # Nur die unteren depth Bits ändern sich
+    assert np.array_equal(result >> depth, pixels >> depth)
+    assert stego_codec.extract(result) == payload
+
+
+@pytest.mark.parametrize("compression", [None, "auto", "zlib", "bz2", "lzma"])
+@pytest.mark.parametrize("key", [None, "geheim"])
+def test_embed_extract_options(rng, compression, key):
+    pixels = carrier(rng)
+    payload = b"Steganographie " * 60
+    result = stego_codec.embed(pixels, payload, depth=2, compression=compression, key=key)
+    assert stego_codec.extract(result, key=key) == payload
+    header = stego_codec.read_header_pixels(result)
+    assert header["depth"] == 2
+    assert header["scattered"] == (key is not None)
+    if compression != "auto":
+        assert header["compression"] == compression
+
+
+def test_embed_inplace(rng):
+    pixels = carrier(rng)
+    result = stego_codec.embed(pixels, b"abc", inplace=True)
+    assert result is pixels
+    assert stego_codec.extract(pixels) == b"abc"
+
+
+@pytest.mark.parametrize("mode", list(SHAPES))
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_embed_file_extract_file(tmp_path, rng, mode, depth):
+    pixels = carrier(rng, mode)
+    path = save(tmp_path, pixels)
+    output = str(tmp_path / "output.png")
+    payload = rng.bytes(stego_codec.capacity(pixels, depth) - 5)
+
+    stored = stego_codec.embed_file(path, io.BytesIO(payload), output, depth=depth, chunk_size=64)
+    assert stored == len(payload)
+    with Image.open(output) as image:
+        assert image.mode == mode
+        assert np.array_equal(np.asarray(image) >> depth, pixels >> depth)
+
+    extracted = io.BytesIO()
+    assert stego_codec.extract_file(output, extracted, chunk_size=64) == len(payload)
+    assert extracted.getvalue() == payload
+    # Streaming und Array-Variante schreiben dieselben Pixel
+    with Image.open(output) as image:
+        assert np.array_equal(np.asarray(image), stego_codec.embed(pixels, payload, depth=depth))
+
+
+@pytest.mark.parametrize("compression", [None, "auto", "zlib", "bz2", "lzma"])
+@pytest.mark.parametrize("key", [None, "geheim"])
+def test_embed_file_options(tmp_path, rng, compression, key):
+    path = save(tmp_path, carrier(rng, "RGBA"))
+    output = str(tmp_path / "output.png")
+    payload = bytes(range(256)) * 8
+    stego_codec.embed_file(path, io.BytesIO(payload), output, depth=3,
+                           compression=compression, key=key)
+    extracted = io.BytesIO()
+    assert stego_codec.extract_file(output, extracted, key=key) == len(payload)
+    assert extracted.getvalue() == payload
+
+
+def test_embed_file_reports_progress_and_cancels(tmp_path, rng):
+    path = save(tmp_path, carrier(rng))
+    calls = []
+    stego_codec.embed_file(path, io.BytesIO(b"x"), str(tmp_path / "output.png"),
+                           progress=lambda done, total: calls.append((done, total)))
+    assert calls[-1] == (40, 40)
+
+    def cancel(done, total):
+        raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        stego_codec.embed_file(path, io.BytesIO(b"x"), str(tmp_path / "cancel.png"),
+                               progress=cancel)
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_capacity_boundary(tmp_path, rng, depth):
+    pixels = carrier(rng)
+    capacity = stego_codec.capacity(pixels, depth)
+    assert capacity == (pixels.size - stego_codec.HEADER_BITS) * depth // 8
+
+    payload = rng.bytes(capacity)
+    assert stego_codec.extract(stego_codec.embed(pixels, payload, depth=depth)) == payload
+    with pytest.raises(ValueError, match="zu groß"):
+        stego_codec.embed(pixels, payload + b"x", depth=depth)
+
+    path = save(tmp_path, pixels)
+    output = str(tmp_path / "output.png")
+    stego_codec.embed_file(path, io.BytesIO(payload), output, depth=depth)
+    extracted = io.BytesIO()
+    stego_codec.extract_file(output, extracted)
+    assert extracted.getvalue() == payload
+    with pytest.raises(ValueError, match="zu groß"):
+        stego_codec.embed_file(path, io.BytesIO(payload + b"x"), output, depth=depth)
+
+
+def test_clean_image_is_rejected(tmp_path, rng):
+    pixels = carrier(rng)
+    assert stego_codec.read_header_pixels(pixels) is None
+    assert stego_codec.read_header(save(tmp_path, pixels)) is None
+    # Alle LSBs gesetzt: weder Magic noch eine plausible alte Größenangabe
+    path = save(tmp_path, pixels | 1, "clean.png")
+    with pytest.raises(ValueError, match="Keine versteckten Daten"):
+        stego_codec.extract(pixels | 1)
+    with pytest.raises(ValueError, match="Keine versteckten Daten"):
+        stego_codec.extract_file(path, io.BytesIO())
+
+
+def test_too_small_image():
+    with pytest.raises(ValueError, match="zu klein"):
+        stego_codec.extract(np.zeros(stego_codec.HEADER_BITS - 1, dtype=np.uint8))
+
+
+def test_corrupted_payload_fails_crc(tmp_path, rng):
+    pixels = carrier(rng)
+    result = stego_codec.embed(pixels, rng.bytes(100))
+    result.reshape(-1)[stego_codec.HEADER_BITS + 10] ^= 1
+    with pytest.raises(ValueError, match="Prüfsumme"):
+        stego_codec.extract(result)
+    with pytest.raises(ValueError, match="Prüfsumme"):
+        stego_codec.extract_file(save(tmp_path, result), io.BytesIO())
+
+
+def test_wrong_key_fails_crc(rng):
+    result = stego_codec.embed(carrier(rng), rng.bytes(100), key="richtig")
+    with pytest.raises(ValueError, match="Prüfsumme"):
+        stego_codec.extract(result, key="falsch")
+    with pytest.raises(ValueError, match="Schlüssel erforderlich"):
+        stego_codec.extract(result)
+
+
+def test_truncated_image(tmp_path, rng):
+    pixels = carrier(rng)
+    payload = rng.bytes(stego_codec.capacity(pixels))
+    result = stego_codec.embed(pixels, payload)
+    # Untere Hälfte fehlt: Der Header verspricht mehr Daten, als die Zeilen enthalten
+    bands = [result[:20]]
+    with pytest.raises(ValueError, match="weniger Daten"):
+        stego_codec.extract_rows(bands, io.BytesIO())
+    # Mit der echten Bildgröße passt die Angabe im Header nicht zum Bild
+    with pytest.raises(ValueError, match="Datengröße"):
+        stego_codec.extract(result[:20])
+
+
+def test_corrupted_compressed_stream(rng):
+    # Gültige CRC über einen beschädigten zlib-Strom
+    stream = bytearray(zlib.compress(b"a" * 1000))
+    stream[5] ^= 0xFF
+    header = stego_codec._pack_header(len(stream), 1, 1, zlib.crc32(stream))
+    data = np.frombuffer(header + bytes(stream), dtype=np.uint8)
+    pixels = carrier(rng)
+    flat = pixels.reshape(-1)
+    stego_codec._write_lsb(flat[:data.size * 8], np.unpackbits(data), 1)
+    with pytest.raises(ValueError, match="beschädigt"):
+        stego_codec.extract(pixels)
+
+    # Abgeschnittener Strom: Prüfsumme stimmt, aber das Ende fehlt
+    stream = zlib.compress(rng.bytes(300))[:-20]
+    header = stego_codec._pack_header(len(stream), 1, 1, zlib.crc32(stream))
+    data = np.frombuffer(header + stream, dtype=np.uint8)
+    stego_codec._write_lsb(flat[:data.size * 8], np.unpackbits(data), 1)
+    with pytest.raises(ValueError, match="unvollständig"):
+        stego_codec.extract(pixels)
+
+
+def test_payload_shorter_than_announced(tmp_path, rng):
+    path = save(tmp_path, carrier(rng))
+    with pytest.raises(ValueError, match="kürzer"):
+        stego_codec.embed_file(path, io.BytesIO(b"abc"), str(tmp_path / "output.png"),
+                               payload_size=10)
+
+
+def test_output_path_must_be_png(tmp_path, rng):
+    path = save(tmp_path, carrier(rng))
+    with pytest.raises(ValueError, match="Zielpfad"):
+        stego_codec.embed_file(path, io.BytesIO(b"x"), None)
+    with pytest.raises(ValueError, match=r"\.png"):
+        stego_codec.embed_file(path, io.BytesIO(b"x"), str(tmp_path / "output.bmp"))
+
+
+def test_legacy_format(tmp_path, rng):
+    # Altes Format: 32 Bit Datengröße, danach die Nutzdaten mit 1 Bit pro Kanal
+    pixels = carrier(rng)
+    payload = rng.bytes(300)
+    bits = np.unpackbits(np.frombuffer(len(payload).to_bytes(4, "big") + payload, dtype=np.uint8))
+    flat = pixels.reshape(-1)
+    flat[:bits.size] = (flat[:bits.size] & 0xFE) | bits
+
+    assert stego_codec.extract(pixels) == payload
+    path = save(tmp_path, pixels)
+    extracted = io.BytesIO()
+    assert stego_codec.extract_file(path, extracted, chunk_size=7) == len(payload)
+    assert extracted.getvalue() == payload
+    assert stego_codec.read_header(path) is None
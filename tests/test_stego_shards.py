@@ -0,0 +1,80 @@
+"""
+Tests für logic/stego_shards.py: Verteilen auf mehrere Träger und
+Zusammensetzen in beliebiger Reihenfolge, mit allen Kompressionsoptionen.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from logic import stego_codec, stego_shards
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(19)
+
+
+@pytest.fixture
+def carriers(tmp_path, rng):
+    paths = []
+    for number, shape in enumerate([(40, 30, 3), (24, 50, 4), (32, 32)]):
+        path = str(tmp_path / f"carrier{number}.png")
+        Image.fromarray(rng.integers(0, 256, shape, dtype=np.uint8)).save(path)
+        paths.append(path)
+    return paths
+
+
+def capacity(carriers, depth):
+    """Gesamtkapazität aller Träger für Nutzdaten (ohne die Manifeste)."""
+    return sum(stego_codec.carrier_info(path)["capacities"][depth] - stego_shards.MANIFEST_SIZE
+               for path in carriers)
+
+
+@pytest.mark.parametrize("compression", [None, "auto", "zlib", "bz2", "lzma"])
+@pytest.mark.parametrize("key", [None, "geheim"])
+def test_round_trip_incompressible(tmp_path, rng, carriers, compression, key):
+    # Zufallsdaten bis an die Kapazität: Kompression würde sie vergrößern
+    depth = 2
+    payload = rng.bytes(capacity(carriers, depth))
+    outputs = [str(tmp_path / f"output{number}.png") for number in range(len(carriers))]
+
+    shards = stego_shards.embed(payload, carriers, outputs, depth=depth,
+                                compression=compression, key=key, workers=1)
+    assert len(shards) == len(carriers)
+    assert sum(shard["length"] for shard in shards) == len(payload)
+
+    target = tmp_path / "joined.bin"
+    stego_shards.extract(outputs[::-1], str(target), key=key, workers=1)
+    assert target.read_bytes() == payload
+
+
+@pytest.mark.parametrize("compression", [None, "auto", "zlib", "bz2", "lzma"])
+def test_round_trip_compressible(tmp_path, carriers, compression):
+    payload = b"Steganographie " * 60
+    source = tmp_path / "payload.txt"
+    source.write_bytes(payload)
+    outputs = [str(tmp_path / f"output{number}.png") for number in range(len(carriers))]
+
+    shards = stego_shards.embed(str(source), carriers, outputs, compression=compression, workers=1)
+    if compression not in (None, "auto"):
+        # Mehrere Teile, jeder wird für sich komprimiert
+        assert all(shard["stored"] < stego_shards.MANIFEST_SIZE + shard["length"]
+                   for shard in shards)
+
+    target = tmp_path / "joined.bin"
+    stego_shards.extract([shard["output"] for shard in shards], str(target), workers=1)
+    assert target.read_bytes() == payload
+
+
+def test_not_enough_room(carriers):
+    with pytest.raises(ValueError, match="Nicht genügend Platz"):
+        stego_shards.plan(capacity(carriers, 1) + 1, carriers, 1)
+
+
+def test_missing_shard(tmp_path, rng, carriers):
+    payload = rng.bytes(capacity(carriers, 1))
+    outputs = [str(tmp_path / f"output{number}.png") for number in range(len(carriers))]
+    stego_shards.embed(payload, carriers, outputs, workers=1)
+    with pytest.raises(ValueError):
+        stego_shards.extract(outputs[:2], str(tmp_path / "joined.bin"), workers=1)